@@ -3,6 +3,12 @@ import pandas as pd
 import psycopg2
 import json 
 import base64        
+import io
+from sqlalchemy import text
+try:
+    import orjson
+except ImportError:  # orjson is optional, the readers fall back to the json module
+    orjson = None
 
 # Function to insert data into meta_data_vector_db
 def insert_meta_data_vector(index_name, table_name, metadata_fields, vector_fields, db_url):
@@ -107,266 +113,166 @@ def get_fieldmapping_by_api_endpoint(api_name,endpoint_name, data_extraction_pat
         print(f"Error while executing SQL query: {error}")
 
 
-def get_AllApiList(engine):
+# Config readers served by the get_* functions below: reader -> (table, id column, projected columns).
+# Only the columns the API returns are selected; response_schemas keeps returning an empty sample_response.
+CONFIG_READERS = {
+    "apis": ("apis", "api_id", ("api_id", "api_name")),
+    "endpoints_by_api": ("endpoints", "api_id", ("endpoint_id", "endpoint_name", "endpoint_url", "http_method", "description")),
+    "endpoints": ("endpoints", "endpoint_id", ("endpoint_id", "endpoint_name", "endpoint_url", "http_method", "description")),
+    "headers": ("headers", "endpoint_id", ("header_id", "header_name", "header_value")),
+    "query_parameters": ("query_parameters", "endpoint_id", ("parameter_id", "parameter_name", "parameter_value")),
+    "response_schemas": ("response_schemas", "endpoint_id", ("schema_id", "format_type", "root_path", "'' AS sample_response")),
+    "extraction_rules": ("data_extraction_rules", "schema_id", ("extraction_id", "extraction_path", "description")),
+    "database_mappings": ("database_mappings", "extraction_id", ("mapping_id", "database_table", "primary_key")),
+    "field_mappings": ("field_mappings", "mapping_id", ("field_mapping_id", "api_field_name", "database_field_name", "data_type_conversion")),
+    "transformation_rules": ("transformation_rules", "mapping_id", ("transformation_id", "transformation_type", "rule_description"))
+}
+
+# Function to serialize rows to JSON bytes (orjson when installed, the json module otherwise)
+def json_bytes(value):
+    if orjson is not None:
+        return orjson.dumps(value, default=str)
+    return json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+
+# Function to read a config reader's rows straight from the DBAPI cursor, yielding lists of row dicts of up to chunk_size.
+# With key_id <= 0 (and all_rows_if_unset) the whole table is read through a server-side cursor, so it is never fully in memory.
+def iter_config_row_chunks(reader, key_id, engine, chunk_size=1000, all_rows_if_unset=True):
+    table, key_column, columns = CONFIG_READERS[reader]
+    query = f"SELECT {', '.join(columns)} FROM {table}"
+    params = None
+    if not all_rows_if_unset or int(key_id) > 0:
+        query += f" WHERE {key_column} = %s"
+        params = (int(key_id),)
+    query += f" ORDER BY {columns[0]}"
+    connection = engine.raw_connection()
     try:
-        # Define the SQL query
-            query = f"""SELECT  * FROM  apis a"""
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
+        cursor = connection.cursor() if params else connection.cursor(name=f"read_{reader}")
+        cursor.execute(query, params)
+        names = None
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            names = names or [column[0] for column in cursor.description]
+            yield [dict(zip(names, row)) for row in rows]
+        cursor.close()
+    finally:
+        connection.close()
 
-            api_data = {}
-            for index, row in df.iterrows():
-                api_id = row['api_id']
-                api_name = row['api_name'] 
-                api_data[api_id] = api_name
-            return api_data
+# Function to return a config reader's rows as a JSON string (None on errors, which the config cache does not keep)
+def get_config_json(reader, key_id, engine, all_rows_if_unset=True):
+    try:
+        rows = [row for chunk in iter_config_row_chunks(reader, key_id, engine, all_rows_if_unset=all_rows_if_unset) for row in chunk]
+        return json_bytes(rows).decode("utf-8")
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error while executing SQL query: {error}")
 
-def get_EndpointsByApiID(api_id,engine):
-    try:
-        # Define the SQL query
-            query = f"""SELECT  * FROM  endpoints e where api_id = {api_id}"""
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
+# Function to stream a config reader's rows as one JSON array, a chunk of rows at a time.
+# The query runs on the first next(), so callers can catch database errors before sending a response.
+def stream_config_json(reader, key_id, engine, chunk_size=1000):
+    chunks = iter_config_row_chunks(reader, key_id, engine, chunk_size)
+    rows = next(chunks, [])
+    yield b"[" + json_bytes(rows)[1:-1]
+    written = bool(rows)
+    for rows in chunks:
+        yield (b"," if written else b"") + json_bytes(rows)[1:-1]
+        written = True
+    yield b"]"
+
 
-            endpoint_data_list = [] 
-            
-            for index, row in df.iterrows():
-                endpoint_data = {}
-                endpoint_data['endpoint_id']  = row['endpoint_id']
-                endpoint_data['endpoint_name']  = row['endpoint_name'] 
-                endpoint_data['endpoint_url']  = row['endpoint_url'] 
-                endpoint_data['http_method'] = row['http_method'] 
-                endpoint_data['description']  = row['description']  
-                endpoint_data_list.append(endpoint_data)
-            # Convert to JSON string
-            json_data = json.dumps(endpoint_data_list) 
-            # URL-encode the JSON string
-            #encoded_endpoint_data = quote(json_data)
-                
-            return json_data
+def get_AllApiList(engine):
+    try:
+        return {row["api_id"]: row["api_name"] for chunk in iter_config_row_chunks("apis", 0, engine) for row in chunk}
     except (Exception, psycopg2.DatabaseError) as error:
         print(f"Error while executing SQL query: {error}")
 
+def get_EndpointsByApiID(api_id,engine):
+    return get_config_json("endpoints_by_api", api_id, engine, all_rows_if_unset=False)
 
 def get_EndpointsByEndpoint_ID(endpoint_id,engine):
-    try:
-        # Define the SQL query
-            if int(endpoint_id) > 0 : 
-                query = f"""SELECT  * FROM  endpoints e where endpoint_id = {endpoint_id}"""
-            else:
-                query = f"""SELECT  * FROM  endpoints"""               
- 
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            endpoint_data_list = [] 
-            for index, row in df.iterrows():
-                endpoint_data = {}
-                endpoint_data['endpoint_id'] = row['endpoint_id']
-                endpoint_data['endpoint_name'] = row['endpoint_name'] 
-                endpoint_data['endpoint_url'] = row['endpoint_url'] 
-                endpoint_data['http_method'] = row['http_method'] 
-                endpoint_data['description'] = row['description']  
-                endpoint_data_list.append(endpoint_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(endpoint_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
+    return get_config_json("endpoints", endpoint_id, engine)
 
 def get_HeadersByEndpoint_ID(endpoint_id,engine):
-    try:
-        # Define the SQL query
-            if int(endpoint_id) > 0 : 
-                query = f"""SELECT  * FROM  headers e where endpoint_id = {endpoint_id}"""
-            else:
-                query = f"""SELECT  * FROM  headers"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            headers_data_list = [] 
-            for index, row in df.iterrows():
-                header_data = {}
-                header_data['header_id'] =  row['header_id']
-                header_data['header_name'] =  row['header_name'] 
-                header_data['header_value'] =  row['header_value']  
-                headers_data_list.append(header_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(headers_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
+    return get_config_json("headers", endpoint_id, engine)
 
 def get_QueryParamsByEndpoint_ID(endpoint_id,engine):
-    try:
-        # Define the SQL query
-            if int(endpoint_id) > 0 : 
-                query = f"""SELECT  * FROM  query_parameters e where endpoint_id = {endpoint_id}"""
-            else:
-                query = f"""SELECT  * FROM  query_parameters"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            parameter_data_list = [] 
-            for index, row in df.iterrows():
-                parameter_data = {}
-                parameter_data['parameter_id'] =  row['parameter_id']
-                parameter_data['parameter_name'] =  row['parameter_name'] 
-                parameter_data['parameter_value'] =  row['parameter_value']  
-                parameter_data_list.append(parameter_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(parameter_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
+    return get_config_json("query_parameters", endpoint_id, engine)
 
 def get_ResponseSchemaByEndpoint_ID(endpoint_id,engine):
-    try:
-        # Define the SQL query
-            if int(endpoint_id) > 0 : 
-                query = f"""SELECT  * FROM  response_schemas e where endpoint_id = {endpoint_id}"""
-            else:
-                query = f"""SELECT  * FROM  response_schemas"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            res_schema_data_list = [] 
-            for index, row in df.iterrows():
-                res_schema_data = {}
-                res_schema_data['schema_id'] =  row['schema_id']
-                res_schema_data['format_type'] =  row['format_type'] 
-                res_schema_data['root_path'] =  row['root_path']  
-                res_schema_data['sample_response'] =  "" # row['sample_response']  
-                res_schema_data_list.append(res_schema_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(res_schema_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
+    return get_config_json("response_schemas", endpoint_id, engine)
 
 def get_ExtractionRulesBySchema_ID(schema_id,engine):
-    try:
-        # Define the SQL query
-            if int(schema_id) > 0 : 
-                query = f"""SELECT  * FROM data_extraction_rules e where schema_id = {schema_id}"""
-            else:
-                query = f"""SELECT  * FROM  data_extraction_rules"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            extraction_data_list = [] 
-            for index, row in df.iterrows():
-                extraction_data = {}
-                extraction_data['extraction_id'] =  row['extraction_id']
-                extraction_data['extraction_path'] =  row['extraction_path'] 
-                extraction_data['description'] =  row['description']    
-                extraction_data_list.append(extraction_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(extraction_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
-
+    return get_config_json("extraction_rules", schema_id, engine)
 
 def get_DataBaseMappingByExtraction_ID(extraction_id,engine):
-    try:
-        # Define the SQL query
-            if int(extraction_id) > 0 : 
-                query = f"""SELECT  * FROM database_mappings e where extraction_id = {extraction_id}"""
-            else:
-                query = f"""SELECT  * FROM  database_mappings"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            databasemapping_data_list = [] 
-            for index, row in df.iterrows():
-                databasemapping_data = {}
-                databasemapping_data['mapping_id'] =  row['mapping_id']
-                databasemapping_data['database_table'] =  row['database_table'] 
-                databasemapping_data['primary_key'] =  row['primary_key']    
-                databasemapping_data_list.append(databasemapping_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(databasemapping_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
-
+    return get_config_json("database_mappings", extraction_id, engine)
 
 def get_FieldMappingByMapping_ID(mapping_id,engine):
-    try:
-        # Define the SQL query
-            if int(mapping_id) > 0 : 
-                query = f"""SELECT  * FROM field_mappings e where mapping_id = {mapping_id}"""
-            else:
-                query = f"""SELECT  * FROM field_mappings"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            field_mappings_data_list = [] 
-            for index, row in df.iterrows():
-                field_mappings_data = {}
-                field_mappings_data['field_mapping_id'] =  row['field_mapping_id']
-                field_mappings_data['api_field_name'] =  row['api_field_name'] 
-                field_mappings_data['database_field_name'] =  row['database_field_name']   
-                field_mappings_data['data_type_conversion'] =  row['data_type_conversion']   
-                field_mappings_data_list.append(field_mappings_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(field_mappings_data_list)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
+    return get_config_json("field_mappings", mapping_id, engine)
 
 def get_TransformationRulesByMapping_ID(mapping_id,engine):
-    try:
-        # Define the SQL query
-            if int(mapping_id) > 0 : 
-                query = f"""SELECT  * FROM transformation_rules e where mapping_id = {mapping_id}"""
-            else:
-                query = f"""SELECT  * FROM transformation_rules"""                
-            # Execute the query and load the data into a Pandas DataFrame
-            with engine.connect() as connection:
-                df = pd.read_sql(query, connection)
-
-            transformation_rules_data_list = [] 
-            for index, row in df.iterrows():
-                transformation_rules_data = {}
-                transformation_rules_data['transformation_id'] =  row['transformation_id']
-                transformation_rules_data['transformation_type'] =  row['transformation_type'] 
-                transformation_rules_data['rule_description'] =  row['rule_description']    
-                transformation_rules_data_list.append(transformation_rules_data)
- 
-            # Convert to JSON string
-            json_data = json.dumps(transformation_rules_data)  
-                
-            return json_data
-    except (Exception, psycopg2.DatabaseError) as error:
-        print(f"Error while executing SQL query: {error}")
-        
+    return get_config_json("transformation_rules", mapping_id, engine)
+
+
+ENDPOINT_CHILD_QUERIES = {
+    "headers": "SELECT endpoint_id, header_id, header_name, header_value FROM headers WHERE endpoint_id = ANY(:ids) ORDER BY header_id",
+    "query_parameters": "SELECT endpoint_id, parameter_id, parameter_name, parameter_value, is_dynamic FROM query_parameters WHERE endpoint_id = ANY(:ids) ORDER BY parameter_id",
+    "pagination_settings": "SELECT endpoint_id, pagination_id, pagination_type, page_parameter, limit_parameter, next_page_indicator, termination_condition FROM pagination_settings WHERE endpoint_id = ANY(:ids) ORDER BY pagination_id",
+    "error_handling_configurations": "SELECT endpoint_id, error_config_id, retry_attempts, retry_delay, error_codes_to_retry FROM error_handling_configurations WHERE endpoint_id = ANY(:ids) ORDER BY error_config_id",
+    "scheduling_configurations": "SELECT endpoint_id, schedule_id, frequency, cron_expression, last_run_time FROM scheduling_configurations WHERE endpoint_id = ANY(:ids) ORDER BY schedule_id",
+    "request_bodies": "SELECT endpoint_id, body_id, content_type, body_template, dynamic_fields FROM request_bodies WHERE endpoint_id = ANY(:ids) ORDER BY body_id",
+    "response_schemas": "SELECT endpoint_id, schema_id, format_type, root_path FROM response_schemas WHERE endpoint_id = ANY(:ids) ORDER BY schema_id"
+}
+
+# Function to group rows (dicts) by one of their columns, removing that column from each row
+def group_rows_by(rows, column):
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.pop(column), []).append(row)
+    return groups
+
+# Function to return the full nested configuration of many endpoints:
+# endpoint -> headers, query parameters, pagination, error handling, scheduling, request bodies and
+# response schemas -> extraction rules -> database mappings -> field mappings and transformation rules.
+# Every level is fetched for all endpoints at once with = ANY(ids), so the number of queries is fixed
+# no matter how many endpoints or sub-objects there are. Unknown endpoint ids are left out.
+def get_endpoint_graphs(endpoint_ids, engine, include_sample_response=False):
+    endpoint_ids = [int(endpoint_id) for endpoint_id in endpoint_ids]
+    def fetch(connection, query, ids):
+        if not ids:
+            return []
+        return [dict(row._mapping) for row in connection.execute(text(query), {"ids": list(ids)})]
+    with engine.connect() as connection:
+        endpoints = fetch(connection, "SELECT endpoint_id, api_id, endpoint_name, endpoint_url, http_method, description FROM endpoints WHERE endpoint_id = ANY(:ids)", endpoint_ids)
+        found_ids = [endpoint["endpoint_id"] for endpoint in endpoints]
+        children = {name: group_rows_by(fetch(connection, query, found_ids), "endpoint_id") for name, query in ENDPOINT_CHILD_QUERIES.items()}
+        if include_sample_response:
+            samples = {row["schema_id"]: row["sample_response"] for row in fetch(connection, "SELECT schema_id, sample_response FROM response_schemas WHERE endpoint_id = ANY(:ids)", found_ids)}
+        schema_ids = [schema["schema_id"] for schemas in children["response_schemas"].values() for schema in schemas]
+        rules = group_rows_by(fetch(connection, "SELECT schema_id, extraction_id, extraction_path, description FROM data_extraction_rules WHERE schema_id = ANY(:ids) ORDER BY extraction_id", schema_ids), "schema_id")
+        extraction_ids = [rule["extraction_id"] for schema_rules in rules.values() for rule in schema_rules]
+        mappings = group_rows_by(fetch(connection, "SELECT extraction_id, mapping_id, database_table, primary_key FROM database_mappings WHERE extraction_id = ANY(:ids) ORDER BY mapping_id", extraction_ids), "extraction_id")
+        mapping_ids = [mapping["mapping_id"] for extraction_mappings in mappings.values() for mapping in extraction_mappings]
+        field_mappings = group_rows_by(fetch(connection, "SELECT mapping_id, field_mapping_id, api_field_name, database_field_name, data_type_conversion, is_nullable FROM field_mappings WHERE mapping_id = ANY(:ids) ORDER BY field_mapping_id", mapping_ids), "mapping_id")
+        transformation_rules = group_rows_by(fetch(connection, "SELECT mapping_id, transformation_id, transformation_type, rule_description FROM transformation_rules WHERE mapping_id = ANY(:ids) ORDER BY transformation_id", mapping_ids), "mapping_id")
+
+    for extraction_mappings in mappings.values():
+        for mapping in extraction_mappings:
+            mapping["field_mappings"] = field_mappings.get(mapping["mapping_id"], [])
+            mapping["transformation_rules"] = transformation_rules.get(mapping["mapping_id"], [])
+    for schema_rules in rules.values():
+        for rule in schema_rules:
+            rule["database_mappings"] = mappings.get(rule["extraction_id"], [])
+    for schemas in children["response_schemas"].values():
+        for schema in schemas:
+            schema["sample_response"] = samples.get(schema["schema_id"]) if include_sample_response else ""
+            schema["data_extraction_rules"] = rules.get(schema["schema_id"], [])
+    graphs = {}
+    for endpoint in endpoints:
+        for name in ENDPOINT_CHILD_QUERIES:
+            endpoint[name] = children[name].get(endpoint["endpoint_id"], [])
+        graphs[endpoint["endpoint_id"]] = endpoint
+    return [graphs[endpoint_id] for endpoint_id in dict.fromkeys(endpoint_ids) if endpoint_id in graphs]
 
 def update_endpoints(db_conn_url,endpoint_id,endpoint_name, endpoint_url,http_method,description):
      try:
@@ -418,12 +324,71 @@ def get_value_by_path(data, path):
         data = data.get(key, {})
     return data
 
-def process_json_response_from_endpoint(sql_table, extraction_path, json_response,db_conn_url):
+# Function to format one value as a CSV field for COPY: None stays unquoted (NULL), everything else is quoted
+# so empty strings are kept, and nested JSON objects/arrays are stored as JSON text
+def format_copy_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+# Function to stream rows into a table with COPY ... FROM STDIN, chunk_size rows per COPY
+def copy_rows_into_table(cursor, table_name, column_names, rows, chunk_size=10000):
+    columns = ', '.join(column_names)
+    copy_sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    buffered = 0
+    copied = 0
+    for values in rows:
+        buffer.write(','.join(format_copy_value(value) for value in values))
+        buffer.write('\n')
+        buffered += 1
+        if buffered >= chunk_size:
+            buffer.seek(0)
+            cursor.copy_expert(copy_sql, buffer)
+            copied += buffered
+            buffer = io.StringIO()
+            buffered = 0
+    if buffered:
+        buffer.seek(0)
+        cursor.copy_expert(copy_sql, buffer)
+        copied += buffered
+    return copied
+
+# Generator that turns JSON items into column value lists, numbering rows that have no primary key
+# pk_counter is a one element list so the numbering carries over between calls (e.g. across pages)
+def iter_item_values(items, column_names, pk_counter):
+    for item in items:
+        # Extract the values for each column from the JSON response
+        values = [item.get(column) for column in column_names]
+        if values[0] is None:
+            values[0] = pk_counter[0]
+            pk_counter[0] = pk_counter[0] + 1
+        yield values
+
+# Function to load JSON items into the mapped table, with COPY when bulk is True or row by row otherwise
+def load_items_into_table(cursor, table_name, column_names, items, pk_counter, bulk=True, chunk_size=10000):
+    rows = iter_item_values(items, column_names, pk_counter)
+    if bulk:
+        return copy_rows_into_table(cursor, table_name, column_names, rows, chunk_size)
+    loaded = 0
+    for values in rows:
+        insert_data_into_dynamic_table(cursor, table_name, column_names, values)
+        loaded += 1
+    return loaded
+
+# Function to parse the table name and column names from a CREATE TABLE statement
+def parse_table_columns(sql_table):
+    table_name = sql_table.split()[2]
+    column_definitions = sql_table.split('(')[1].strip(');').split(',')
+    column_names = [col.split()[0] for col in column_definitions]
+    return table_name, column_names
+
+def process_json_response_from_endpoint(sql_table, extraction_path, json_response,db_conn_url,bulk=True,chunk_size=10000):
     try:
         # Parse the SQL table name and columns from the SQL string
-        table_name = sql_table.split()[2]
-        column_definitions = sql_table.split('(')[1].strip(');').split(',')
-        column_names = [col.split()[0] for col in column_definitions]
+        table_name, column_names = parse_table_columns(sql_table)
         #print(column_names)
         # Parse JSON response
         data = json.loads(json_response)
@@ -434,19 +399,13 @@ def process_json_response_from_endpoint(sql_table, extraction_path, json_respons
         # Connect to PostgreSQL
         conn = psycopg2.connect(db_conn_url)
         cursor = conn.cursor()   
-        # Iterate over the JSON data and insert into the SQL table
-        pk_id = 1
-        for item in data_list:
-        #     # Extract the values for each column from the JSON response
-             values = [item.get(column) for column in column_names] 
-             if values[0] is None:
-                values[0] = pk_id
-                pk_id = pk_id + 1 
-             #print(values)
-             insert_data_into_dynamic_table(cursor, table_name, column_names, values)
+        # Load the JSON data into the SQL table (COPY in bulk mode, one INSERT per item otherwise)
+        pk_counter = [1]
+        loaded = load_items_into_table(cursor, table_name, column_names, data_list, pk_counter, bulk, chunk_size)
              
         # # Commit the changes and query the table for demonstration
         conn.commit()
+        print(f"Loaded {loaded} rows into {table_name}")
+        return loaded
     except Exception as e:
         print(f"Error in process_json_response_from_endpoint: {e}")
-    
\ No newline at end of file
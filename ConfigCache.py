@@ -0,0 +1,114 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from sqlalchemy import text
+
+# Function to create the single-row table holding the configuration version stamp
+def ensure_config_version_table(connection):
+    connection.execute(text("CREATE TABLE IF NOT EXISTS config_version (id INTEGER PRIMARY KEY, version BIGINT NOT NULL)"))
+    connection.execute(text("INSERT INTO config_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"))
+
+
+# Process-local read-through cache for API/endpoint configuration (endpoints, headers, query parameters,
+# schemas, extraction rules, mappings, ingest configs), keyed by (reader name, id).
+# Writers bump a version stamp in Postgres through invalidate(); every worker compares the stamp at most once
+# per version_check_seconds and drops its whole cache when it moved, so config reads are memory lookups that
+# are never more than version_check_seconds stale in other workers (and immediately fresh in the writer).
+# on_change callbacks let other per-process caches (rate limiters, retry policies) follow the same stamp.
+class ConfigCache:
+    def __init__(self, engine, version_check_seconds=1.0, max_size=10000):
+        self.engine = engine
+        self.version_check_seconds = version_check_seconds
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+        self.generation = 0
+        self.callbacks = []
+        self.table_ready = False
+        self.hits = 0
+        self.misses = 0
+
+    def on_change(self, callback):
+        self.callbacks.append(callback)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.generation += 1
+        for callback in self.callbacks:
+            callback()
+
+    def read_version(self):
+        with self.engine.begin() as connection:
+            if not self.table_ready:
+                ensure_config_version_table(connection)
+                self.table_ready = True
+            return connection.execute(text("SELECT version FROM config_version WHERE id = 1")).scalar()
+
+    # Function to drop the cache when another worker changed the configuration since the last check
+    def check_version(self):
+        if time.monotonic() - self.checked_at < self.version_check_seconds:
+            return
+        try:
+            version = self.read_version()
+        except Exception as e:
+            print(f"Could not read the config version, clearing the config cache: {e}")
+            version = None
+        self.checked_at = time.monotonic()
+        if version is None or version != self.version:
+            self.version = version
+            self.clear()
+
+    # Function to return the cached value of reader(key), calling loader() only on a miss
+    # None results (the readers return None on errors) are not cached
+    def get(self, reader, key, loader):
+        self.check_version()
+        cache_key = (reader, str(key))
+        with self.lock:
+            if cache_key in self.entries:
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                return self.entries[cache_key]
+            self.misses += 1
+            generation = self.generation
+        value = loader()
+        if value is not None:
+            with self.lock:
+                # a change that landed while loading makes this value stale, so it is not kept
+                if generation == self.generation:
+                    self.entries[cache_key] = value
+                    while len(self.entries) > self.max_size:
+                        self.entries.popitem(last=False)
+        return value
+
+    # Function to record a configuration change: bump the version stamp for every worker and clear this one
+    def invalidate(self):
+        try:
+            with self.engine.begin() as connection:
+                if not self.table_ready:
+                    ensure_config_version_table(connection)
+                    self.table_ready = True
+                self.version = connection.execute(text("UPDATE config_version SET version = version + 1 WHERE id = 1 RETURNING version")).scalar()
+        except Exception as e:
+            print(f"Could not bump the config version: {e}")
+        self.checked_at = time.monotonic()
+        self.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Function to build the config cache from config.env (config_cache_check_seconds, config_cache_max_size)
+def create_config_cache(engine):
+    return ConfigCache(engine, float(os.getenv('config_cache_check_seconds', 1)), int(os.getenv('config_cache_max_size', 10000)))
@@ -1,5 +1,5 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Text , ForeignKey , Boolean , DateTime
+from sqlalchemy import Column, Integer, String, Text , ForeignKey , Boolean , DateTime , insert
 import logging
 from sqlalchemy.exc import SQLAlchemyError
 Base = declarative_base()
@@ -125,7 +125,8 @@ class DatabaseMapping(Base):
 class FieldMapping(Base):
     __tablename__ = 'field_mappings'
     
-    mapping_id = Column(Integer, primary_key=True)
+    field_mapping_id = Column(Integer, primary_key=True)
+    mapping_id = Column(Integer, ForeignKey('database_mappings.mapping_id'), nullable=False)
     api_field_name = Column(String(100), nullable=False)
     database_field_name = Column(String(100), nullable=False)
     data_type_conversion = Column(String(50), nullable=True)
@@ -136,7 +137,7 @@ class TransformationRule(Base):
     __tablename__ = 'transformation_rules'
     
     transformation_id = Column(Integer, primary_key=True)
-    mapping_id = Column(Integer, ForeignKey('field_mappings.mapping_id'), nullable=False)
+    mapping_id = Column(Integer, ForeignKey('database_mappings.mapping_id'), nullable=False)
     transformation_type = Column(String(50), nullable=False)
     rule_description = Column(Text, nullable=False) 
 
@@ -167,7 +168,8 @@ def add_record(record, obj_name, Session):
                 'ErrorHandling': 'error_config_id',
                 'Scheduling': 'schedule_id',
                 'DataExtractionRule': 'extraction_id',
-                'DatabaseMapping': 'mapping_id'
+                'DatabaseMapping': 'mapping_id',
+                'FieldMapping': 'field_mapping_id'
             }.get(obj_name, 'id')  # Default to 'id' if obj_name is not found
             
             return getattr(record, primary_key_attr)
@@ -325,6 +327,42 @@ def add_new_field_mapping(mapping_id, api_field_name, database_field_name, data_
     )
     return add_record(new_field_mapping, 'FieldMapping',Session)
 
+# Function to build field_mappings rows for a database mapping from explicit mappings (which may carry their
+# own mapping_id) and from the field names found in the endpoint's response (stored as nullable-false TEXT)
+def build_field_mapping_rows(mapping_id, field_mappings=(), response_field_keys=()):
+    rows = [{
+        "mapping_id": mapping.get('mapping_id', mapping_id),
+        "api_field_name": mapping.get('api_field_name'),
+        "database_field_name": mapping.get('database_field_name'),
+        "data_type_conversion": mapping.get('data_type_conversion'),
+        "is_nullable": mapping.get('is_nullable')
+    } for mapping in field_mappings]
+    rows.extend({"mapping_id": mapping_id, "api_field_name": field, "database_field_name": field,
+                 "data_type_conversion": 'TEXT', "is_nullable": False} for field in response_field_keys)
+    return rows
+
+# Function to insert field mapping rows with multi-row INSERT ... VALUES ... RETURNING statements in the caller's session
+# Rows are sent in chunks so wide payloads stay well below Postgres' bind parameter limit; returns the inserted ids
+def insert_field_mapping_rows(session, rows, chunk_size=1000):
+    ids = []
+    for start in range(0, len(rows), chunk_size):
+        statement = insert(FieldMapping).values(rows[start:start + chunk_size]).returning(FieldMapping.field_mapping_id)
+        ids.extend(row[0] for row in session.execute(statement))
+    return ids
+
+# Function to add all field mappings of a database mapping in one statement and one commit; returns the ids
+def add_new_field_mappings(mapping_id, field_mappings, Session, response_field_keys=()):
+    rows = build_field_mapping_rows(mapping_id, field_mappings, response_field_keys)
+    with Session() as session:
+        try:
+            ids = insert_field_mapping_rows(session, rows)
+            session.commit()
+            return ids
+        except SQLAlchemyError as e:
+            logging.error(f"Database error while adding field mappings: {e}")
+            session.rollback()
+            raise
+
 def add_new_transformation_rule(mapping_id, transformation_type, rule_description,Session):
     new_transformation_rule = TransformationRule(
         mapping_id=mapping_id,
@@ -333,6 +371,144 @@ def add_new_transformation_rule(mapping_id, transformation_type, rule_descriptio
     )
     return add_record(new_transformation_rule, 'TransformationRule',Session)
 
+# Function to register complete API definitions (API -> endpoint -> auth, rate limits, headers, query parameters,
+# schema, error handling, scheduling, request body, pagination -> extraction rule -> database mapping -> field
+# mappings, transformation rule, feature) in one transaction. The rows of every registration are added level by
+# level and each level is flushed once, so SQLAlchemy batches the inserts of a table into a single statement and
+# the number of round trips does not grow with the number of APIs. Nothing is committed if any row fails.
+# Each registration holds the AddNewApiEndpoints sections plus 'sample_response' and 'response_field_keys'.
+def register_api_graphs(registrations, Session):
+    with Session() as session:
+        try:
+            apis = [API(
+                api_name=r['apis']['api_name'],
+                base_url=r['apis'].get('base_url'),
+                description=r['apis'].get('description'),
+                documentation_link=r['apis'].get('documentation_link')
+            ) for r in registrations]
+            session.add_all(apis)
+            session.flush()
+
+            endpoints = []
+            for r, api in zip(registrations, apis):
+                endpoints.append(Endpoint(
+                    api_id=api.api_id,
+                    endpoint_name=r['endpoints']['endpoint_name'],
+                    endpoint_url=r['endpoints']['endpoint_url'],
+                    http_method=r['endpoints']['http_method'],
+                    description=r['endpoints']['description']
+                ))
+                session.add(AuthenticationMethod(
+                    api_id=api.api_id,
+                    auth_method=r['authentication_methods']['auth_method'],
+                    credentials=r['authentication_methods']['credentials'],
+                    token_endpoint=r['authentication_methods']['token_endpoint'],
+                    token_expiry=r['authentication_methods']['token_expiry'],
+                    refresh_logic=r['authentication_methods']['refresh_logic']
+                ))
+                session.add(RateLimitingSettings(
+                    api_id=api.api_id,
+                    max_requests=r['rate_limiting_settings']['max_requests'],
+                    time_window=r['rate_limiting_settings']['time_window'],
+                    throttling_strategy=r['rate_limiting_settings']['throttling_strategy']
+                ))
+            session.add_all(endpoints)
+            session.flush()
+
+            schemas = []
+            for r, endpoint in zip(registrations, endpoints):
+                endpoint_id = endpoint.endpoint_id
+                session.add_all([
+                    Header(endpoint_id=endpoint_id, header_name=str(r['headers']['header_name']), header_value=str(r['headers']['header_value'])),
+                    QueryParameter(
+                        endpoint_id=endpoint_id,
+                        parameter_name=r['query_parameters']['parameter_name'],
+                        parameter_value=r['query_parameters']['parameter_value'],
+                        is_dynamic=r['query_parameters']['is_dynamic']
+                    ),
+                    ErrorHandlingConfiguration(
+                        endpoint_id=endpoint_id,
+                        retry_attempts=r['error_handling_configurations']['retry_attempts'],
+                        retry_delay=r['error_handling_configurations']['retry_delay'],
+                        error_codes_to_retry=r['error_handling_configurations']['error_codes_to_retry']
+                    ),
+                    SchedulingConfiguration(
+                        endpoint_id=endpoint_id,
+                        frequency=r['scheduling_configurations']['frequency'],
+                        cron_expression=r['scheduling_configurations']['cron_expression'],
+                        last_run_time=r['scheduling_configurations']['last_run_time']
+                    ),
+                    RequestBody(
+                        endpoint_id=endpoint_id,
+                        content_type=r['request_bodies']['content_type'],
+                        body_template=r['request_bodies']['body_template'],
+                        dynamic_fields=r['request_bodies']['dynamic_fields']
+                    ),
+                    PaginationSettings(
+                        endpoint_id=endpoint_id,
+                        pagination_type=r['pagination_settings']['pagination_type'],
+                        page_parameter=r['pagination_settings']['page_parameter'],
+                        limit_parameter=r['pagination_settings']['limit_parameter'],
+                        next_page_indicator=r['pagination_settings'].get('next_page_indicator'),
+                        termination_condition=r['pagination_settings'].get('termination_condition')
+                    )
+                ])
+                schemas.append(ResponseSchema(
+                    endpoint_id=endpoint_id,
+                    format_type=r['response_schemas']['format_type'],
+                    root_path=r['response_schemas']['root_path'],
+                    sample_response=r['sample_response']
+                ))
+            session.add_all(schemas)
+            session.flush()
+
+            rules = [DataExtractionRule(
+                schema_id=schema.schema_id,
+                extraction_path=r['data_extraction_rules']['extraction_path'],
+                description=r['data_extraction_rules'].get('description')
+            ) for r, schema in zip(registrations, schemas)]
+            session.add_all(rules)
+            session.flush()
+
+            mappings = [DatabaseMapping(
+                extraction_id=rule.extraction_id,
+                database_table=r['database_mappings']['database_table'],
+                primary_key=r['database_mappings']['primary_key']
+            ) for r, rule in zip(registrations, rules)]
+            session.add_all(mappings)
+            session.flush()
+
+            # field mappings of every registration go in through multi-row inserts
+            field_rows = []
+            for r, mapping in zip(registrations, mappings):
+                field_rows.extend(build_field_mapping_rows(mapping.mapping_id, r.get('field_mappings', []), r.get('response_field_keys', [])))
+            insert_field_mapping_rows(session, field_rows)
+
+            for r, mapping in zip(registrations, mappings):
+                session.add(TransformationRule(
+                    mapping_id=mapping.mapping_id,
+                    transformation_type=r['transformation_rules']['transformation_type'],
+                    rule_description=r['transformation_rules']['rule_description']
+                ))
+                session.add(PatentCoachFunctionFeature(
+                    name=r['patent_coach_function_features']['name'],
+                    column_2=r['patent_coach_function_features'].get('column_2'),
+                    column_3=r['patent_coach_function_features'].get('column_3'),
+                    notes=r['patent_coach_function_features'].get('notes')
+                ))
+            session.commit()
+            return [{
+                "api_id": api.api_id,
+                "endpoint_id": endpoint.endpoint_id,
+                "schema_id": schema.schema_id,
+                "extraction_id": rule.extraction_id,
+                "mapping_id": mapping.mapping_id
+            } for api, endpoint, schema, rule, mapping in zip(apis, endpoints, schemas, rules, mappings)]
+        except Exception as e:
+            session.rollback()
+            logging.error(f"Registration rolled back: {e}")
+            raise
+
 def add_new_feature(name, column_2, column_3, notes,Session):
     new_feature = PatentCoachFunctionFeature(
         name=name,
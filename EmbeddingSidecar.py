@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import time
+import fcntl
+import socket
+import struct
+import threading
+import subprocess
+import socketserver
+import numpy as np
+from MicroBatching import create_query_encoder
+
+# Wire format on the Unix socket: every message is a 4-byte big-endian length followed by the payload.
+# Request payload: JSON {"texts": [...], "batch_size": n, "priority": "query" | "bulk"}
+# Response: a JSON header {"shape": [rows, dim]} (or {"error": "..."}) then, when ok, rows * dim float32 values
+
+def send_message(sock, payload):
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+def recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding sidecar closed the connection")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def recv_message(sock):
+    size = struct.unpack(">I", recv_exact(sock, 4))[0]
+    return recv_exact(sock, size)
+
+
+class EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                request = json.loads(recv_message(self.request))
+            except (ConnectionError, struct.error):
+                return
+            try:
+                vectors = self.server.encode(request["texts"], request.get("batch_size", 32), request.get("priority", "query"))
+                send_message(self.request, json.dumps({"shape": list(vectors.shape)}).encode("utf-8"))
+                send_message(self.request, vectors.tobytes())
+            except Exception as e:
+                send_message(self.request, json.dumps({"error": str(e)}).encode("utf-8"))
+
+
+# Lock around the model that serves query encodes first: a bulk (index) encode only takes it while no
+# query is waiting, so queries wait for at most one bulk slice instead of a whole indexing batch.
+# Used as a context manager it takes the lock with query priority.
+class PriorityModelLock:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.busy = False
+        self.queries_waiting = 0
+
+    def acquire(self, bulk=False):
+        with self.condition:
+            if not bulk:
+                self.queries_waiting += 1
+            try:
+                while self.busy or (bulk and self.queries_waiting):
+                    self.condition.wait()
+            finally:
+                if not bulk:
+                    self.queries_waiting -= 1
+            self.busy = True
+
+    def release(self):
+        with self.condition:
+            self.busy = False
+            self.condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+# Embedding server holding the only copy of the model on the host; every gunicorn worker encodes through it.
+# Each connection is served on its own thread and model calls are serialized, so concurrent requests queue
+# for one forward pass at a time instead of oversubscribing the CPU; small requests from all workers are
+# merged into micro-batches first, so single-query encodes from different workers share forward passes.
+# Bulk requests (index builds) are encoded in slices of embedding_sidecar_bulk_slice texts and queries go
+# ahead of the next slice, so indexing does not add its whole batch to query latency.
+class EmbeddingSidecarServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, model):
+        self.model = model
+        self.model_lock = PriorityModelLock()
+        self.bulk_slice_size = int(os.getenv('embedding_sidecar_bulk_slice', 32))
+        self.batcher = create_query_encoder(model, self.model_lock)
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, EmbeddingRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def encode(self, texts, batch_size, priority="query"):
+        if priority == "bulk":
+            return self.encode_bulk(texts, batch_size)
+        if self.batcher is not self.model:
+            return np.ascontiguousarray(self.batcher.encode(texts, batch_size=batch_size), dtype=np.float32)
+        with self.model_lock:
+            return np.ascontiguousarray(self.model.encode(texts, batch_size=batch_size), dtype=np.float32)
+
+    def encode_bulk(self, texts, batch_size):
+        slices = []
+        for start in range(0, len(texts), self.bulk_slice_size):
+            self.model_lock.acquire(bulk=True)
+            try:
+                slices.append(np.asarray(self.model.encode(texts[start:start + self.bulk_slice_size], batch_size=batch_size), dtype=np.float32))
+            finally:
+                self.model_lock.release()
+        if not slices:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.ascontiguousarray(np.concatenate(slices))
+
+
+# Client used by the app workers in place of the model: encode() has the same shape contract as
+# SentenceTransformer.encode (a list gives a 2-D array, a single text a 1-D one). Each thread keeps its own
+# connection and reconnects once if the sidecar was restarted; with autostart a sidecar that stays
+# unreachable is started again. Only a missing socket or a refused/dropped connection counts as a dead
+# sidecar: a request that times out is raised to the caller, never re-sent. bulk_encoder() returns the
+# client index builds use (bulk priority), which waits bulk_timeout seconds (None: no limit).
+class SidecarEncoder:
+    def __init__(self, socket_path, timeout=60, priority="query", autostart=False, start_timeout=120, bulk_timeout=None):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.priority = priority
+        self.autostart = autostart
+        self.start_timeout = start_timeout
+        self.bulk_timeout = bulk_timeout
+        self.local = threading.local()
+        self.bulk = None
+
+    def bulk_encoder(self):
+        if self.bulk is None:
+            self.bulk = SidecarEncoder(self.socket_path, self.bulk_timeout, "bulk", self.autostart, self.start_timeout, self.bulk_timeout)
+        return self.bulk
+
+    def connection(self):
+        sock = getattr(self.local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self.local.sock = sock
+        return sock
+
+    def close(self):
+        sock = getattr(self.local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self.local.sock = None
+
+    def request(self, texts, batch_size):
+        sock = self.connection()
+        try:
+            send_message(sock, json.dumps({"texts": texts, "batch_size": batch_size, "priority": self.priority}).encode("utf-8"))
+            header = json.loads(recv_message(sock))
+            if "error" in header:
+                raise RuntimeError(f"Embedding sidecar failed: {header['error']}")
+            return np.frombuffer(recv_message(sock), dtype=np.float32).reshape(header["shape"])
+        except OSError:
+            # the reply to a timed out or broken request may still arrive on this connection, so it is not reused
+            self.close()
+            raise
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        try:
+            vectors = self.request(texts, batch_size)
+        except (ConnectionError, FileNotFoundError):
+            try:
+                vectors = self.request(texts, batch_size)
+            except (ConnectionError, FileNotFoundError):
+                if not self.autostart:
+                    raise
+                # the sidecar died after startup: start a new one (one worker spawns it, the others wait) and retry
+                start_embedding_sidecar(self.socket_path, self.start_timeout)
+                vectors = self.request(texts, batch_size)
+        return vectors[0] if single else vectors
+
+    def ping(self):
+        try:
+            self.request(["ping"], 32)
+            return True
+        except Exception:
+            self.close()
+            return False
+
+
+# Function to start the sidecar in the background unless one is already serving the socket.
+# A lock file makes sure only one of the gunicorn workers starting together spawns it.
+def start_embedding_sidecar(socket_path, wait_seconds=120, bulk_timeout=None):
+    client = SidecarEncoder(socket_path, autostart=True, start_timeout=wait_seconds, bulk_timeout=bulk_timeout)
+    if client.ping():
+        return client
+    with open(socket_path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if not client.ping():
+                script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EmbeddingSidecar.py")
+                subprocess.Popen([sys.executable, script], start_new_session=True)
+                deadline = time.monotonic() + wait_seconds
+                while not client.ping():
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Embedding sidecar did not start on {socket_path}")
+                    time.sleep(0.5)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return client
+
+# Function to return the encoder the app should use: with encoder_mode=sidecar the workers share the
+# sidecar's model (started on demand when embedding_sidecar_autostart is true), otherwise the model is loaded here
+def load_shared_encoder(model_name):
+    from Encoders import load_encoder
+    if os.getenv('encoder_mode', 'local').lower() != 'sidecar':
+        return load_encoder(model_name)
+    socket_path = os.getenv('embedding_socket_path', '/tmp/vectorapi-embedding.sock')
+    # index builds can send far more text than a query, 0 lets them wait as long as the sidecar needs
+    bulk_timeout = float(os.getenv('embedding_sidecar_bulk_timeout', 0)) or None
+    if os.getenv('embedding_sidecar_autostart', 'true').lower() == 'true':
+        return start_embedding_sidecar(socket_path, int(os.getenv('embedding_sidecar_start_timeout', 120)), bulk_timeout)
+    return SidecarEncoder(socket_path, bulk_timeout=bulk_timeout)
+
+
+# Run the sidecar: python EmbeddingSidecar.py
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from Encoders import load_encoder
+    load_dotenv('config.env')
+    socket_path = os.getenv('embedding_socket_path', '/tmp/vectorapi-embedding.sock')
+    model_name = os.getenv('transformer_model_name', 'all-MiniLM-L6-v2')
+    server = EmbeddingSidecarServer(socket_path, load_encoder(model_name))
+    print(f"Embedding sidecar serving {model_name} on {socket_path}")
+    server.serve_forever()
@@ -0,0 +1,83 @@
+import os
+import math
+import atexit
+import threading
+
+# Encoder that spreads model.encode() over a pool of worker processes (SentenceTransformer.start_multi_process_pool).
+# Texts are cut into one contiguous chunk per worker and encode_multi_process returns the embeddings in input
+# order, so callers can zip them back onto their ids exactly as with model.encode(). Each worker gets an equal
+# share of the cores for its torch threads so the pool does not oversubscribe the CPU. Calls are serialized
+# because the pool's input and output queues are shared; small inputs skip the pool and encode in-process.
+class MultiProcessEncoder:
+    def __init__(self, model, workers, min_texts_per_worker=64):
+        self.model = model
+        self.workers = workers
+        self.min_texts_per_worker = min_texts_per_worker
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.pool is None:
+            threads_per_worker = str(max(1, (os.cpu_count() or 1) // self.workers))
+            saved = {name: os.environ.get(name) for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS")}
+            # worker processes are spawned fresh and read their torch thread count from the environment
+            os.environ.update({name: threads_per_worker for name in saved})
+            try:
+                self.pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+            finally:
+                for name, value in saved.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+        return self.pool
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        if len(texts) < self.workers * self.min_texts_per_worker:
+            return self.model.encode(texts, batch_size=batch_size, **kwargs)
+        with self.lock:
+            pool = self.start()
+            chunk_size = math.ceil(len(texts) / self.workers)
+            return self.model.encode_multi_process(texts, pool, batch_size=batch_size, chunk_size=chunk_size)
+
+    def close(self):
+        with self.lock:
+            if self.pool is not None:
+                self.model.stop_multi_process_pool(self.pool)
+                self.pool = None
+
+
+multi_process_encoders = {}
+multi_process_encoders_lock = threading.Lock()
+
+# Function to return the shared multi-process encoder of a model, or the model itself when
+# embedding_workers (config.env) is below 2 or the model has no process pool (ONNX Runtime already uses every core);
+# 'auto' uses one worker per core; an embedding sidecar client is switched to bulk priority instead
+def get_index_encoder(model, model_name):
+    if hasattr(model, "bulk_encoder"):
+        return model.bulk_encoder()
+    workers = os.getenv('embedding_workers', '0').strip().lower()
+    workers = (os.cpu_count() or 1) if workers == 'auto' else int(workers or 0)
+    if workers < 2 or not hasattr(model, "start_multi_process_pool"):
+        return model
+    with multi_process_encoders_lock:
+        encoder = multi_process_encoders.get((model_name, workers))
+        if encoder is None:
+            encoder = MultiProcessEncoder(model, workers, int(os.getenv('embedding_min_texts_per_worker', 64)))
+            multi_process_encoders[(model_name, workers)] = encoder
+        return encoder
+
+# Function to return how many rows to fetch and encode per round for an encoder: the worker pool
+# needs blocks large enough to keep every process busy, while upserts stay at batch_size
+def get_encode_block_size(encoder, batch_size):
+    if isinstance(encoder, MultiProcessEncoder):
+        return max(batch_size, int(os.getenv('embedding_block_size', batch_size * encoder.workers * 8)))
+    return batch_size
+
+def close_index_encoders():
+    with multi_process_encoders_lock:
+        for encoder in multi_process_encoders.values():
+            encoder.close()
+        multi_process_encoders.clear()
+
+atexit.register(close_index_encoders)
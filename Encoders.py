@@ -0,0 +1,188 @@
+import os
+import json
+import fcntl
+import shutil
+import tempfile
+import numpy as np
+try:
+    import onnxruntime
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+except ImportError:  # the onnx backend needs onnxruntime, encoding falls back to the PyTorch model
+    onnxruntime = None
+
+VALIDATION_TEXTS = [
+    "How do I reset my password?",
+    "Quarterly revenue grew 12% compared to last year",
+    "user_id 42 | status active | plan premium | country DE",
+    "The quick brown fox jumps over the lazy dog",
+    "Order 1001 shipped to 221B Baker Street, London",
+    "Error 503: service temporarily unavailable, retry later",
+    "a",
+    "Sentence embeddings map text to dense vectors for semantic search and clustering tasks across many domains"
+]
+
+# Function to read how a SentenceTransformer pools token embeddings and whether it normalizes the result
+def get_pooling_config(model):
+    config = {"mode": "mean", "normalize": False, "max_seq_length": model.max_seq_length}
+    for module in model:
+        if hasattr(module, "pooling_mode_cls_token"):
+            if module.pooling_mode_cls_token:
+                config["mode"] = "cls"
+            elif module.pooling_mode_max_tokens:
+                config["mode"] = "max"
+        if type(module).__name__ == "Normalize":
+            config["normalize"] = True
+    return config
+
+# Function to write a JSON file under a temporary name and move it into place, so readers never see it half written
+def write_json_file(path, value):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(value, f)
+    os.replace(tmp_path, path)
+
+def read_json_file(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+# Function to export a SentenceTransformer's transformer to onnx_dir/model.onnx (plus model-int8.onnx when quantize)
+# together with its tokenizer and pooling config, so later loads need neither torch nor the original model.
+# The files are written to a scratch directory and moved into onnx_dir with os.replace, the .onnx files last,
+# so onnx_dir never holds a partially written file and a model file is only there once everything it needs is.
+def export_onnx_model(model, onnx_dir, quantize=True):
+    import torch
+    os.makedirs(onnx_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".export-", dir=onnx_dir)
+    try:
+        transformer = model[0].auto_model.eval()
+        tokenizer = model.tokenizer
+        sample = tokenizer(["export sample"], padding=True, return_tensors="pt")
+        input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+        model_path = os.path.join(work_dir, "model.onnx")
+        with torch.no_grad():
+            torch.onnx.export(transformer, tuple(sample[name] for name in input_names), model_path,
+                              input_names=input_names, output_names=["last_hidden_state"],
+                              dynamic_axes=dynamic_axes, opset_version=14)
+        if quantize:
+            quantize_dynamic(model_path, os.path.join(work_dir, "model-int8.onnx"), weight_type=QuantType.QInt8)
+        tokenizer.save_pretrained(work_dir)
+        with open(os.path.join(work_dir, "pooling.json"), "w") as f:
+            json.dump(get_pooling_config(model), f)
+        for name in sorted(os.listdir(work_dir), key=lambda name: name.endswith(".onnx")):
+            os.replace(os.path.join(work_dir, name), os.path.join(onnx_dir, name))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Encoder that runs an exported sentence-transformer with ONNX Runtime.
+# encode() matches SentenceTransformer.encode for the arguments this service uses: a list of texts gives a
+# 2-D float32 array and a single text a 1-D one. Batches are sorted by length so padding stays short.
+class OnnxSentenceEncoder:
+    def __init__(self, onnx_dir, quantized=True, threads=0):
+        from transformers import AutoTokenizer
+        self.onnx_dir = onnx_dir
+        self.quantized = quantized
+        with open(os.path.join(onnx_dir, "pooling.json")) as f:
+            self.pooling = json.load(f)
+        self.max_seq_length = self.pooling["max_seq_length"]
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = "model-int8.onnx" if quantized else "model.onnx"
+        self.session = onnxruntime.InferenceSession(os.path.join(onnx_dir, model_file), options, providers=["CPUExecutionProvider"])
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def pool(self, hidden, attention_mask):
+        if self.pooling["mode"] == "cls":
+            return hidden[:, 0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        if self.pooling["mode"] == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = [None] * len(texts)
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            tokens = self.tokenizer([texts[i] for i in batch], padding=True, truncation=True,
+                                    max_length=self.max_seq_length, return_tensors="np")
+            inputs = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, inputs)[0]
+            pooled = self.pool(hidden, tokens["attention_mask"])
+            if self.pooling["normalize"]:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            for i, vector in zip(batch, pooled.astype(np.float32)):
+                embeddings[i] = vector
+        if single:
+            return embeddings[0]
+        return np.stack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+
+
+# Function to load the PyTorch model; sentence_transformers is imported here so processes serving ONNX
+# or talking to the embedding sidecar never load torch
+def load_torch_model(model_name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+# Function to compare an encoder with the PyTorch reference model and return the lowest per-text cosine similarity
+def validate_encoder(reference_model, encoder, texts=None):
+    texts = texts or VALIDATION_TEXTS
+    expected = np.asarray(reference_model.encode(texts), dtype=np.float32)
+    actual = np.asarray(encoder.encode(texts), dtype=np.float32)
+    cosines = (expected * actual).sum(axis=1) / (np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1))
+    return float(cosines.min())
+
+# Function to load the query/index encoder selected by encoder_backend in config.env ('torch' or 'onnx').
+# The onnx backend exports the model on first use and keeps it only when its embeddings agree with the
+# PyTorch model (cosine >= encoder_validation_threshold on every validation text); the outcome is stored in
+# validation-int8.json / validation-fp32.json next to the export, so later starts load ONNX Runtime without loading torch weights.
+# Workers starting together export under a file lock in onnx_dir: one exports and validates, the others wait and
+# reuse its result. Any failure falls back to the PyTorch model.
+def load_encoder(model_name):
+    backend = os.getenv('encoder_backend', 'torch').lower()
+    if backend != 'onnx':
+        return load_torch_model(model_name)
+    if onnxruntime is None:
+        print("encoder_backend=onnx needs onnxruntime, using the PyTorch model")
+        return load_torch_model(model_name)
+    quantized = os.getenv('encoder_onnx_quantize', 'true').lower() == 'true'
+    threshold = float(os.getenv('encoder_validation_threshold', 0.98))
+    onnx_dir = os.path.join(os.getenv('encoder_onnx_dir', 'onnx_models'), model_name.replace("/", "_"))
+    validation_path = os.path.join(onnx_dir, f"validation-{'int8' if quantized else 'fp32'}.json")
+    threads = int(os.getenv('encoder_onnx_threads', 0))
+    try:
+        validation = read_json_file(validation_path)
+        if validation is None:
+            os.makedirs(onnx_dir, exist_ok=True)
+            with open(os.path.join(onnx_dir, ".lock"), "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # another worker may have finished the export while this one waited for the lock
+                    validation = read_json_file(validation_path)
+                    if validation is None:
+                        reference_model = load_torch_model(model_name)
+                        if not os.path.exists(os.path.join(onnx_dir, "model-int8.onnx" if quantized else "model.onnx")):
+                            export_onnx_model(reference_model, onnx_dir, quantized)
+                        encoder = OnnxSentenceEncoder(onnx_dir, quantized, threads)
+                        min_cosine = validate_encoder(reference_model, encoder)
+                        write_json_file(validation_path, {"model_name": model_name, "quantized": quantized, "min_cosine": min_cosine, "threshold": threshold})
+                        print(f"ONNX encoder for {model_name}: min cosine {min_cosine:.4f} against PyTorch (threshold {threshold})")
+                        return encoder if min_cosine >= threshold else reference_model
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        if validation["min_cosine"] >= threshold:
+            return OnnxSentenceEncoder(onnx_dir, quantized, threads)
+        print(f"ONNX encoder for {model_name} failed validation (min cosine {validation['min_cosine']:.4f}), using the PyTorch model")
+        return load_torch_model(model_name)
+    except Exception as e:
+        print(f"Could not load the ONNX encoder for {model_name}, using the PyTorch model: {e}")
+        return load_torch_model(model_name)
@@ -0,0 +1,454 @@
+import os
+import json
+import time
+import queue
+import asyncio
+import threading
+from collections import deque
+import requests
+import psycopg2
+from sqlalchemy import text
+from Common import get_value_by_path, parse_table_columns, load_items_into_table
+try:
+    import httpx
+except ImportError:  # concurrent page fetching needs httpx, ingestion falls back to sequential requests
+    httpx = None
+
+# Function to read everything needed to call an endpoint: url, method, headers, query parameters and pagination
+def get_endpoint_ingest_config(api_name, endpoint_name, engine):
+    with engine.connect() as connection:
+        endpoint = connection.execute(text("""
+            SELECT e.endpoint_id, e.api_id, e.endpoint_url, e.http_method
+            FROM apis a JOIN endpoints e ON a.api_id = e.api_id
+            WHERE a.api_name = :api_name AND e.endpoint_name = :endpoint_name
+            ORDER BY e.endpoint_id DESC LIMIT 1
+        """), {"api_name": api_name, "endpoint_name": endpoint_name}).fetchone()
+        if endpoint is None:
+            return None
+        params = {"endpoint_id": endpoint.endpoint_id}
+        headers = connection.execute(text("SELECT header_name, header_value FROM headers WHERE endpoint_id = :endpoint_id"), params).fetchall()
+        query_params = connection.execute(text("SELECT parameter_name, parameter_value FROM query_parameters WHERE endpoint_id = :endpoint_id"), params).fetchall()
+        pagination = connection.execute(text("""
+            SELECT pagination_type, page_parameter, limit_parameter, next_page_indicator, termination_condition
+            FROM pagination_settings WHERE endpoint_id = :endpoint_id
+            ORDER BY pagination_id DESC LIMIT 1
+        """), params).fetchone()
+    return {
+        "endpoint_id": endpoint.endpoint_id,
+        "api_id": endpoint.api_id,
+        "endpoint_url": endpoint.endpoint_url,
+        "http_method": endpoint.http_method,
+        "headers": {row.header_name: row.header_value for row in headers},
+        "query_params": {row.parameter_name: row.parameter_value for row in query_params},
+        "pagination": dict(pagination._mapping) if pagination is not None else None
+    }
+
+# Function to turn a PaginationSettings row into the fields the page walker uses
+# pagination_type: offset | page | cursor | link_header (anything else means a single request)
+# next_page_indicator: JSON path (a/b/c) of the next cursor or next url for cursor pagination, of a
+#   "has more" flag for offset/page pagination, or the rel name for link_header pagination
+# termination_condition: always stops on an empty page; "short_page" also stops when a page has fewer
+#   items than the page size, and "max_pages=N" caps the number of requests
+def parse_pagination_settings(pagination, query_params):
+    pagination = pagination or {}
+    pagination_type = str(pagination.get('pagination_type') or 'none').strip().lower().replace('-', '_').replace(' ', '_')
+    if pagination_type in ('link', 'link_headers', 'next_link'):
+        pagination_type = 'link_header'
+    if pagination_type in ('page_number', 'page_based'):
+        pagination_type = 'page'
+    if pagination_type in ('offset_limit', 'limit_offset'):
+        pagination_type = 'offset'
+    limit_parameter = pagination.get('limit_parameter') or None
+    page_size = int(os.getenv('ingest_page_size', 100))
+    if limit_parameter and str(query_params.get(limit_parameter, '')).isdigit():
+        page_size = int(query_params[limit_parameter])
+    termination_condition = str(pagination.get('termination_condition') or '').lower()
+    max_pages = int(os.getenv('ingest_max_pages', 100000))
+    for part in termination_condition.replace(',', ' ').split():
+        if part.startswith('max_pages='):
+            max_pages = int(part.split('=', 1)[1])
+    return {
+        "type": pagination_type,
+        "page_parameter": pagination.get('page_parameter') or None,
+        "limit_parameter": limit_parameter,
+        "page_size": page_size,
+        "next_page_indicator": pagination.get('next_page_indicator') or None,
+        "stop_on_short_page": 'short' in termination_condition or 'less' in termination_condition,
+        "max_pages": max_pages
+    }
+
+# Function to find the items of a page at the extraction path
+def extract_page_items(data, extraction_path):
+    items = get_value_by_path(data, extraction_path) if extraction_path else data
+    if isinstance(items, dict):
+        return [items] if items else []
+    return items or []
+
+# Function to send one request of the page walk through the API's rate limiter and the endpoint's retry policy
+# A 429 pauses every caller of the API and is retried as the limiter's throttling strategy says; other
+# failures are retried only when the retry policy lists the status code (or on connection errors)
+def fetch_page(http_session, url, http_method, headers, params, rate_limiter=None, retry_policy=None):
+    throttled = 0
+    attempt = 0
+    while True:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            response = http_session.request(http_method.upper(), url, headers=headers, params=params)
+        except requests.RequestException:
+            if retry_policy is None or not retry_policy.should_retry(None, attempt):
+                raise
+            retry_policy.sleep(attempt)
+            attempt += 1
+            continue
+        if response.status_code == 429 and rate_limiter is not None:
+            delay = rate_limiter.backoff_delay(throttled, response.headers.get('Retry-After'))
+            if delay is not None:
+                rate_limiter.penalize(delay)
+                throttled += 1
+                continue
+        if response.status_code >= 400 and retry_policy is not None and retry_policy.should_retry(response.status_code, attempt):
+            retry_policy.sleep(attempt)
+            attempt += 1
+            continue
+        response.raise_for_status()
+        return response
+
+# Generator that walks an endpoint page by page according to its pagination settings and yields
+# (items, resume_state) per page, so callers can load page by page without holding the whole result set.
+# resume_state describes the request for the next page; passing it back as start_state continues the walk there.
+def iter_endpoint_pages(endpoint_url, http_method, headers, query_params, extraction_path, pagination, http_session=None, rate_limiter=None, retry_policy=None, start_state=None):
+    http_session = http_session or requests.Session()
+    settings = parse_pagination_settings(pagination, query_params)
+    if settings["type"] in ('offset', 'page') and not settings["page_parameter"]:
+        # the position could never be sent, so every request would return the same page again
+        print(f"Pagination of {endpoint_url} is {settings['type']} without a page_parameter, fetching a single page")
+        settings["type"] = 'none'
+    # without a limit parameter the server picks the page size, which the first page shows
+    page_size = settings["page_size"] if settings["limit_parameter"] else None
+    start_state = start_state or {}
+    params = dict(query_params)
+    if settings["limit_parameter"] and settings["type"] in ('offset', 'page', 'cursor'):
+        params[settings["limit_parameter"]] = settings["page_size"]
+    if "params" in start_state:
+        params = dict(start_state["params"])
+    url = start_state.get("url") or endpoint_url
+    position = start_state.get("position", 0 if settings["type"] == 'offset' else 1)
+
+    for page_number in range(settings["max_pages"]):
+        if settings["type"] in ('offset', 'page') and settings["page_parameter"]:
+            params[settings["page_parameter"]] = position
+        response = fetch_page(http_session, url, http_method, headers, params, rate_limiter, retry_policy)
+        data = response.json()
+        items = extract_page_items(data, extraction_path)
+        if not items:
+            return
+        if page_size is None:
+            page_size = len(items)
+
+        done = False
+        if settings["type"] == 'offset':
+            position += len(items)
+        elif settings["type"] == 'page':
+            position += 1
+        elif settings["type"] == 'cursor':
+            next_value = get_value_by_path(data, settings["next_page_indicator"]) if settings["next_page_indicator"] else None
+            if not next_value:
+                done = True
+            elif str(next_value).startswith(('http://', 'https://')):
+                # the indicator holds the full next url, which already carries every parameter
+                url, params = str(next_value), {}
+            elif settings["page_parameter"]:
+                params[settings["page_parameter"]] = next_value
+            else:
+                done = True
+        elif settings["type"] == 'link_header':
+            next_link = response.links.get(settings["next_page_indicator"] or 'next')
+            if not next_link:
+                done = True
+            else:
+                url, params = next_link['url'], {}
+        else:
+            done = True
+
+        if settings["type"] in ('offset', 'page'):
+            if settings["stop_on_short_page"] and len(items) < page_size:
+                done = True
+            if settings["next_page_indicator"] and not get_value_by_path(data, settings["next_page_indicator"]):
+                done = True
+
+        yield items, {"url": url, "params": dict(params), "position": position}
+        if done:
+            return
+
+# Generator that fetches offset/page-numbered pages concurrently and yields (items, resume_state) in page order.
+# The fetches run on an event loop in a background thread: up to 2 * concurrency pages are scheduled ahead on
+# one pooled httpx.AsyncClient, a semaphore keeps at most `concurrency` requests in flight, and finished pages
+# are handed over in order through a bounded queue, so fetching continues while the caller loads earlier pages.
+# The first page is fetched alone: its size is the server's page size (whatever limit was asked for), which
+# places the offsets of the following pages. resume_state positions match iter_endpoint_pages, so either
+# walker can resume the other's checkpoint.
+# Cursor and link-header pagination need the previous page to find the next one, so those (and a missing httpx)
+# fall back to iter_endpoint_pages.
+def iter_endpoint_pages_concurrent(endpoint_url, http_method, headers, query_params, extraction_path, pagination, concurrency=8, rate_limiter=None, retry_policy=None, start_state=None):
+    settings = parse_pagination_settings(pagination, query_params)
+    if httpx is None or concurrency <= 1 or settings["type"] not in ('offset', 'page') or not settings["page_parameter"]:
+        yield from iter_endpoint_pages(endpoint_url, http_method, headers, query_params, extraction_path, pagination,
+                                       rate_limiter=rate_limiter, retry_policy=retry_policy, start_state=start_state)
+        return
+
+    base_params = dict(query_params)
+    if settings["limit_parameter"]:
+        base_params[settings["limit_parameter"]] = settings["page_size"]
+
+    start_position = 0 if settings["type"] == 'offset' else 1
+    if start_state and "position" in start_state:
+        start_position = int(start_state["position"])
+
+    pages = queue.Queue(maxsize=max(2, concurrency))
+    stop = threading.Event()
+
+    # Function to put a message on the page queue without blocking the event loop; gives up once the caller stopped
+    async def hand_over(message):
+        while not stop.is_set():
+            try:
+                pages.put_nowait(message)
+                return True
+            except queue.Full:
+                await asyncio.sleep(0.01)
+        return False
+
+    running = {}
+
+    async def produce():
+        running["loop"], running["task"] = asyncio.get_running_loop(), asyncio.current_task()
+        client = None
+        semaphore = asyncio.Semaphore(concurrency)
+        page_size = 0
+
+        # page n of this walk (counting from 0) is requested at offset start + n * page_size or at page number start + n
+        def page_position(page_number):
+            if settings["type"] == 'offset':
+                return start_position + page_number * page_size
+            return start_position + page_number
+
+        async def fetch(page_number):
+            params = dict(base_params)
+            params[settings["page_parameter"]] = page_position(page_number)
+            throttled = 0
+            attempt = 0
+            while True:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire_async()
+                try:
+                    async with semaphore:
+                        response = await client.request(http_method.upper(), endpoint_url, headers=headers, params=params)
+                except httpx.TransportError:
+                    if retry_policy is None or not retry_policy.should_retry(None, attempt):
+                        raise
+                    await retry_policy.sleep_async(attempt)
+                    attempt += 1
+                    continue
+                if response.status_code == 429 and rate_limiter is not None:
+                    delay = rate_limiter.backoff_delay(throttled, response.headers.get('Retry-After'))
+                    if delay is not None:
+                        await rate_limiter.penalize_async(delay)
+                        throttled += 1
+                        continue
+                if response.status_code >= 400 and retry_policy is not None and retry_policy.should_retry(response.status_code, attempt):
+                    await retry_policy.sleep_async(attempt)
+                    attempt += 1
+                    continue
+                response.raise_for_status()
+                return response.json()
+
+        pending = deque()
+        next_page = 0
+        current_page = 0
+        try:
+            # created inside the try so a client error reaches the caller instead of leaving it waiting
+            client = httpx.AsyncClient(limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency), timeout=60)
+            while not stop.is_set():
+                # only the first page is in flight until it shows the page size
+                while len(pending) < (2 * concurrency if page_size else 1) and next_page < settings["max_pages"]:
+                    pending.append(asyncio.create_task(fetch(next_page)))
+                    next_page += 1
+                if not pending:
+                    break
+                data = await pending.popleft()
+                items = extract_page_items(data, extraction_path)
+                page_size = page_size or len(items)
+                done = (not items
+                        or (settings["stop_on_short_page"] and len(items) < page_size)
+                        or bool(settings["next_page_indicator"] and not get_value_by_path(data, settings["next_page_indicator"])))
+                # like iter_endpoint_pages, the resume position is the request that follows this page
+                resume_position = page_position(current_page) + (len(items) if settings["type"] == 'offset' else 1)
+                current_page += 1
+                if not await hand_over(("page", items, resume_position)) or done:
+                    break
+            await hand_over(("end",))
+        except Exception as e:
+            await hand_over(("error", e))
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            if client is not None:
+                await client.aclose()
+
+    def run_fetcher():
+        try:
+            asyncio.run(produce())
+        except asyncio.CancelledError:
+            pass
+
+    fetcher = threading.Thread(target=run_fetcher, name="ingest-page-fetcher", daemon=True)
+    fetcher.start()
+    try:
+        while True:
+            message = pages.get()
+            if message[0] == "error":
+                raise message[1]
+            if message[0] == "end" or not message[1]:
+                return
+            yield message[1], {"position": message[2]}
+    finally:
+        # a caller that stops early (or fails loading) must not wait for in-flight fetches or retries
+        stop.set()
+        if "task" in running:
+            try:
+                running["loop"].call_soon_threadsafe(running["task"].cancel)
+            except RuntimeError:
+                pass  # the fetcher already finished and closed its loop
+        fetcher.join()
+
+# Advisory lock namespace for ingests: one ingest per endpoint at a time across jobs, workers and the scheduler
+# (the scheduler holds its own namespace around the whole pipeline, this one only around the load)
+INGEST_LOCK_NAMESPACE = 7302
+
+# Function to create the table that remembers how far each endpoint ingest got
+def ensure_ingest_checkpoint_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+            endpoint_id INTEGER NOT NULL,
+            table_name VARCHAR(255) NOT NULL,
+            resume_state TEXT,
+            pk_counter INTEGER NOT NULL DEFAULT 1,
+            pages INTEGER NOT NULL DEFAULT 0,
+            rows_loaded BIGINT NOT NULL DEFAULT 0,
+            status VARCHAR(20) NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT now(),
+            PRIMARY KEY (endpoint_id, table_name)
+        )
+    """)
+
+# Function to insert or update an ingest checkpoint through the caller's cursor (same transaction as the page data)
+def save_ingest_checkpoint(cursor, endpoint_id, table_name, resume_state, pk_counter, pages, rows_loaded, status):
+    cursor.execute("""
+        INSERT INTO ingest_checkpoints (endpoint_id, table_name, resume_state, pk_counter, pages, rows_loaded, status, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, now())
+        ON CONFLICT (endpoint_id, table_name) DO UPDATE SET
+            resume_state = EXCLUDED.resume_state, pk_counter = EXCLUDED.pk_counter, pages = EXCLUDED.pages,
+            rows_loaded = EXCLUDED.rows_loaded, status = EXCLUDED.status, updated_at = now()
+    """, (endpoint_id, table_name, json.dumps(resume_state) if resume_state is not None else None, pk_counter, pages, rows_loaded, status))
+
+# Function to ingest every page of an endpoint into its mapped table, committing page by page.
+# Each page is committed together with a checkpoint of the next request, so with resume=True an ingest
+# that failed (or was killed) continues from the request that failed instead of starting over.
+# Only one ingest per endpoint runs at a time (advisory lock), and only a 'failed' checkpoint or a 'running' one
+# whose heartbeat is older than ingest_checkpoint_stale_seconds is resumed, so two runs never load the same pages.
+# With concurrency > 1 numbered pages are fetched concurrently in a background thread while earlier pages are loaded;
+# progress, when given, is called with the running counters after every committed page
+# replace_rows empties the table when the run starts from the first page (a resumed run keeps its loaded pages)
+def ingest_endpoint_to_table(config, create_table_sql, extraction_path, db_conn_url, bulk=True, chunk_size=10000, concurrency=1, rate_limiter=None, retry_policy=None, resume=True, progress=None, replace_rows=False):
+    stats = {"pages": 0, "rows_fetched": 0, "rows_loaded": 0, "seconds": 0.0, "concurrency": concurrency, "resumed": False}
+    start_time = time.perf_counter()
+    table_name, column_names = parse_table_columns(create_table_sql)
+    endpoint_id = config["endpoint_id"]
+    conn = psycopg2.connect(db_conn_url)
+    try:
+        cursor = conn.cursor()
+        # session-level lock, released when the connection closes (also when the process dies)
+        cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", (INGEST_LOCK_NAMESPACE, endpoint_id))
+        if not cursor.fetchone()[0]:
+            raise RuntimeError(f"Endpoint {endpoint_id} is already being ingested")
+        ensure_ingest_checkpoint_table(cursor)
+        start_state = None
+        pk_counter = [1]
+        cursor.execute("SELECT resume_state, pk_counter, pages, rows_loaded, status, updated_at < now() - make_interval(secs => %s) FROM ingest_checkpoints WHERE endpoint_id = %s AND table_name = %s",
+                       (float(os.getenv('ingest_checkpoint_stale_seconds', 60)), endpoint_id, table_name))
+        checkpoint = cursor.fetchone()
+        if checkpoint is not None and checkpoint[4] == 'running' and not checkpoint[5]:
+            # a run that still heartbeats (or died moments ago) owns these pages; starting over would load them twice
+            raise RuntimeError(f"Endpoint {endpoint_id} has a running ingest into {table_name}, retry once its checkpoint is stale")
+        if resume and checkpoint is not None and checkpoint[4] in ('running', 'failed'):
+            if checkpoint[0]:
+                start_state = json.loads(checkpoint[0])
+                pk_counter = [checkpoint[1]]
+                stats["pages"], stats["rows_loaded"], stats["resumed"] = checkpoint[2], checkpoint[3], True
+                print(f"Resuming ingest of {table_name} after page {stats['pages']}")
+        if start_state is None:
+            if replace_rows:
+                cursor.execute(f"TRUNCATE {table_name}")
+            save_ingest_checkpoint(cursor, endpoint_id, table_name, None, 1, 0, 0, 'running')
+        conn.commit()
+
+        pages = iter_endpoint_pages_concurrent(config["endpoint_url"], config["http_method"], config["headers"],
+                                               config["query_params"], extraction_path, config["pagination"], concurrency,
+                                               rate_limiter, retry_policy, start_state)
+        try:
+            for items, resume_state in pages:
+                stats["rows_fetched"] += len(items)
+                stats["rows_loaded"] += load_items_into_table(cursor, table_name, column_names, items, pk_counter, bulk, chunk_size)
+                stats["pages"] += 1
+                save_ingest_checkpoint(cursor, endpoint_id, table_name, resume_state, pk_counter[0], stats["pages"], stats["rows_loaded"], 'running')
+                conn.commit()
+                if progress is not None:
+                    progress(pages=stats["pages"], rows_fetched=stats["rows_fetched"], rows_loaded=stats["rows_loaded"])
+        except Exception:
+            # keep the last committed checkpoint and flag it so the next run resumes from there
+            conn.rollback()
+            cursor.execute("UPDATE ingest_checkpoints SET status = 'failed', updated_at = now() WHERE endpoint_id = %s AND table_name = %s",
+                           (endpoint_id, table_name))
+            conn.commit()
+            raise
+        save_ingest_checkpoint(cursor, endpoint_id, table_name, None, pk_counter[0], stats["pages"], stats["rows_loaded"], 'completed')
+        conn.commit()
+    finally:
+        conn.close()
+        stats["seconds"] = round(time.perf_counter() - start_time, 3)
+    print(f"Ingested {stats['rows_loaded']} rows in {stats['pages']} pages into {table_name} in {stats['seconds']}s")
+    return stats
+
+# Function to create (if needed) the staging copy of a mapped table that a full reload is written into.
+# Returns the CREATE TABLE statement of the staging table, in the form the loaders parse
+def create_staging_table(create_table_sql, db_conn_url, truncate=False):
+    table_name, column_names = parse_table_columns(create_table_sql)
+    staging_table = f"{table_name}_staging"
+    conn = psycopg2.connect(db_conn_url)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {staging_table} (LIKE {table_name} INCLUDING ALL)")
+        if truncate:
+            cursor.execute(f"TRUNCATE {staging_table}")
+        conn.commit()
+    finally:
+        conn.close()
+    return f"CREATE TABLE {staging_table} (" + create_table_sql.split('(', 1)[1]
+
+# Function to replace a mapped table with its fully loaded staging table in one transaction,
+# so readers (and the incremental indexer) see either the previous snapshot or the new one, never both
+def swap_staging_table(table_name, db_conn_url):
+    conn = psycopg2.connect(db_conn_url)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {table_name}_previous")
+        cursor.execute(f"ALTER TABLE {table_name} RENAME TO {table_name}_previous")
+        cursor.execute(f"ALTER TABLE {table_name}_staging RENAME TO {table_name}")
+        cursor.execute(f"DROP TABLE {table_name}_previous")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import socket
+import threading
+import psycopg2
+import psycopg2.extras
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_COLUMNS = "job_id, job_type, params, status, progress, result, error, attempts, worker, created_at, started_at, heartbeat_at, finished_at"
+
+# Function to create the table that holds every background job and its progress
+def ensure_job_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS background_jobs (
+            job_id SERIAL PRIMARY KEY,
+            job_type VARCHAR(50) NOT NULL,
+            params TEXT NOT NULL,
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
+            progress TEXT NOT NULL DEFAULT '{}',
+            result TEXT,
+            error TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            worker VARCHAR(255),
+            created_at TIMESTAMP NOT NULL DEFAULT now(),
+            started_at TIMESTAMP,
+            heartbeat_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS background_jobs_queued ON background_jobs (job_id) WHERE status = 'queued'")
+
+def job_row_to_dict(row):
+    job = dict(row)
+    for key in ("params", "progress", "result"):
+        if job.get(key):
+            job[key] = json.loads(job[key])
+    for key in ("created_at", "started_at", "heartbeat_at", "finished_at"):
+        if job.get(key) is not None:
+            job[key] = job[key].isoformat()
+    return job
+
+
+# Progress reporter handed to a running job: keeps the latest counters and writes them (with a
+# heartbeat) to the job row at most once every flush_seconds so hot loops do not hammer the database
+class JobProgress:
+    def __init__(self, queue, job_id, flush_seconds=1.0):
+        self.queue = queue
+        self.job_id = job_id
+        self.flush_seconds = flush_seconds
+        self.counters = {}
+        self.flushed_at = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, **counters):
+        with self.lock:
+            self.counters.update(counters)
+            if time.monotonic() - self.flushed_at < self.flush_seconds:
+                return
+            self.flushed_at = time.monotonic()
+            snapshot = dict(self.counters)
+        self.queue.save_progress(self.job_id, snapshot)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.counters)
+
+
+# Job queue persisted in Postgres (background_jobs) and executed by a bounded thread pool.
+# enqueue() only inserts a row; every worker process polls for queued rows and claims one with
+# FOR UPDATE SKIP LOCKED, so any number of gunicorn workers share the queue without running a job twice.
+# Running jobs refresh heartbeat_at with their progress; a job whose heartbeat is older than stale_seconds
+# (its worker died or was restarted) is queued again until max_attempts is reached.
+# handlers maps a job type to a function(params, progress) returning the job's JSON result.
+class JobQueue:
+    def __init__(self, db_conn_url, handlers, max_workers=2, poll_seconds=2, stale_seconds=300, max_attempts=3):
+        self.db_conn_url = db_conn_url
+        self.handlers = handlers
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.worker_name = f"{socket.gethostname()}:{os.getpid()}"
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.slots = threading.Semaphore(max_workers)
+        self.active = set()
+        self.active_lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.table_ready = False
+
+    def connect(self):
+        conn = psycopg2.connect(self.db_conn_url)
+        conn.autocommit = True
+        if not self.table_ready:
+            ensure_job_table(conn.cursor())
+            self.table_ready = True
+        return conn
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.loop, name="job-queue", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.wakeup.set()
+        self.executor.shutdown(wait=False)
+
+    # Function to add a job to the queue and return its id; the job runs on whichever worker claims it first
+    def enqueue(self, job_type, params):
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type {job_type}")
+        conn = self.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO background_jobs (job_type, params) VALUES (%s, %s) RETURNING job_id",
+                           (job_type, json.dumps(params, default=str)))
+            job_id = cursor.fetchone()[0]
+        finally:
+            conn.close()
+        self.wakeup.set()
+        return job_id
+
+    # Function to return a job with its status, progress and result, or None when the id is unknown
+    def get(self, job_id):
+        conn = self.connect()
+        try:
+            cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+            cursor.execute(f"SELECT {JOB_COLUMNS} FROM background_jobs WHERE job_id = %s", (job_id,))
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        return job_row_to_dict(row) if row else None
+
+    def save_progress(self, job_id, counters):
+        try:
+            conn = self.connect()
+            try:
+                conn.cursor().execute("UPDATE background_jobs SET progress = %s, heartbeat_at = now() WHERE job_id = %s",
+                                      (json.dumps(counters, default=str), job_id))
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Could not save progress of job {job_id}: {e}")
+
+    # Function to queue again the jobs whose worker stopped sending heartbeats, and fail those out of attempts
+    def requeue_stale_jobs(self, cursor):
+        cursor.execute("""
+            UPDATE background_jobs SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'queued' END,
+                error = CASE WHEN attempts >= %s THEN 'Worker stopped responding' ELSE error END,
+                finished_at = CASE WHEN attempts >= %s THEN now() ELSE NULL END
+            WHERE status = 'running' AND heartbeat_at < now() - make_interval(secs => %s)
+        """, (self.max_attempts, self.max_attempts, self.max_attempts, self.stale_seconds))
+
+    # Function to claim the oldest queued job for this worker, or return None when the queue is empty
+    def claim(self, cursor):
+        cursor.execute(f"""
+            UPDATE background_jobs SET status = 'running', worker = %s, attempts = attempts + 1,
+                started_at = now(), heartbeat_at = now()
+            WHERE job_id = (
+                SELECT job_id FROM background_jobs WHERE status = 'queued'
+                ORDER BY job_id FOR UPDATE SKIP LOCKED LIMIT 1
+            )
+            RETURNING {JOB_COLUMNS}
+        """, (self.worker_name,))
+        row = cursor.fetchone()
+        return job_row_to_dict(row) if row else None
+
+    def loop(self):
+        while not self.stop_event.is_set():
+            self.wakeup.clear()
+            try:
+                conn = self.connect()
+                try:
+                    cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+                    # keep this worker's jobs alive even through phases that report no progress
+                    with self.active_lock:
+                        active = list(self.active)
+                    if active:
+                        cursor.execute("UPDATE background_jobs SET heartbeat_at = now() WHERE job_id = ANY(%s)", (active,))
+                    self.requeue_stale_jobs(cursor)
+                    # only claim while a pool thread is free so queued jobs stay claimable by other workers
+                    while self.slots.acquire(blocking=False):
+                        job = self.claim(cursor)
+                        if job is None:
+                            self.slots.release()
+                            break
+                        with self.active_lock:
+                            self.active.add(job["job_id"])
+                        self.executor.submit(self.run, job)
+                finally:
+                    conn.close()
+            except Exception as e:
+                print(f"Job queue poll failed: {e}")
+            self.wakeup.wait(self.poll_seconds)
+
+    def run(self, job):
+        job_id = job["job_id"]
+        progress = JobProgress(self, job_id)
+        try:
+            try:
+                result = self.handlers[job["job_type"]](job["params"], progress)
+                status, error = 'succeeded', None
+            except Exception as e:
+                print(f"Job {job_id} ({job['job_type']}) failed: {e}")
+                result, status, error = None, 'failed', str(e)
+            conn = self.connect()
+            try:
+                conn.cursor().execute("""
+                    UPDATE background_jobs SET status = %s, result = %s, error = %s, progress = %s,
+                        heartbeat_at = now(), finished_at = now()
+                    WHERE job_id = %s
+                """, (status, json.dumps(result, default=str) if result is not None else None, error,
+                      json.dumps(progress.snapshot(), default=str), job_id))
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Could not record the outcome of job {job_id}: {e}")
+        finally:
+            with self.active_lock:
+                self.active.discard(job_id)
+            self.slots.release()
+            self.wakeup.set()
+
+
+# Function to build the job queue from config.env (jobs_max_workers, jobs_poll_seconds, jobs_stale_seconds, jobs_max_attempts)
+def create_job_queue(db_conn_url, handlers):
+    return JobQueue(db_conn_url, handlers,
+                    int(os.getenv('jobs_max_workers', 2)), float(os.getenv('jobs_poll_seconds', 2)),
+                    int(os.getenv('jobs_stale_seconds', 300)), int(os.getenv('jobs_max_attempts', 3)))
@@ -0,0 +1,103 @@
+import os
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+# Encoder that merges concurrent small encode() calls into one batched forward pass.
+# Callers enqueue their texts and wait on a future; a dispatcher thread takes the first waiting request,
+# adds everything that queued up while the previous batch ran, then waits at most max_wait_ms more for
+# further requests (stopping early at max_batch_size texts) before encoding the batch in one model call.
+# A lone request therefore pays at most max_wait_ms extra, while under load batches fill without waiting.
+# Requests larger than max_batch_size, and calls with encode options (kwargs), bypass the queue and call the
+# model directly. A caller waits at most timeout_seconds (None: no limit) for its batch, so a stuck or dead
+# dispatcher raises TimeoutError instead of hanging the request.
+class MicroBatchEncoder:
+    def __init__(self, model, max_batch_size=64, max_wait_ms=2, model_lock=None, timeout_seconds=30):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000.0
+        self.timeout_seconds = timeout_seconds
+        self.model_lock = model_lock or threading.Lock()
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.texts = 0
+        self.stats_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.dispatch, name="micro-batch-encoder", daemon=True)
+        self.thread.start()
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if kwargs or len(texts) > self.max_batch_size:
+            with self.model_lock:
+                return self.model.encode(sentences, batch_size=batch_size, **kwargs)
+        future = Future()
+        self.requests.put((texts, future))
+        try:
+            vectors = future.result(timeout=self.timeout_seconds)
+        except TimeoutError:
+            # drop the request if the dispatcher has not picked it up yet
+            future.cancel()
+            raise
+        return vectors[0] if single else vectors
+
+    def dispatch(self):
+        carried = None
+        while True:
+            batch = [carried or self.requests.get()]
+            carried = None
+            count = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait_seconds
+            while count < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self.requests.get(block=timeout > 0, timeout=max(timeout, 0) or None)
+                except queue.Empty:
+                    break
+                if count + len(item[0]) > self.max_batch_size:
+                    # keep the batch within max_batch_size, the request opens the next one
+                    carried = item
+                    break
+                batch.append(item)
+                count += len(item[0])
+            self.run(batch)
+
+    def run(self, batch):
+        batch = [(item_texts, future) for item_texts, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for item_texts, future in batch for text in item_texts]
+        try:
+            with self.model_lock:
+                vectors = self.model.encode(texts, batch_size=len(texts))
+        except Exception as e:
+            for item_texts, future in batch:
+                future.set_exception(e)
+            return
+        start = 0
+        for item_texts, future in batch:
+            future.set_result(vectors[start:start + len(item_texts)])
+            start += len(item_texts)
+        with self.stats_lock:
+            self.batches += 1
+            self.texts += len(texts)
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "batches": self.batches,
+                "texts": self.texts,
+                "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+                "queued": self.requests.qsize()
+            }
+
+
+# Function to wrap an encoder for query traffic when query_batching_enabled (config.env) is true
+def create_query_encoder(model, model_lock=None):
+    if os.getenv('query_batching_enabled', 'true').lower() != 'true':
+        return model
+    timeout_seconds = float(os.getenv('query_batch_timeout_seconds', 30)) or None
+    return MicroBatchEncoder(model, int(os.getenv('query_batch_max_size', 64)), float(os.getenv('query_batch_max_wait_ms', 2)), model_lock, timeout_seconds)
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Bounded, thread-safe cache of query embeddings keyed by (model name, normalized query text).
+# Entries are evicted least-recently-used once max_size is reached and expire after ttl_seconds.
+class QueryEmbeddingCache:
+    def __init__(self, max_size=10000, ttl_seconds=3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Function to normalize query text so trivially different spellings share an entry
+    @staticmethod
+    def normalize(query):
+        return " ".join(str(query).split())
+
+    def get(self, model_name, query):
+        key = (model_name, self.normalize(query))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                vector, stored_at = entry
+                if time.monotonic() - stored_at <= self.ttl_seconds:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self.entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, model_name, query, vector):
+        key = (model_name, self.normalize(query))
+        with self.lock:
+            self.entries[key] = (vector, time.monotonic())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    # Function to return the cached embedding of a query, encoding it only on a miss
+    # The model runs outside the lock so concurrent misses do not serialize on each other
+    def get_or_encode(self, model, model_name, query):
+        vector = self.get(model_name, query)
+        if vector is None:
+            vector = model.encode(self.normalize(query)).tolist()
+            self.put(model_name, query, vector)
+        return vector
+
+    # Function to return embeddings for many queries, encoding all cache misses in one batched model call
+    def get_or_encode_many(self, model, model_name, queries, batch_size=64):
+        vectors = [self.get(model_name, query) for query in queries]
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(self.normalize(queries[i]), []).append(i)
+        if missing:
+            texts = list(missing)
+            for query_text, query_vector in zip(texts, model.encode(texts, batch_size=batch_size)):
+                query_vector = query_vector.tolist()
+                self.put(model_name, query_text, query_vector)
+                for i in missing[query_text]:
+                    vectors[i] = query_vector
+        return vectors
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# In-process LRU/TTL store for whole search responses, private to one worker
+class MemoryResultBackend:
+    def __init__(self, max_size=5000, ttl_seconds=600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = (value, time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def size(self):
+        with self.lock:
+            return len(self.entries)
+
+
+# SQLite file store for whole search responses, shared by every gunicorn worker on the host
+class SQLiteResultBackend:
+    def __init__(self, path, max_size=50000, ttl_seconds=600):
+        self.path = path
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.local = threading.local()
+        self.writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self.connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS search_results (cache_key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS search_results_stored_at ON search_results (stored_at)")
+
+    # Function to return this thread's connection (sqlite3 connections are not shared between threads)
+    def connection(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self.connection().execute("SELECT value, stored_at FROM search_results WHERE cache_key = ?", (key,)).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            return None
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        connection = self.connection()
+        connection.execute("INSERT OR REPLACE INTO search_results (cache_key, value, stored_at) VALUES (?, ?, ?)",
+                           (key, json.dumps(value, default=str), time.time()))
+        self.writes += 1
+        if self.writes % 1000 == 0:
+            # Drop expired rows and trim the oldest ones beyond max_size
+            connection.execute("DELETE FROM search_results WHERE stored_at < ?", (time.time() - self.ttl_seconds,))
+            connection.execute("DELETE FROM search_results WHERE cache_key IN (SELECT cache_key FROM search_results ORDER BY stored_at DESC LIMIT -1 OFFSET ?)", (self.max_size,))
+
+    def size(self):
+        return self.connection().execute("SELECT COUNT(*) FROM search_results").fetchone()[0]
+
+
+# Cache of final search matches keyed by (table, index generation, query, filter, top_k).
+# get_generation(table_name) reads the table's index generation (bumped on every re-index), so a
+# re-index makes old entries unreachable in every worker. The generation is memoized for
+# generation_ttl_seconds to keep the lookup off the database on the hot path.
+class SearchResultCache:
+    def __init__(self, backend, get_generation, generation_ttl_seconds=2):
+        self.backend = backend
+        self.get_generation = get_generation
+        self.generation_ttl_seconds = generation_ttl_seconds
+        self.generations = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, table_name):
+        with self.lock:
+            entry = self.generations.get(table_name)
+            if entry is not None and time.monotonic() - entry[1] <= self.generation_ttl_seconds:
+                return entry[0]
+        generation = self.get_generation(table_name)
+        with self.lock:
+            self.generations[table_name] = (generation, time.monotonic())
+        return generation
+
+    # Function to forget the memoized generation of a table after this worker re-indexed it
+    def invalidate(self, table_name):
+        with self.lock:
+            self.generations.pop(table_name, None)
+
+    # Function to build the cache key of a search; callers compute it once per request and pass the same key
+    # to get() and put(), so results found on one generation are never stored under a newer one
+    def key(self, table_name, search_query, filter, top_k, generation=None):
+        if generation is None:
+            generation = self.generation(table_name)
+        raw_key = json.dumps([table_name, generation, QueryEmbeddingCache.normalize(search_query), filter, top_k], sort_keys=True, default=str)
+        return hashlib.sha1(raw_key.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, matches):
+        self.backend.put(key, matches)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "size": self.backend.size(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+# Function to build the search result cache selected by result_cache_backend ('memory' or 'sqlite')
+def create_search_result_cache(get_generation):
+    backend_name = os.getenv('result_cache_backend', 'memory')
+    max_size = int(os.getenv('result_cache_max_size', 5000))
+    ttl_seconds = int(os.getenv('result_cache_ttl_seconds', 600))
+    if backend_name == "sqlite":
+        backend = SQLiteResultBackend(os.getenv('result_cache_path', 'cache/search_results.db'), max_size, ttl_seconds)
+    else:
+        backend = MemoryResultBackend(max_size, ttl_seconds)
+    return SearchResultCache(backend, get_generation, int(os.getenv('result_cache_generation_ttl_seconds', 2)))
@@ -0,0 +1,224 @@
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+from sqlalchemy import text
+
+TIME_UNITS = {
+    "ms": 0.001, "millisecond": 0.001, "milliseconds": 0.001,
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "h": 3600, "hr": 3600, "hrs": 3600, "hour": 3600, "hours": 3600,
+    "d": 86400, "day": 86400, "days": 86400
+}
+
+# Function to convert a RateLimitingSettings.time_window such as "1 minute", "30s", "per hour" or "60" into seconds
+def parse_time_window(time_window):
+    match = re.match(r"^\s*(?:per\s+)?(\d+(?:\.\d+)?)?\s*([a-zA-Z]*)\s*$", str(time_window or ""))
+    if not match or not (match.group(1) or match.group(2)):
+        return 60.0
+    amount = float(match.group(1)) if match.group(1) else 1.0
+    unit = match.group(2).lower()
+    if not unit:
+        return amount  # a bare number is a number of seconds
+    return amount * TIME_UNITS.get(unit, 60)
+
+# Function to map a RateLimitingSettings.throttling_strategy to 'exponential', 'linear', 'fixed' or 'none'
+def parse_throttling_strategy(throttling_strategy):
+    strategy = str(throttling_strategy or "").lower()
+    for name, keywords in (("none", ("none", "fail", "reject", "drop")),
+                           ("linear", ("linear",)),
+                           ("fixed", ("fixed", "constant", "delay"))):
+        if any(keyword in strategy for keyword in keywords):
+            return name
+    return "exponential"
+
+
+# Token bucket limiter for one API: max_requests tokens refilled evenly over time_window.
+# reserve() hands out a slot and the time to wait for it (tokens may go negative, so concurrent callers
+# queue up fairly instead of racing), and a 429 from the API pauses every caller through penalize().
+class RateLimiter:
+    def __init__(self, max_requests, time_window, throttling_strategy=None):
+        self.capacity = max(1, int(max_requests))
+        self.window_seconds = parse_time_window(time_window)
+        self.rate = self.capacity / self.window_seconds
+        self.strategy = parse_throttling_strategy(throttling_strategy)
+        self.backoff_seconds = float(os.getenv('rate_limit_backoff_seconds', 1))
+        self.max_backoff_seconds = float(os.getenv('rate_limit_max_backoff_seconds', 60))
+        self.max_retries = int(os.getenv('rate_limit_max_retries', 5))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    # Function to compute how long to back off after the attempt-th throttled response (attempt starts at 0)
+    # Returns None when the strategy says not to retry or retries are exhausted
+    def backoff_delay(self, attempt, retry_after=None):
+        if self.strategy == "none" or attempt >= self.max_retries:
+            return None
+        if retry_after is not None and str(retry_after).strip().isdigit():
+            return min(float(retry_after), self.max_backoff_seconds)
+        if self.strategy == "fixed":
+            delay = self.backoff_seconds
+        elif self.strategy == "linear":
+            delay = self.backoff_seconds * (attempt + 1)
+        else:
+            delay = self.backoff_seconds * (2 ** attempt)
+        return min(delay, self.max_backoff_seconds) * random.uniform(0.8, 1.2)
+
+    # Function to hold back every caller of this API for delay seconds (used after a 429)
+    def penalize(self, delay):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    async def penalize_async(self, delay):
+        self.penalize(delay)
+
+
+# Function to create the table holding the shared token buckets (one row per API)
+def ensure_rate_limit_bucket_table(connection):
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+            api_id INTEGER PRIMARY KEY,
+            tokens DOUBLE PRECISION NOT NULL,
+            updated_at DOUBLE PRECISION NOT NULL,
+            blocked_until DOUBLE PRECISION NOT NULL DEFAULT 0
+        )
+    """))
+
+
+# Token bucket kept in Postgres (rate_limit_buckets) instead of in the process, so all gunicorn workers,
+# job workers and scheduler threads calling an API draw from one bucket of max_requests per time_window.
+# Every reserve() is one atomic upsert of the API's row timed with the database clock, and penalize()
+# holds back every process. When the database cannot be reached the in-process bucket is used instead.
+# The async variants run those statements on a worker thread so they never block the fetcher's event loop.
+class SharedRateLimiter(RateLimiter):
+    def __init__(self, api_id, engine, max_requests, time_window, throttling_strategy=None):
+        super().__init__(max_requests, time_window, throttling_strategy)
+        self.api_id = api_id
+        self.engine = engine
+        self.table_ready = False
+
+    def execute(self, query, params):
+        with self.engine.begin() as connection:
+            if not self.table_ready:
+                ensure_rate_limit_bucket_table(connection)
+                self.table_ready = True
+            return connection.execute(text(query), params).fetchone()
+
+    def reserve(self):
+        try:
+            row = self.execute("""
+                INSERT INTO rate_limit_buckets AS b (api_id, tokens, updated_at, blocked_until)
+                VALUES (:api_id, :first_tokens, extract(epoch from clock_timestamp()), 0)
+                ON CONFLICT (api_id) DO UPDATE SET
+                    tokens = LEAST(:capacity, b.tokens + (extract(epoch from clock_timestamp()) - b.updated_at) * :rate) - 1,
+                    updated_at = extract(epoch from clock_timestamp())
+                RETURNING tokens, blocked_until, extract(epoch from clock_timestamp()) AS now
+            """, {"api_id": self.api_id, "first_tokens": float(self.capacity - 1), "capacity": float(self.capacity), "rate": self.rate})
+        except Exception as e:
+            print(f"Shared rate limit bucket of API {self.api_id} unavailable, using the local bucket: {e}")
+            return super().reserve()
+        wait = -row.tokens / self.rate if row.tokens < 0 else 0.0
+        return max(wait, row.blocked_until - float(row.now))
+
+    def penalize(self, delay):
+        super().penalize(delay)
+        try:
+            self.execute("""
+                UPDATE rate_limit_buckets SET blocked_until = GREATEST(blocked_until, extract(epoch from clock_timestamp()) + :delay)
+                WHERE api_id = :api_id RETURNING api_id
+            """, {"api_id": self.api_id, "delay": float(delay)})
+        except Exception as e:
+            print(f"Could not share the backoff of API {self.api_id}: {e}")
+
+    async def acquire_async(self):
+        wait = await asyncio.to_thread(self.reserve)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def penalize_async(self, delay):
+        await asyncio.to_thread(self.penalize, delay)
+
+
+rate_limiters = {}
+rate_limiters_lock = threading.Lock()
+
+# Function to read the latest RateLimitingSettings of each API as {api_id: (max_requests, time_window, throttling_strategy)}
+def read_rate_limit_settings(api_ids, engine):
+    with engine.connect() as connection:
+        rows = connection.execute(text("""
+            SELECT DISTINCT ON (api_id) api_id, max_requests, time_window, throttling_strategy
+            FROM rate_limiting_settings WHERE api_id = ANY(:api_ids)
+            ORDER BY api_id, rate_limit_id DESC
+        """), {"api_ids": list(api_ids)}).fetchall()
+    return {row.api_id: (row.max_requests, row.time_window, row.throttling_strategy) for row in rows}
+
+# Function to build the limiter of an API: shared through Postgres unless rate_limit_shared (config.env) is false
+def build_rate_limiter(api_id, settings, engine):
+    if settings is None:
+        return None
+    if os.getenv('rate_limit_shared', 'true').lower() == 'true':
+        limiter = SharedRateLimiter(api_id, engine, *settings)
+    else:
+        limiter = RateLimiter(*settings)
+    limiter.settings = settings
+    return limiter
+
+# Function to return the limiter of an API, built from its latest RateLimitingSettings row
+# Returns None when the API has no rate limiting settings
+def get_rate_limiter(api_id, engine):
+    with rate_limiters_lock:
+        if api_id in rate_limiters:
+            return rate_limiters[api_id]
+    limiter = build_rate_limiter(api_id, read_rate_limit_settings([api_id], engine).get(api_id), engine)
+    with rate_limiters_lock:
+        return rate_limiters.setdefault(api_id, limiter)
+
+# Function to drop a cached limiter so the next call re-reads the API's settings
+def invalidate_rate_limiter(api_id=None):
+    with rate_limiters_lock:
+        if api_id is None:
+            rate_limiters.clear()
+        else:
+            rate_limiters.pop(api_id, None)
+
+# Function to drop only the cached limiters whose API settings changed (called when the configuration changes),
+# so a config change to one API does not reset the buckets of every other API
+def refresh_rate_limiters(engine):
+    with rate_limiters_lock:
+        api_ids = list(rate_limiters)
+    if not api_ids:
+        return
+    try:
+        latest = read_rate_limit_settings(api_ids, engine)
+    except Exception as e:
+        print(f"Could not re-read rate limiting settings, dropping all cached limiters: {e}")
+        invalidate_rate_limiter()
+        return
+    with rate_limiters_lock:
+        for api_id in api_ids:
+            limiter = rate_limiters.get(api_id)
+            if (limiter.settings if limiter is not None else None) != latest.get(api_id):
+                rate_limiters.pop(api_id, None)
@@ -0,0 +1,72 @@
+import time
+import random
+import asyncio
+import threading
+from sqlalchemy import text
+
+# Function to parse ErrorHandlingConfiguration.error_codes_to_retry ("500,502, 503" or "5xx,429")
+# into a set of exact codes and a set of code classes (the leading digit of "5xx")
+def parse_error_codes(error_codes_to_retry):
+    codes = set()
+    code_classes = set()
+    for part in str(error_codes_to_retry or "").replace(";", ",").split(","):
+        part = part.strip().lower()
+        if part.isdigit():
+            codes.add(int(part))
+        elif len(part) == 3 and part[0].isdigit() and part[1:] == "xx":
+            code_classes.add(int(part[0]))
+    return codes, code_classes
+
+
+# Retry policy of one endpoint built from its ErrorHandlingConfiguration row.
+# Only the listed status codes are retried (plus connection errors and timeouts, which carry no code),
+# up to retry_attempts times, waiting retry_delay milliseconds doubled per attempt with full jitter.
+class RetryPolicy:
+    def __init__(self, retry_attempts, retry_delay, error_codes_to_retry):
+        self.retry_attempts = max(0, int(retry_attempts or 0))
+        self.retry_delay_seconds = max(0, int(retry_delay or 0)) / 1000.0
+        self.codes, self.code_classes = parse_error_codes(error_codes_to_retry)
+
+    def should_retry(self, status_code, attempt):
+        if attempt >= self.retry_attempts:
+            return False
+        if status_code is None:
+            return True
+        return status_code in self.codes or status_code // 100 in self.code_classes
+
+    def delay(self, attempt):
+        return random.uniform(0, self.retry_delay_seconds * (2 ** attempt))
+
+    def sleep(self, attempt):
+        time.sleep(self.delay(attempt))
+
+    async def sleep_async(self, attempt):
+        await asyncio.sleep(self.delay(attempt))
+
+
+retry_policies = {}
+retry_policies_lock = threading.Lock()
+
+# Function to return the retry policy of an endpoint from its latest ErrorHandlingConfiguration row
+# Returns None when the endpoint has no error handling configuration
+def get_retry_policy(endpoint_id, engine):
+    with retry_policies_lock:
+        if endpoint_id in retry_policies:
+            return retry_policies[endpoint_id]
+    with engine.connect() as connection:
+        settings = connection.execute(text("""
+            SELECT retry_attempts, retry_delay, error_codes_to_retry
+            FROM error_handling_configurations WHERE endpoint_id = :endpoint_id
+            ORDER BY error_config_id DESC LIMIT 1
+        """), {"endpoint_id": endpoint_id}).fetchone()
+    policy = RetryPolicy(settings.retry_attempts, settings.retry_delay, settings.error_codes_to_retry) if settings else None
+    with retry_policies_lock:
+        return retry_policies.setdefault(endpoint_id, policy)
+
+# Function to drop a cached policy so the next call re-reads the endpoint's settings
+def invalidate_retry_policy(endpoint_id=None):
+    with retry_policies_lock:
+        if endpoint_id is None:
+            retry_policies.clear()
+        else:
+            retry_policies.pop(endpoint_id, None)
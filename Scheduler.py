@@ -0,0 +1,243 @@
+import os
+import re
+import threading
+import psycopg2
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+
+CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 6))
+CRON_NAMES = {
+    "month": {name: i + 1 for i, name in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"))},
+    "weekday": {name: i for i, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+}
+CRON_ALIASES = {
+    "@yearly": "0 0 1 1 *", "@annually": "0 0 1 1 *", "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0", "@daily": "0 0 * * *", "@midnight": "0 0 * * *", "@hourly": "0 * * * *"
+}
+FREQUENCY_MINUTES = {"minutely": 1, "hourly": 60, "daily": 1440, "weekly": 10080, "monthly": 43200}
+
+# Postgres advisory lock namespace of scheduled pipelines (the second key is the endpoint id)
+SCHEDULER_LOCK_NAMESPACE = 7301
+
+def cron_value(value, name):
+    names = CRON_NAMES.get(name, {})
+    return names[value] if value in names else int(value)
+
+# Function to parse one cron field ("*", "*/15", "1-5", "mon-fri", "0,30") into the set of allowed values
+def parse_cron_field(field, name, low, high):
+    values = set()
+    for part in field.lower().split(","):
+        step = 1
+        if "/" in part:
+            part, step = part.split("/", 1)
+            step = int(step)
+        if part in ("*", ""):
+            start, end = low, high
+        elif "-" in part:
+            start, end = (cron_value(value, name) for value in part.split("-", 1))
+        else:
+            start = cron_value(part, name)
+            end = high if step > 1 else start
+        if name == "weekday":
+            # cron allows 7 for Sunday as well as 0
+            start, end = min(start, 7), min(end, 7)
+        values.update(value % 7 if name == "weekday" else value for value in range(start, end + 1, step))
+    if not values or min(values) < low or max(values) > high:
+        raise ValueError(f"Invalid cron {name} field: {field}")
+    return values
+
+# Function to parse a five-field cron expression (or an alias like @daily) into per-field value sets
+def parse_cron_expression(cron_expression):
+    cron_expression = CRON_ALIASES.get(cron_expression.strip().lower(), cron_expression)
+    fields = cron_expression.split()
+    if len(fields) != 5:
+        raise ValueError(f"Cron expression must have 5 fields: {cron_expression}")
+    schedule = {name: parse_cron_field(field, name, low, high) for field, (name, low, high) in zip(fields, CRON_FIELDS)}
+    # when both day fields are restricted cron runs on either of them, otherwise on both
+    schedule["day_or_weekday"] = fields[2] != "*" and fields[4] != "*"
+    return schedule
+
+def cron_day_matches(schedule, moment):
+    day_match = moment.day in schedule["day"]
+    weekday_match = (moment.weekday() + 1) % 7 in schedule["weekday"]
+    if schedule["day_or_weekday"]:
+        return day_match or weekday_match
+    return day_match and weekday_match
+
+# Function to return the first minute after `after` that matches a parsed cron schedule
+# Non-matching months, days and hours are skipped whole, so this takes at most a few hundred steps
+def next_cron_time(schedule, after):
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    limit = moment + timedelta(days=366 * 5)
+    while moment < limit:
+        if moment.month not in schedule["month"]:
+            moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+        elif not cron_day_matches(schedule, moment):
+            moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+        elif moment.hour not in schedule["hour"]:
+            moment = moment.replace(minute=0) + timedelta(hours=1)
+        elif moment.minute not in schedule["minute"]:
+            moment = moment + timedelta(minutes=1)
+        else:
+            return moment
+    return None
+
+# Function to convert a SchedulingConfiguration.frequency such as "hourly", "every 15 minutes" or "30m" into minutes
+def parse_frequency_minutes(frequency):
+    frequency = str(frequency or "").strip().lower()
+    if frequency in FREQUENCY_MINUTES:
+        return FREQUENCY_MINUTES[frequency]
+    match = re.match(r"^(?:every\s+)?(\d+)\s*([a-z]*)$", frequency)
+    if not match:
+        return None
+    amount, unit = int(match.group(1)), match.group(2)
+    for prefix, minutes in (("mo", 43200), ("m", 1), ("h", 60), ("d", 1440), ("w", 10080)):
+        if unit.startswith(prefix) or (not unit and prefix == "m"):
+            return amount * minutes
+    return None
+
+# Function to compute when a schedule should next run after its last run
+# The cron expression wins; the frequency is the fallback for rows without a usable cron expression
+def next_run_time(cron_expression, frequency, last_run_time):
+    last_run_time = last_run_time or datetime.min
+    if cron_expression and cron_expression.strip():
+        try:
+            return next_cron_time(parse_cron_expression(cron_expression), last_run_time)
+        except ValueError as e:
+            print(f"Ignoring cron expression '{cron_expression}': {e}")
+    minutes = parse_frequency_minutes(frequency)
+    if minutes is None:
+        return None
+    if last_run_time == datetime.min:
+        return last_run_time
+    return last_run_time + timedelta(minutes=minutes)
+
+# Function to load every schedule together with the endpoint, extraction path and table its pipeline needs
+def load_schedules(engine):
+    with engine.connect() as connection:
+        rows = connection.execute(text("""
+            SELECT DISTINCT ON (sc.schedule_id)
+                sc.schedule_id, sc.endpoint_id, sc.frequency, sc.cron_expression, sc.last_run_time,
+                a.api_name, e.endpoint_name, der.extraction_path, dm.database_table
+            FROM scheduling_configurations sc
+            JOIN endpoints e ON e.endpoint_id = sc.endpoint_id
+            JOIN apis a ON a.api_id = e.api_id
+            JOIN response_schemas rs ON rs.endpoint_id = e.endpoint_id
+            JOIN data_extraction_rules der ON der.schema_id = rs.schema_id
+            JOIN database_mappings dm ON dm.extraction_id = der.extraction_id
+            ORDER BY sc.schedule_id, dm.mapping_id DESC
+        """)).fetchall()
+    return [dict(row._mapping) for row in rows]
+
+
+# In-process scheduler for SchedulingConfiguration rows.
+# Every poll_seconds it loads the schedules, and each one whose next cron (or frequency) time has passed is
+# handed to run_pipeline(schedule) on a bounded thread pool. A schedule never overlaps a running pipeline of
+# the same endpoint: in-process through the running set, and across gunicorn workers and hosts through a
+# Postgres advisory lock per endpoint. last_run_time is set to the run's start time whether it succeeded or
+# not, so a failing pipeline waits for its next slot instead of being retried on every poll; runs missed
+# while the service was down collapse into one run.
+class PipelineScheduler:
+    def __init__(self, engine, db_conn_url, run_pipeline, max_workers=2, poll_seconds=30):
+        self.engine = engine
+        self.db_conn_url = db_conn_url
+        self.run_pipeline = run_pipeline
+        self.max_workers = max_workers
+        self.poll_seconds = poll_seconds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self.running = set()
+        self.last_runs = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.loop, name="pipeline-scheduler", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.executor.shutdown(wait=False)
+
+    def loop(self):
+        while not self.stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Scheduler poll failed: {e}")
+            self.stop_event.wait(self.poll_seconds)
+
+    # Function to submit every due schedule whose endpoint is not already running in this process
+    def tick(self, now=None):
+        now = now or datetime.now()
+        submitted = []
+        for schedule in load_schedules(self.engine):
+            due_at = next_run_time(schedule["cron_expression"], schedule["frequency"], schedule["last_run_time"])
+            if due_at is None or due_at > now:
+                continue
+            with self.lock:
+                if schedule["endpoint_id"] in self.running:
+                    continue
+                self.running.add(schedule["endpoint_id"])
+            self.executor.submit(self.run_schedule, schedule)
+            submitted.append(schedule["schedule_id"])
+        return submitted
+
+    def run_schedule(self, schedule):
+        endpoint_id = schedule["endpoint_id"]
+        started = datetime.now()
+        conn = None
+        try:
+            conn = psycopg2.connect(self.db_conn_url)
+            conn.autocommit = True
+            cursor = conn.cursor()
+            cursor.execute("SELECT pg_try_advisory_lock(%s, %s)", (SCHEDULER_LOCK_NAMESPACE, endpoint_id))
+            if not cursor.fetchone()[0]:
+                print(f"Schedule {schedule['schedule_id']} skipped: endpoint {endpoint_id} is running elsewhere")
+                return
+            try:
+                # another worker may have finished this run between our poll and taking the lock
+                cursor.execute("SELECT last_run_time FROM scheduling_configurations WHERE schedule_id = %s", (schedule["schedule_id"],))
+                row = cursor.fetchone()
+                due_at = next_run_time(schedule["cron_expression"], schedule["frequency"], row[0] if row else None)
+                if row is None or due_at is None or due_at > started:
+                    return
+                cursor.execute("UPDATE scheduling_configurations SET last_run_time = %s WHERE schedule_id = %s", (started, schedule["schedule_id"]))
+                result = {"schedule_id": schedule["schedule_id"], "started": started.isoformat()}
+                try:
+                    result["stats"] = self.run_pipeline(schedule)
+                    result["status"] = "succeeded"
+                except Exception as e:
+                    result["status"] = "failed"
+                    result["error"] = str(e)
+                    print(f"Scheduled pipeline for endpoint {endpoint_id} failed: {e}")
+                result["seconds"] = round((datetime.now() - started).total_seconds(), 3)
+                with self.lock:
+                    self.last_runs[endpoint_id] = result
+            finally:
+                cursor.execute("SELECT pg_advisory_unlock(%s, %s)", (SCHEDULER_LOCK_NAMESPACE, endpoint_id))
+        except Exception as e:
+            print(f"Scheduler could not run schedule {schedule['schedule_id']}: {e}")
+        finally:
+            if conn is not None:
+                conn.close()
+            with self.lock:
+                self.running.discard(endpoint_id)
+
+    def status(self):
+        with self.lock:
+            return {
+                "running": self.thread is not None and self.thread.is_alive(),
+                "max_workers": self.max_workers,
+                "poll_seconds": self.poll_seconds,
+                "active_endpoints": sorted(self.running),
+                "last_runs": {str(endpoint_id): result for endpoint_id, result in self.last_runs.items()}
+            }
+
+
+# Function to build the scheduler from config.env (scheduler_max_workers, scheduler_poll_seconds)
+def create_pipeline_scheduler(engine, db_conn_url, run_pipeline):
+    return PipelineScheduler(engine, db_conn_url, run_pipeline,
+                             int(os.getenv('scheduler_max_workers', 2)), int(os.getenv('scheduler_poll_seconds', 30)))
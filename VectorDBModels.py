@@ -3,7 +3,9 @@
 from sqlalchemy import create_engine, text
 import os 
 import time
+import threading
 from pinecone import Pinecone, ServerlessSpec
+from VectorStores import open_local_index, open_embedding_store
 import psycopg2
 
 from sqlalchemy import text
@@ -11,7 +13,12 @@ from sqlalchemy.orm import Session
 from datetime import datetime
 
 # Function to insert or update a record in the meta_data_vector_db table
-def upsert_metadata_vector_db(Session, table_name, index_name, metadata_fields, vector_fields):
+# high_water_mark and backend are only written when given, so callers that do not track them leave them untouched
+def upsert_metadata_vector_db(Session, table_name, index_name, metadata_fields, vector_fields, high_water_mark=None, backend=None):
+    optional_fields = {name: value for name, value in (("high_water_mark", high_water_mark), ("backend", backend)) if value is not None}
+    optional_set = "".join(f",\n                    {name} = :{name}" for name in optional_fields)
+    optional_columns = "".join(f", {name}" for name in optional_fields)
+    optional_values = "".join(f", :{name}" for name in optional_fields)
     with Session() as session:
         # Check if the record exists
         query = text("SELECT id FROM meta_data_vector_db WHERE table_name = :table_name")
@@ -19,12 +26,12 @@ def upsert_metadata_vector_db(Session, table_name, index_name, metadata_fields,
         
         if result:
             # Update existing record
-            update_query = text("""
+            update_query = text(f"""
                 UPDATE meta_data_vector_db
                 SET index_name = :index_name,
                     metadata_fields = :metadata_fields,
                     vector_fields = :vector_fields,
-                    created_at = :created_at
+                    created_at = :created_at{optional_set}
                 WHERE id = :id
             """)
             session.execute(update_query, {
@@ -32,54 +39,427 @@ def upsert_metadata_vector_db(Session, table_name, index_name, metadata_fields,
                 "metadata_fields": metadata_fields,
                 "vector_fields": vector_fields,
                 "created_at": datetime.now(),
-                "id": result.id
+                "id": result.id,
+                **optional_fields
             })
         else:
             # Insert new record
-            insert_query = text("""
-                INSERT INTO meta_data_vector_db (table_name, index_name, metadata_fields, vector_fields)
-                VALUES (:table_name, :index_name, :metadata_fields, :vector_fields)
+            insert_query = text(f"""
+                INSERT INTO meta_data_vector_db (table_name, index_name, metadata_fields, vector_fields{optional_columns})
+                VALUES (:table_name, :index_name, :metadata_fields, :vector_fields{optional_values})
             """)
             session.execute(insert_query, {
                 "table_name": table_name,
                 "index_name": index_name,
                 "metadata_fields": metadata_fields,
-                "vector_fields": vector_fields
+                "vector_fields": vector_fields,
+                **optional_fields
             })
         
         # Commit the transaction
         session.commit()
 
+# Function to create the vector index bookkeeping if it does not exist yet
+# meta_data_vector_db gets the incremental high-water mark, the per-table backend ('pinecone' or 'local')
+# and the index generation used to invalidate cached search results,
+# vector_index_row_state keeps the content hash of every indexed row per table and
+# row_state_index records which index ('backend:index_name') those hashes describe
+def ensure_vector_index_tables(Session):
+    with Session() as session:
+        session.execute(text("ALTER TABLE meta_data_vector_db ADD COLUMN IF NOT EXISTS row_state_index TEXT"))
+        session.execute(text("ALTER TABLE meta_data_vector_db ADD COLUMN IF NOT EXISTS high_water_mark TEXT"))
+        session.execute(text("ALTER TABLE meta_data_vector_db ADD COLUMN IF NOT EXISTS backend VARCHAR(20)"))
+        session.execute(text("ALTER TABLE meta_data_vector_db ADD COLUMN IF NOT EXISTS index_generation INTEGER NOT NULL DEFAULT 0"))
+        session.execute(text("""
+            CREATE TABLE IF NOT EXISTS vector_index_row_state (
+                table_name VARCHAR(255) NOT NULL,
+                row_id TEXT NOT NULL,
+                row_hash CHAR(32) NOT NULL,
+                PRIMARY KEY (table_name, row_id)
+            )
+        """))
+        session.commit()
 
-# Function to index data with all columns as metadata 
-def index_db_data(table_name,table_pk_id, p_index,vect_model,Session): 
+# Function to read which vector backend a table is indexed with, falling back to default_backend
+def get_vector_backend(Session, table_name, default_backend="pinecone"):
+    try:
+        with Session() as session:
+            query = text("SELECT backend FROM meta_data_vector_db WHERE table_name = :table_name")
+            result = session.execute(query, {"table_name": table_name}).fetchone()
+            if result and result.backend:
+                return result.backend
+    except Exception as e:
+        print(f"Error reading vector backend for {table_name}: {e}")
+    return default_backend
+
+index_generation_errors = set()
+
+# Function to read a table's index generation, which changes every time its index is written to
+# A table without a generation yet (or a database without the column yet) is at generation 0;
+# read errors are printed once per table instead of on every search
+def get_index_generation(Session, table_name):
     try:
-        column_names = []
-        users_data = None
         with Session() as session:
-            # Construct and execute the raw SQL query
-            query = text(f"SELECT * FROM {table_name}")
-            result = session.execute(query)
-            users_data = result.fetchall() 
+            query = text("SELECT index_generation FROM meta_data_vector_db WHERE table_name = :table_name")
+            result = session.execute(query, {"table_name": table_name}).fetchone()
+            if result and result.index_generation is not None:
+                return result.index_generation
+    except Exception as e:
+        if table_name not in index_generation_errors:
+            index_generation_errors.add(table_name)
+            print(f"Error reading index generation for {table_name}, using generation 0: {e}")
+    return 0
+
+index_binding_errors = set()
+
+# Function to read which index a table is served from as (backend, index_name); (None, None) when the table
+# has no metadata row yet, and None when it could not be read (printed once per table)
+def get_index_binding(Session, table_name):
+    try:
+        with Session() as session:
+            query = text("SELECT backend, index_name FROM meta_data_vector_db WHERE table_name = :table_name")
+            result = session.execute(query, {"table_name": table_name}).fetchone()
+            return (result.backend, result.index_name) if result else (None, None)
+    except Exception as e:
+        if table_name not in index_binding_errors:
+            index_binding_errors.add(table_name)
+            print(f"Error reading index binding for {table_name}, keeping cached handles: {e}")
+    return None
+
+# Function to advance a table's index generation so cached search results for it are no longer used
+def bump_index_generation(Session, table_name):
+    try:
+        with Session() as session:
+            query = text("UPDATE meta_data_vector_db SET index_generation = COALESCE(index_generation, 0) + 1 WHERE table_name = :table_name")
+            session.execute(query, {"table_name": table_name})
+            session.commit()
+    except Exception as e:
+        print(f"Error updating index generation for {table_name}: {e}")
+
+# Function to build the text that is embedded for a row (concatenated values for context)
+def build_row_text(row):
+    return " ".join(str(value) for value in row)
+
+# Generator that reads a table in chunks of batch_size rows
+# With stream=True a server-side cursor is used so only one chunk is held in memory at a time
+def fetch_table_batches(table_name, Session, batch_size, stream=False):
+    with Session() as session:
+        # Construct and execute the raw SQL query
+        query = text(f"SELECT * FROM {table_name}")
+        if stream:
+            result = session.execute(query, execution_options={"stream_results": True, "yield_per": batch_size})
             column_names = list(result.keys())
-         
-        for user in users_data:
-             # Create metadata dictionary using column names and tuple indices
-             metadata = {column_names[i]: user[i] for i in range(len(column_names))}
-             #print(f"metadata - {metadata}")  # Check the metadata being created
-            # Generate vector (using concatenated values for context)
-             user_vector = vect_model.encode(" ".join(str(user[i]) for i in range(len(column_names))))
-             #print(f"user_vector - {user_vector}")  
-             #print(f"metadata[table_pk_id] - {metadata[table_pk_id]}") 
-            # Insert vector with metadata into Pinecone
-             p_index.upsert(vectors=[(str(metadata[table_pk_id]), user_vector, metadata)])
+            for rows in result.partitions(batch_size):
+                yield column_names, rows
+            return
+        result = session.execute(query)
+        users_data = result.fetchall() 
+        column_names = list(result.keys())
+
+    for start in range(0, len(users_data), batch_size):
+        yield column_names, users_data[start:start + batch_size]
+
+# Generator that encodes each chunk of rows with one model call and yields Pinecone vectors
+# With an embedding_store the encoded vectors are also written to disk; with reuse_embeddings=True
+# vectors already in the store are read back instead of encoded, so a rebuild needs no inference
+def encode_row_batches(row_batches, table_pk_id, vect_model, batch_size, embedding_store=None, reuse_embeddings=False):
+    for column_names, rows in row_batches:
+        # Create metadata dictionary using column names and tuple indices
+        metadatas = [{column_names[i]: row[i] for i in range(len(column_names))} for row in rows]
+        ids = [str(metadata[table_pk_id]) for metadata in metadatas]
+        row_vectors = [None] * len(rows)
+        if reuse_embeddings and embedding_store is not None:
+            row_vectors = embedding_store.get(ids)
+        missing = [i for i in range(len(rows)) if row_vectors[i] is None]
+        if missing:
+            texts = [build_row_text(rows[i]) for i in missing]
+            for i, row_vector in zip(missing, vect_model.encode(texts, batch_size=batch_size)):
+                row_vectors[i] = row_vector
+        vectors = [(ids[i], row_vectors[i].tolist(), metadatas[i]) for i in range(len(rows))]
+        if embedding_store is not None and missing:
+            embedding_store.put([vectors[i] for i in missing])
+        yield vectors
+
+# Function to upsert encoded vectors in requests of at most batch_size vectors
+def upsert_vectors(p_index, vectors, batch_size):
+    for start in range(0, len(vectors), batch_size):
+        p_index.upsert(vectors=vectors[start:start + batch_size])
+
+# Function to index data with all columns as metadata 
+# Pipeline: fetch chunk -> build text -> encode chunk -> upsert chunk in one request
+# progress, when given, is called with the running counters after every upserted chunk;
+# encode_block_size fetches and encodes larger blocks (for multi-process encoders) while upserts stay at batch_size
+# with index_name the row state is rewritten afterwards, so a later incremental run starts from this build
+def index_db_data(table_name,table_pk_id, p_index,vect_model,Session,batch_size=100,stream=False,embedding_store=None,reuse_embeddings=False,progress=None,encode_block_size=None,index_name=None,backend=None): 
+    stats = {"rows": 0, "seconds": 0.0, "rows_per_sec": 0.0, "batch_size": batch_size, "stream": stream,
+             "reused_embeddings": reuse_embeddings}
+    try:
+        start_time = time.perf_counter()
+        row_batches = fetch_table_batches(table_name, Session, encode_block_size or batch_size, stream)
+        for vectors in encode_row_batches(row_batches, table_pk_id, vect_model, batch_size, embedding_store, reuse_embeddings):
+            if vectors:
+                upsert_vectors(p_index, vectors, batch_size)
+                stats["rows"] += len(vectors)
+                if progress is not None:
+                    progress(rows_encoded=stats["rows"], rows_upserted=stats["rows"])
+
+        if hasattr(p_index, "persist"):
+            p_index.persist()
+        if embedding_store is not None:
+            embedding_store.flush()
+        if index_name is not None:
+            rebuild_row_state(Session, table_name, table_pk_id, index_name, backend)
+        stats["seconds"] = round(time.perf_counter() - start_time, 3)
+        if stats["seconds"] > 0:
+            stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1)
+        print(f"Indexed {stats['rows']} rows of {table_name} in {stats['seconds']}s "
+              f"({stats['rows_per_sec']} rows/sec, batch_size={batch_size}, stream={stream})")
 
     except Exception as e:
         print(f"Failed to create Index for table {table_name} {e}")
-        return False
+        if hasattr(p_index, "discard"):
+            p_index.discard()
+        if embedding_store is not None:
+            embedding_store.discard()
+        return False , stats
+    finally:
+        if stats["rows"]:
+            bump_index_generation(Session, table_name)
 
-    return True 
+    return True , stats
         
+# Function to re-index only the rows that changed since the last run
+# Rows are compared by md5 of their full content computed in Postgres, so unchanged rows are
+# never transferred or encoded, and rows that disappeared from the table are deleted from the index
+def index_db_data_incremental(table_name,table_pk_id, p_index,vect_model,Session,index_name,batch_size=100,embedding_store=None,progress=None,encode_block_size=None,backend=None):
+    stats = {"rows": 0, "rows_changed": 0, "rows_deleted": 0, "rows_unchanged": 0,
+             "seconds": 0.0, "rows_per_sec": 0.0, "batch_size": batch_size, "incremental": True}
+    try:
+        start_time = time.perf_counter()
+        ensure_vector_index_tables(Session)
+        reset_row_state_if_stale(Session, table_name, p_index, index_name, backend)
+        with Session() as session:
+            current = {}
+            hash_query = text(f"SELECT {table_pk_id} AS row_key, {table_pk_id}::text AS row_id, md5(t::text) AS row_hash FROM {table_name} t")
+            for row in session.execute(hash_query):
+                current[row.row_id] = (row.row_key, row.row_hash)
+
+            state_query = text("SELECT row_id, row_hash FROM vector_index_row_state WHERE table_name = :table_name")
+            previous = {row.row_id: row.row_hash for row in session.execute(state_query, {"table_name": table_name})}
+
+        changed_ids = [row_id for row_id, (row_key, row_hash) in current.items() if previous.get(row_id) != row_hash]
+        deleted_ids = [row_id for row_id in previous if row_id not in current]
+        stats["rows"] = len(current)
+        stats["rows_unchanged"] = len(current) - len(changed_ids)
+
+        block_size = encode_block_size or batch_size
+        # an index that can roll back (the local backend) only keeps what persist() wrote, so its row state is
+        # written after persist(); otherwise a failed run would leave hashes for rows the index no longer holds
+        deferred_state = hasattr(p_index, "discard")
+        saved_ids = []
+        removed_ids = []
+        for start in range(0, len(changed_ids), block_size):
+            chunk_ids = changed_ids[start:start + block_size]
+            chunk_keys = [current[row_id][0] for row_id in chunk_ids]
+            with Session() as session:
+                result = session.execute(text(f"SELECT * FROM {table_name} WHERE {table_pk_id} = ANY(:keys)"), {"keys": chunk_keys})
+                column_names = list(result.keys())
+                rows = result.fetchall()
+            for vectors in encode_row_batches([(column_names, rows)], table_pk_id, vect_model, batch_size, embedding_store):
+                if vectors:
+                    upsert_vectors(p_index, vectors, batch_size)
+            if deferred_state:
+                saved_ids.extend(chunk_ids)
+            else:
+                save_row_state(Session, table_name, [(row_id, current[row_id][1]) for row_id in chunk_ids])
+            stats["rows_changed"] += len(chunk_ids)
+            if progress is not None:
+                progress(rows_to_index=len(changed_ids), rows_encoded=stats["rows_changed"], rows_upserted=stats["rows_changed"])
+
+        for start in range(0, len(deleted_ids), batch_size):
+            chunk_ids = deleted_ids[start:start + batch_size]
+            p_index.delete(ids=chunk_ids)
+            if embedding_store is not None:
+                embedding_store.delete(chunk_ids)
+            if deferred_state:
+                removed_ids.extend(chunk_ids)
+            else:
+                delete_row_state(Session, table_name, chunk_ids)
+            stats["rows_deleted"] += len(chunk_ids)
+            if progress is not None:
+                progress(rows_deleted=stats["rows_deleted"])
+
+        if hasattr(p_index, "persist"):
+            p_index.persist()
+        if embedding_store is not None:
+            embedding_store.flush()
+        for start in range(0, len(saved_ids), block_size):
+            save_row_state(Session, table_name, [(row_id, current[row_id][1]) for row_id in saved_ids[start:start + block_size]])
+        for start in range(0, len(removed_ids), batch_size):
+            delete_row_state(Session, table_name, removed_ids[start:start + batch_size])
+        stats["seconds"] = round(time.perf_counter() - start_time, 3)
+        if stats["seconds"] > 0:
+            stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1)
+        high_water_mark = f"{datetime.now().isoformat()} rows={stats['rows']}"
+        upsert_metadata_vector_db(Session, table_name, index_name, "", "", high_water_mark)
+        print(f"Incrementally indexed {table_name}: {stats['rows_changed']} changed, "
+              f"{stats['rows_deleted']} deleted, {stats['rows_unchanged']} unchanged in {stats['seconds']}s")
+
+    except Exception as e:
+        print(f"Failed to incrementally index table {table_name} {e}")
+        if hasattr(p_index, "discard"):
+            p_index.discard()
+        if embedding_store is not None:
+            embedding_store.discard()
+        return False , stats
+    finally:
+        if stats["rows_changed"] or stats["rows_deleted"]:
+            bump_index_generation(Session, table_name)
+
+    return True , stats
+
+# Function to read how many vectors an index holds (Pinecone returns an object, the local index a dict)
+def get_index_vector_count(p_index):
+    stats = p_index.describe_index_stats()
+    if isinstance(stats, dict):
+        return stats.get("total_vector_count", 0)
+    return getattr(stats, "total_vector_count", 0)
+
+# Function to forget a table's row state and record which index the new state will describe
+def clear_row_state(Session, table_name, state_index):
+    with Session() as session:
+        session.execute(text("DELETE FROM vector_index_row_state WHERE table_name = :table_name"), {"table_name": table_name})
+        session.execute(text("UPDATE meta_data_vector_db SET row_state_index = :state_index WHERE table_name = :table_name"),
+                        {"table_name": table_name, "state_index": state_index})
+        session.commit()
+
+# Function to drop a table's row state when it does not describe the index about to be written:
+# it was recorded for another index name or backend, or the index is empty (new, recreated or wiped),
+# so the incremental run re-indexes every row instead of skipping them as unchanged
+def reset_row_state_if_stale(Session, table_name, p_index, index_name, backend):
+    state_index = f"{backend}:{index_name}"
+    with Session() as session:
+        result = session.execute(text("SELECT row_state_index FROM meta_data_vector_db WHERE table_name = :table_name"),
+                                 {"table_name": table_name}).fetchone()
+    if result is None or result.row_state_index != state_index or get_index_vector_count(p_index) == 0:
+        clear_row_state(Session, table_name, state_index)
+
+# Function to replace a table's row state with the content hashes of all its rows after a full build
+def rebuild_row_state(Session, table_name, table_pk_id, index_name, backend):
+    clear_row_state(Session, table_name, f"{backend}:{index_name}")
+    with Session() as session:
+        session.execute(text(f"""
+            INSERT INTO vector_index_row_state (table_name, row_id, row_hash)
+            SELECT :table_name, {table_pk_id}::text, md5(t::text) FROM {table_name} t
+            ON CONFLICT (table_name, row_id) DO UPDATE SET row_hash = EXCLUDED.row_hash
+        """), {"table_name": table_name})
+        session.commit()
+
+# Function to record the content hash of rows that were just upserted into the index
+def save_row_state(Session, table_name, row_hashes):
+    if not row_hashes:
+        return
+    with Session() as session:
+        query = text("""
+            INSERT INTO vector_index_row_state (table_name, row_id, row_hash)
+            VALUES (:table_name, :row_id, :row_hash)
+            ON CONFLICT (table_name, row_id) DO UPDATE SET row_hash = EXCLUDED.row_hash
+        """)
+        session.execute(query, [{"table_name": table_name, "row_id": row_id, "row_hash": row_hash} for row_id, row_hash in row_hashes])
+        session.commit()
+
+# Function to forget rows that were removed from the index
+def delete_row_state(Session, table_name, row_ids):
+    if not row_ids:
+        return
+    with Session() as session:
+        query = text("DELETE FROM vector_index_row_state WHERE table_name = :table_name AND row_id = ANY(:row_ids)")
+        session.execute(query, {"table_name": table_name, "row_ids": list(row_ids)})
+        session.commit()
+
+pinecone_clients = {}
+pinecone_clients_lock = threading.Lock()
+
+# Function to reuse one Pinecone client (and its connection pool) per API key
+def get_pinecone_client(pinecone_api_key):
+    with pinecone_clients_lock:
+        pc = pinecone_clients.get(pinecone_api_key)
+        if pc is None:
+            pc = Pinecone(
+                api_key=pinecone_api_key
+            )
+            pinecone_clients[pinecone_api_key] = pc
+        return pc
+
+# Registry of resolved index handles per table for the lifetime of the process.
+# resolve(table_name) runs the full existence checks (table, index, stats) the first time a table is
+# used; later lookups return the cached (index, index_name) without touching Postgres or Pinecone.
+# Each handle remembers the table's (backend, index_name) binding from get_binding(table_name); at most once
+# per check_seconds the binding is read again and a handle whose binding changed (another worker re-indexed
+# the table into another backend or index) is resolved again, so every worker follows the switch.
+# Only successful resolutions are cached, and invalidate() forces the next lookup in this worker to resolve again.
+class IndexHandleRegistry:
+    def __init__(self, get_binding=None, check_seconds=2):
+        self.get_binding = get_binding
+        self.check_seconds = check_seconds
+        self.handles = {}
+        self.checked_at = {}
+        self.table_locks = {}
+        self.lock = threading.Lock()
+
+    def binding(self, table_name):
+        binding = self.get_binding(table_name) if self.get_binding is not None else None
+        with self.lock:
+            self.checked_at[table_name] = time.monotonic()
+        return binding
+
+    # Function to check a cached handle against the table's current binding (an unreadable binding keeps it)
+    def is_current(self, table_name, handle):
+        if self.get_binding is None:
+            return True
+        with self.lock:
+            if time.monotonic() - self.checked_at.get(table_name, 0.0) < self.check_seconds:
+                return True
+        binding = self.binding(table_name)
+        return binding is None or binding == handle[2]
+
+    def get(self, table_name, resolve):
+        handle = self.handles.get(table_name)
+        if handle is not None and self.is_current(table_name, handle):
+            return handle[0], handle[1]
+        with self.lock:
+            table_lock = self.table_locks.setdefault(table_name, threading.Lock())
+        # one resolution per table at a time, other tables are not blocked
+        with table_lock:
+            current = self.handles.get(table_name)
+            if current is None or current is handle:
+                index , index_name = resolve(table_name)
+                if index is None:
+                    self.handles.pop(table_name, None)
+                    return None , None
+                current = (index, index_name, self.binding(table_name))
+                self.handles[table_name] = current
+        return current[0], current[1]
+
+    def put(self, table_name, index, index_name):
+        if index is not None:
+            self.handles[table_name] = (index, index_name, self.binding(table_name))
+
+    def invalidate(self, table_name=None):
+        with self.lock:
+            if table_name is None:
+                self.handles.clear()
+            else:
+                self.handles.pop(table_name, None)
+
+    def tables(self):
+        return sorted(self.handles)
+
+
+# Function to build the index handle registry checking bindings every index_handle_check_seconds (config.env)
+def create_index_handle_registry(Session):
+    return IndexHandleRegistry(lambda table_name: get_index_binding(Session, table_name), float(os.getenv('index_handle_check_seconds', 2)))
+
 def create_vector_index(table_name,database_url,pinecone_api_key,spec):
     table_exists = check_table_exists(table_name, database_url)
     if table_exists:
@@ -91,9 +471,7 @@ def create_vector_index(table_name,database_url,pinecone_api_key,spec):
     try:
         index_name = f"{table_name}-index"
         index_name = index_name.replace("_","-")
-        pc = Pinecone(
-            api_key=pinecone_api_key
-        )
+        pc = get_pinecone_client(pinecone_api_key)
         existing_indexes = [
             index_info["name"] for index_info in pc.list_indexes()
         ]
@@ -110,11 +488,12 @@ def create_vector_index(table_name,database_url,pinecone_api_key,spec):
             # wait for index to be initialized
             while not pc.describe_index(index_name).status['ready']:
                 time.sleep(1)
+            # give a freshly created index a moment before the first stats call
+            time.sleep(1)
         else:
             print(f"Index {index_name} already exists")
         # connect to index
         index = pc.Index(index_name)
-        time.sleep(1)
         # view index stats
         index.describe_index_stats()  
     
@@ -123,6 +502,22 @@ def create_vector_index(table_name,database_url,pinecone_api_key,spec):
         return None , None 
     return index , index_name
 
+# Function to open (or create) the local on-disk index for a table instead of a Pinecone index
+def create_local_vector_index(table_name,database_url,index_dir):
+    table_exists = check_table_exists(table_name, database_url)
+    if not table_exists:
+        print(f"The table '{table_name}' does not exist in the database.")
+        return None , None
+    try:
+        index_name = f"{table_name}-index"
+        index_name = index_name.replace("_","-")
+        index = open_local_index(index_name, index_dir)
+        index.describe_index_stats()
+    except Exception as e:
+        print(f"Failed creating local index: {e}")
+        return None , None
+    return index , index_name
+
 # Function to check if a table exists in the database
 def check_table_exists(table_name, db_url):
     try:
@@ -0,0 +1,478 @@
+import os
+import json
+import fcntl
+import threading
+import numpy as np
+
+# Lock that makes one thread of one process the writer of an on-disk store at a time:
+# a thread lock for the threads of this process and an flock on lock_file for other processes
+# (gunicorn and job workers that cache their own copy of the store)
+class StoreWriteLock:
+    def __init__(self, lock_file):
+        self.lock_file = lock_file
+        self.thread_lock = threading.Lock()
+        self.owner = None
+        self.fd = None
+
+    def held(self):
+        return self.owner == threading.get_ident()
+
+    def active(self):
+        return self.owner is not None
+
+    # returns False when the calling thread already holds the lock
+    def acquire(self):
+        if self.held():
+            return False
+        self.thread_lock.acquire()
+        os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        self.fd = open(self.lock_file, "w")
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        self.owner = threading.get_ident()
+        return True
+
+    def release(self):
+        if not self.held():
+            return
+        self.owner = None
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.fd.close()
+        self.fd = None
+        self.thread_lock.release()
+
+# Function to return a file's (mtime, inode) so a replaced file is noticed, or None when it does not exist
+def file_stamp(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_ino)
+    except FileNotFoundError:
+        return None
+
+
+# Local in-process vector index with the same upsert/query/delete/describe_index_stats
+# calls as a Pinecone Index, so index_db_data and the search endpoints work with either backend.
+# Small tables are searched brute-force; once a table reaches ivf_min_rows an IVF
+# (inverted file) coarse quantizer is trained and only the nprobe closest lists are scanned.
+# Every persist() writes a new generation of files and then swaps manifest.json in, so a crash never leaves
+# a half-written index. Writers hold the index's file lock from their first upsert/delete until persist() or
+# discard() and start from the latest persisted generation; readers in other processes reload once it changes.
+class LocalVectorIndex:
+    def __init__(self, index_name, index_dir, dimension=384, ivf_min_rows=50000, nprobe=8):
+        self.index_name = index_name
+        self.index_path = os.path.join(index_dir, index_name)
+        self.dimension = dimension
+        self.ivf_min_rows = ivf_min_rows
+        self.nprobe = nprobe
+        self.lock = threading.RLock()
+        self.vectors = np.zeros((0, dimension), dtype=np.float32)
+        self.count = 0
+        self.ids = []
+        self.metadata = []
+        self.id_to_row = {}
+        self.centroids = None
+        self.assignments = np.zeros(0, dtype=np.int32)
+        self.manifest_file = os.path.join(self.index_path, "manifest.json")
+        self.write_lock = StoreWriteLock(os.path.join(self.index_path, ".lock"))
+        self.generation = 0
+        self.loaded_stamp = None
+        self.load()
+
+    # Function to start a write session on the latest persisted generation
+    def begin(self):
+        if self.write_lock.acquire():
+            self.load()
+
+    # Function to pick up a generation persisted by another process since this copy was loaded
+    def reload_if_changed(self):
+        if not self.write_lock.active() and file_stamp(self.manifest_file) != self.loaded_stamp:
+            self.load()
+
+    # Function to make room for new rows by doubling the capacity of the vector matrix
+    def _reserve(self, rows_needed):
+        capacity = self.vectors.shape[0]
+        if self.count + rows_needed <= capacity:
+            return
+        new_capacity = max(self.count + rows_needed, capacity * 2, 1024)
+        vectors = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+        vectors[:self.count] = self.vectors[:self.count]
+        assignments = np.full(new_capacity, -1, dtype=np.int32)
+        assignments[:self.count] = self.assignments[:self.count]
+        self.vectors, self.assignments = vectors, assignments
+
+    def upsert(self, vectors):
+        self.begin()
+        with self.lock:
+            self._reserve(len(vectors))
+            for vector_id, values, metadata in vectors:
+                values = np.asarray(values, dtype=np.float32)
+                norm = np.linalg.norm(values)
+                if norm > 0:
+                    values = values / norm  # cosine metric: store unit vectors so scores are dot products
+                row = self.id_to_row.get(vector_id)
+                if row is None:
+                    row = self.count
+                    self.count += 1
+                    self.ids.append(vector_id)
+                    self.metadata.append(metadata)
+                    self.id_to_row[vector_id] = row
+                else:
+                    self.metadata[row] = metadata
+                self.vectors[row] = values
+                if self.centroids is not None:
+                    self.assignments[row] = int(np.argmax(self.centroids @ values))
+            if self.centroids is None and self.count >= self.ivf_min_rows:
+                self.train_ivf()
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids):
+        self.begin()
+        with self.lock:
+            for vector_id in ids:
+                row = self.id_to_row.pop(vector_id, None)
+                if row is None:
+                    continue
+                # Swap the last row into the freed slot so the matrix stays dense
+                last = self.count - 1
+                if row != last:
+                    self.vectors[row] = self.vectors[last]
+                    self.assignments[row] = self.assignments[last]
+                    self.ids[row] = self.ids[last]
+                    self.metadata[row] = self.metadata[last]
+                    self.id_to_row[self.ids[row]] = row
+                self.ids.pop()
+                self.metadata.pop()
+                self.count -= 1
+        return {}
+
+    # Function to train the IVF coarse quantizer with a few rounds of spherical k-means
+    def train_ivf(self, iterations=10):
+        with self.lock:
+            data = self.vectors[:self.count]
+            nlist = max(1, int(np.sqrt(self.count)))
+            rng = np.random.default_rng(0)
+            sample = data[rng.choice(self.count, size=min(self.count, nlist * 64), replace=False)]
+            centroids = sample[rng.choice(len(sample), size=nlist, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                for i in range(nlist):
+                    members = sample[labels == i]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        centroids[i] = centroid / max(np.linalg.norm(centroid), 1e-12)
+            self.centroids = centroids
+            for start in range(0, self.count, 65536):
+                block = data[start:start + 65536]
+                self.assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+
+    # Function to check a Pinecone style equality filter ({field: value} or {field: {"$eq"/"$in": ...}})
+    @staticmethod
+    def _matches_filter(metadata, filter):
+        for field, condition in filter.items():
+            value = metadata.get(field)
+            if isinstance(condition, dict):
+                if "$eq" in condition and value != condition["$eq"]:
+                    return False
+                if "$in" in condition and value not in condition["$in"]:
+                    return False
+            elif value != condition and str(value) != str(condition):
+                return False
+        return True
+
+    def query(self, vector, top_k=10, include_metadata=True, filter=None, **kwargs):
+        self.reload_if_changed()
+        with self.lock:
+            if self.count == 0:
+                return {"matches": []}
+            query_vector = np.asarray(vector, dtype=np.float32)
+            query_vector = query_vector / max(np.linalg.norm(query_vector), 1e-12)
+            rows = None
+            if self.centroids is not None and not filter:
+                probe = np.argsort(-(self.centroids @ query_vector))[:self.nprobe]
+                rows = np.flatnonzero(np.isin(self.assignments[:self.count], probe))
+            elif filter:
+                rows = np.array([row for row in range(self.count) if self._matches_filter(self.metadata[row], filter)], dtype=np.int64)
+            if rows is None:
+                scores = self.vectors[:self.count] @ query_vector
+                rows = np.arange(self.count)
+            else:
+                if len(rows) == 0:
+                    return {"matches": []}
+                scores = self.vectors[rows] @ query_vector
+            k = min(top_k, len(scores))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            matches = []
+            for position in best:
+                row = int(rows[position])
+                match = {"id": self.ids[row], "score": float(scores[position])}
+                if include_metadata:
+                    match["metadata"] = self.metadata[row]
+                matches.append(match)
+            return {"matches": matches}
+
+    def describe_index_stats(self):
+        self.reload_if_changed()
+        return {"dimension": self.dimension, "total_vector_count": self.count, "ivf": self.centroids is not None}
+
+    def generation_file(self, name, extension, generation):
+        return os.path.join(self.index_path, f"{name}-{generation}.{extension}")
+
+    # Function to write the index to disk as a new generation (vectors as .npy, ids and metadata as json)
+    # and end the write session; the manifest is replaced last, so readers see the old or the new generation
+    def persist(self):
+        if not self.write_lock.held():
+            return
+        try:
+            with self.lock:
+                generation = self.generation + 1
+                files = {"vectors": self.generation_file("vectors", "npy", generation), "rows": self.generation_file("rows", "json", generation)}
+                with open(files["vectors"], "wb") as f:
+                    np.save(f, self.vectors[:self.count])
+                    f.flush()
+                    os.fsync(f.fileno())
+                with open(files["rows"], "w") as f:
+                    json.dump({"ids": self.ids, "metadata": self.metadata}, f, default=str)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self.centroids is not None:
+                    files["centroids"] = self.generation_file("centroids", "npy", generation)
+                    with open(files["centroids"], "wb") as f:
+                        np.save(f, self.centroids)
+                        f.flush()
+                        os.fsync(f.fileno())
+                manifest_tmp = self.manifest_file + ".tmp"
+                with open(manifest_tmp, "w") as f:
+                    json.dump({"generation": generation, "files": {name: os.path.basename(path) for name, path in files.items()}}, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(manifest_tmp, self.manifest_file)
+                self.generation = generation
+                self.loaded_stamp = file_stamp(self.manifest_file)
+                # the previous generation stays for readers that are loading it right now
+                for name in os.listdir(self.index_path):
+                    prefix, _, suffix = name.partition(".")[0].partition("-")
+                    if prefix in ("vectors", "rows", "centroids") and suffix.isdigit() and int(suffix) < generation - 1:
+                        os.remove(os.path.join(self.index_path, name))
+        finally:
+            self.write_lock.release()
+
+    # Function to drop the unpersisted upserts/deletes of this session (after a failed run)
+    def discard(self):
+        if not self.write_lock.held():
+            return
+        try:
+            self.load()
+        finally:
+            self.write_lock.release()
+
+    # Function to read the latest persisted generation (indexes written before manifests existed are read too)
+    def load(self):
+        with self.lock:
+            self.loaded_stamp = file_stamp(self.manifest_file)
+            if self.loaded_stamp is not None:
+                with open(self.manifest_file) as f:
+                    manifest = json.load(f)
+                self.generation = manifest["generation"]
+                files = {name: os.path.join(self.index_path, file_name) for name, file_name in manifest["files"].items()}
+            else:
+                files = {"vectors": os.path.join(self.index_path, "vectors.npy"), "rows": os.path.join(self.index_path, "rows.json"),
+                         "centroids": os.path.join(self.index_path, "centroids.npy")}
+            if not os.path.exists(files["vectors"]):
+                return
+            vectors = np.load(files["vectors"])
+            with open(files["rows"]) as f:
+                rows = json.load(f)
+            self.vectors = vectors.astype(np.float32, copy=False)
+            self.count = len(rows["ids"])
+            self.ids = rows["ids"]
+            self.metadata = rows["metadata"]
+            self.id_to_row = {vector_id: row for row, vector_id in enumerate(self.ids)}
+            self.assignments = np.full(self.count, -1, dtype=np.int32)
+            self.centroids = None
+            if "centroids" in files and os.path.exists(files["centroids"]):
+                self.centroids = np.load(files["centroids"])
+                for start in range(0, self.count, 65536):
+                    block = self.vectors[start:start + 65536]
+                    self.assignments[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+            elif self.count >= self.ivf_min_rows:
+                self.train_ivf()
+
+
+local_indexes = {}
+local_indexes_lock = threading.Lock()
+
+# Function to open a local index once per process and reuse it across requests
+def open_local_index(index_name, index_dir):
+    with local_indexes_lock:
+        index = local_indexes.get(index_name)
+        if index is None:
+            index = LocalVectorIndex(index_name, index_dir,
+                                     ivf_min_rows=int(os.getenv('local_index_ivf_min_rows', 50000)),
+                                     nprobe=int(os.getenv('local_index_nprobe', 8)))
+            local_indexes[index_name] = index
+        return index
+
+
+# Persistent per-table embedding store: one raw float32/float16 matrix on disk plus an id -> row
+# offset table. The matrix is opened with numpy.memmap, so rebuilding or re-ranking reads the vectors
+# straight from disk instead of re-running the model. Updated ids are rewritten in place, new ids are
+# appended, deleted ids are dropped from the offset table and reclaimed by compact().
+# offsets.json is the commit point: rows past its count are uncommitted and are overwritten by the next
+# writer. A writer holds the store's file lock from its first put/delete until flush() or discard(), so
+# stores cached in other processes never append over each other, and they reload once offsets.json changes.
+class EmbeddingStore:
+    def __init__(self, table_name, store_dir, dimension=384, dtype="float32"):
+        self.table_name = table_name
+        self.store_path = os.path.join(store_dir, table_name)
+        self.matrix_file = os.path.join(self.store_path, "embeddings.bin")
+        self.offsets_file = os.path.join(self.store_path, "offsets.json")
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype)
+        self.lock = threading.RLock()
+        self.write_lock = StoreWriteLock(os.path.join(self.store_path, ".lock"))
+        self.count = 0
+        self.offsets = {}
+        self.loaded_stamp = None
+        self.load()
+
+    def load(self):
+        with self.lock:
+            self.loaded_stamp = file_stamp(self.offsets_file)
+            if self.loaded_stamp is None:
+                self.count = 0
+                self.offsets = {}
+                return
+            with open(self.offsets_file) as f:
+                info = json.load(f)
+            self.dimension = info["dimension"]
+            self.dtype = np.dtype(info["dtype"])
+            self.count = info["count"]
+            self.offsets = info["offsets"]
+
+    # Function to pick up rows committed by another process since this store was loaded
+    def reload_if_changed(self):
+        with self.lock:
+            if not self.write_lock.active() and file_stamp(self.offsets_file) != self.loaded_stamp:
+                self.load()
+
+    # Function to start a write session: take the file lock, reload the committed state and
+    # cut off rows an earlier writer appended but never committed
+    def begin(self):
+        if not self.write_lock.acquire():
+            return
+        with self.lock:
+            self.load()
+            if os.path.exists(self.matrix_file):
+                with open(self.matrix_file, "r+b") as f:
+                    f.truncate(self.count * self.row_bytes())
+
+    def row_bytes(self):
+        return self.dimension * self.dtype.itemsize
+
+    # Function to open the embedding matrix zero-copy ("r" for readers, "r+" to update rows in place)
+    def matrix(self, mode="r"):
+        if self.count == 0:
+            return np.zeros((0, self.dimension), dtype=self.dtype)
+        return np.memmap(self.matrix_file, dtype=self.dtype, mode=mode, shape=(self.count, self.dimension))
+
+    # Function to store the vectors of a batch of (id, values, metadata) tuples
+    def put(self, vectors):
+        self.begin()
+        with self.lock:
+            updates = {}
+            appends = {}
+            for vector_id, values, metadata in vectors:
+                row = self.offsets.get(vector_id)
+                if row is None:
+                    appends[vector_id] = values
+                else:
+                    updates[row] = values
+            if updates:
+                matrix = self.matrix("r+")
+                matrix[list(updates)] = np.asarray(list(updates.values()), dtype=self.dtype)
+                matrix.flush()
+                del matrix
+            if appends:
+                # write at the end of this session's rows, not the end of the file
+                with open(self.matrix_file, "r+b" if os.path.exists(self.matrix_file) else "wb") as f:
+                    f.seek(self.count * self.row_bytes())
+                    f.write(np.asarray(list(appends.values()), dtype=self.dtype).tobytes())
+                for vector_id in appends:
+                    self.offsets[vector_id] = self.count
+                    self.count += 1
+
+    # Function to look up stored vectors, returns one array (or None when not stored) per id
+    def get(self, ids):
+        self.reload_if_changed()
+        with self.lock:
+            matrix = self.matrix()
+            return [matrix[self.offsets[vector_id]] if vector_id in self.offsets else None for vector_id in ids]
+
+    def delete(self, ids):
+        self.begin()
+        with self.lock:
+            for vector_id in ids:
+                self.offsets.pop(vector_id, None)
+
+    # Function to rewrite the matrix with only live rows once deletes leave too many holes
+    def compact(self):
+        with self.lock:
+            if len(self.offsets) == self.count:
+                return
+            live_ids = list(self.offsets)
+            live_rows = np.fromiter((self.offsets[vector_id] for vector_id in live_ids), dtype=np.int64, count=len(live_ids))
+            compacted_file = self.matrix_file + ".tmp"
+            with open(compacted_file, "wb") as f:
+                matrix = self.matrix()
+                for start in range(0, len(live_rows), 65536):
+                    f.write(np.ascontiguousarray(matrix[live_rows[start:start + 65536]]).tobytes())
+                del matrix
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(compacted_file, self.matrix_file)
+            self.offsets = {vector_id: row for row, vector_id in enumerate(live_ids)}
+            self.count = len(live_ids)
+
+    # Function to commit the puts/deletes of this session: the matrix is synced to disk first, then the
+    # offset table is swapped in atomically, so a crash at any point leaves the last committed state readable
+    def flush(self):
+        if not self.write_lock.held():
+            return
+        try:
+            with self.lock:
+                if self.count and len(self.offsets) < self.count // 2:
+                    self.compact()
+                if os.path.exists(self.matrix_file):
+                    with open(self.matrix_file, "r+b") as f:
+                        os.fsync(f.fileno())
+                offsets_tmp = self.offsets_file + ".tmp"
+                with open(offsets_tmp, "w") as f:
+                    json.dump({"dimension": self.dimension, "dtype": self.dtype.name, "count": self.count, "offsets": self.offsets}, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(offsets_tmp, self.offsets_file)
+                self.loaded_stamp = file_stamp(self.offsets_file)
+        finally:
+            self.write_lock.release()
+
+    # Function to drop the uncommitted puts/deletes of this session (after a failed run)
+    def discard(self):
+        if not self.write_lock.held():
+            return
+        try:
+            self.load()
+        finally:
+            self.write_lock.release()
+
+
+embedding_stores = {}
+embedding_stores_lock = threading.Lock()
+
+# Function to open a table's embedding store once per process and reuse it across requests
+def open_embedding_store(table_name, store_dir):
+    with embedding_stores_lock:
+        store = embedding_stores.get(table_name)
+        if store is None:
+            store = EmbeddingStore(table_name, store_dir, dtype=os.getenv('embedding_store_dtype', 'float32'))
+            embedding_stores[table_name] = store
+        return store
@@ -0,0 +1,70 @@
+import json
+import pytest
+from Common import stream_config_json, get_config_json
+
+
+class FakeCursor:
+    def __init__(self, rows, columns):
+        self.rows = list(rows)
+        self.description = [(column,) for column in columns]
+        self.executed = None
+
+    def execute(self, query, params=None):
+        self.executed = (query, params)
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class FakeEngine:
+    def __init__(self, rows, columns=("header_id", "header_name", "header_value")):
+        self.rows = rows
+        self.columns = columns
+        self.cursors = []
+        self.closed = 0
+
+    def raw_connection(self):
+        return self
+
+    def cursor(self, name=None):
+        cursor = FakeCursor(self.rows, self.columns)
+        cursor.name = name
+        self.cursors.append(cursor)
+        return cursor
+
+    def close(self):
+        self.closed += 1
+
+
+def header_rows(count):
+    return [(i, f"X-Header-{i}", f"value {i}") for i in range(count)]
+
+
+@pytest.mark.parametrize("count, chunk_size", [(0, 2), (1, 2), (2, 2), (5, 2), (5, 1000)])
+def test_stream_config_json_is_one_json_array(count, chunk_size):
+    engine = FakeEngine(header_rows(count))
+    body = b"".join(stream_config_json("headers", 3, engine, chunk_size=chunk_size))
+
+    assert json.loads(body) == [{"header_id": i, "header_name": f"X-Header-{i}", "header_value": f"value {i}"} for i in range(count)]
+    assert engine.closed == 1
+
+
+def test_stream_config_json_filters_by_key_and_reads_all_rows_with_a_server_side_cursor():
+    engine = FakeEngine(header_rows(1))
+    b"".join(stream_config_json("headers", 3, engine))
+    b"".join(stream_config_json("headers", 0, engine))
+
+    by_key, all_rows = engine.cursors
+    assert by_key.name is None
+    assert by_key.executed == ("SELECT header_id, header_name, header_value FROM headers WHERE endpoint_id = %s ORDER BY header_id", (3,))
+    assert all_rows.name == "read_headers"
+    assert all_rows.executed[1] is None
+
+
+def test_get_config_json_matches_the_streamed_body():
+    engine = FakeEngine(header_rows(3))
+    assert json.loads(get_config_json("headers", 3, engine)) == json.loads(b"".join(stream_config_json("headers", 3, engine, chunk_size=2)))
@@ -0,0 +1,54 @@
+from sqlalchemy import create_engine
+from ConfigCache import ConfigCache
+
+
+def make_engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'config.db'}")
+
+
+def test_get_loads_once_and_does_not_cache_none(tmp_path):
+    cache = ConfigCache(make_engine(tmp_path), version_check_seconds=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return '{"endpoint_id": 1}'
+
+    assert cache.get("endpoints", 1, loader) == '{"endpoint_id": 1}'
+    assert cache.get("endpoints", "1", loader) == '{"endpoint_id": 1}'
+    assert len(loads) == 1
+    assert cache.get("headers", 1, lambda: None) is None
+    assert cache.stats()["size"] == 1
+
+
+def test_invalidate_reaches_other_workers(tmp_path):
+    engine = make_engine(tmp_path)
+    writer = ConfigCache(engine, version_check_seconds=0)
+    reader = ConfigCache(engine, version_check_seconds=0)
+    changes = []
+    reader.on_change(lambda: changes.append(1))
+
+    assert reader.get("apis", 0, lambda: "old") == "old"
+    assert reader.get("apis", 0, lambda: "new") == "old"
+    changes.clear()
+
+    writer.invalidate()
+    assert reader.get("apis", 0, lambda: "new") == "new"
+    assert changes == [1]
+
+
+def test_version_is_checked_at_most_once_per_interval(tmp_path):
+    engine = make_engine(tmp_path)
+    writer = ConfigCache(engine, version_check_seconds=0)
+    reader = ConfigCache(engine, version_check_seconds=60)
+    reader.get("apis", 0, lambda: "old")
+
+    writer.invalidate()
+    assert reader.get("apis", 0, lambda: "new") == "old"
+
+
+def test_lru_evicts_oldest_entries(tmp_path):
+    cache = ConfigCache(make_engine(tmp_path), version_check_seconds=60, max_size=2)
+    for key in range(3):
+        cache.get("endpoints", key, lambda: key)
+    assert cache.get("endpoints", 0, lambda: "reloaded") == "reloaded"
@@ -0,0 +1,20 @@
+from DataModel import build_field_mapping_rows
+
+
+def test_build_field_mapping_rows_from_mappings_and_response_fields():
+    rows = build_field_mapping_rows(
+        7,
+        [{"api_field_name": "userId", "database_field_name": "user_id", "data_type_conversion": "INTEGER", "is_nullable": True},
+         {"mapping_id": 9, "api_field_name": "name", "database_field_name": "name"}],
+        ["email"]
+    )
+
+    assert rows == [
+        {"mapping_id": 7, "api_field_name": "userId", "database_field_name": "user_id", "data_type_conversion": "INTEGER", "is_nullable": True},
+        {"mapping_id": 9, "api_field_name": "name", "database_field_name": "name", "data_type_conversion": None, "is_nullable": None},
+        {"mapping_id": 7, "api_field_name": "email", "database_field_name": "email", "data_type_conversion": "TEXT", "is_nullable": False}
+    ]
+
+
+def test_build_field_mapping_rows_without_fields():
+    assert build_field_mapping_rows(7) == []
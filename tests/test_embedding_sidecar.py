@@ -0,0 +1,112 @@
+import time
+import threading
+import numpy as np
+import pytest
+from EmbeddingSidecar import PriorityModelLock, EmbeddingSidecarServer, SidecarEncoder
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        texts = [sentences] if isinstance(sentences, str) else list(sentences)
+        if "fail" in texts:
+            raise ValueError("cannot encode")
+        self.calls.append(len(texts))
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def sidecar(tmp_path, monkeypatch):
+    monkeypatch.setenv("embedding_sidecar_bulk_slice", "2")
+    monkeypatch.setenv("query_batching_enabled", "false")
+    socket_path = str(tmp_path / "embedding.sock")
+    server = EmbeddingSidecarServer(socket_path, FakeModel())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, socket_path
+    server.shutdown()
+    server.server_close()
+
+
+def waiting_for(lock, bulk, order, name):
+    def run():
+        lock.acquire(bulk=bulk)
+        order.append(name)
+        lock.release()
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_queries_go_ahead_of_waiting_bulk_slices():
+    lock = PriorityModelLock()
+    order = []
+    lock.acquire(bulk=True)
+    bulk = waiting_for(lock, True, order, "bulk")
+    time.sleep(0.05)
+    query = waiting_for(lock, False, order, "query")
+    time.sleep(0.05)
+    lock.release()
+    bulk.join(1)
+    query.join(1)
+
+    assert order == ["query", "bulk"]
+
+
+def test_bulk_takes_the_lock_when_no_query_waits():
+    lock = PriorityModelLock()
+    lock.acquire(bulk=True)
+    lock.release()
+    with lock:
+        assert lock.busy
+    assert not lock.busy
+
+
+def test_client_round_trip_keeps_encode_shapes(sidecar):
+    server, socket_path = sidecar
+    client = SidecarEncoder(socket_path)
+    assert client.encode("abc").tolist() == [3.0, 1.0]
+    assert client.encode(["a", "bb"]).tolist() == [[1.0, 1.0], [2.0, 1.0]]
+
+
+def test_bulk_requests_are_encoded_in_slices(sidecar):
+    server, socket_path = sidecar
+    vectors = SidecarEncoder(socket_path).bulk_encoder().encode([str(i) * (i + 1) for i in range(5)])
+
+    assert vectors[:, 0].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert server.model.calls == [2, 2, 1]
+
+
+def test_model_errors_are_raised_in_the_client(sidecar):
+    server, socket_path = sidecar
+    client = SidecarEncoder(socket_path)
+    with pytest.raises(RuntimeError, match="cannot encode"):
+        client.encode(["fail"])
+    assert client.encode("ok").tolist() == [2.0, 1.0]
+
+
+def test_timed_out_requests_are_raised_not_resent(sidecar):
+    server, socket_path = sidecar
+    encode = server.model.encode
+    server.model.encode = lambda sentences, batch_size=32, **kwargs: time.sleep(0.3) or encode(sentences, batch_size)
+    client = SidecarEncoder(socket_path, timeout=0.1, autostart=True)
+
+    with pytest.raises(TimeoutError):
+        client.encode(["slow"])
+    time.sleep(0.3)
+    assert server.model.calls == [1]
+    server.model.encode = encode
+    assert client.encode("ok").tolist() == [2.0, 1.0]  # the timed out reply is not read as this one
+
+
+def test_missing_sidecar_is_raised_without_autostart(tmp_path):
+    client = SidecarEncoder(str(tmp_path / "missing.sock"))
+    with pytest.raises(FileNotFoundError):
+        client.encode("abc")
+
+
+def test_bulk_client_uses_the_bulk_timeout(sidecar):
+    server, socket_path = sidecar
+    assert SidecarEncoder(socket_path, timeout=5).bulk_encoder().timeout is None
+    assert SidecarEncoder(socket_path, timeout=5, bulk_timeout=600).bulk_encoder().timeout == 600
@@ -0,0 +1,58 @@
+import os
+import json
+import time
+import threading
+import Encoders
+
+
+class FakeOnnxEncoder:
+    def __init__(self, onnx_dir, quantized, threads):
+        self.onnx_dir = onnx_dir
+
+
+def fake_export(exports):
+    def export_onnx_model(model, onnx_dir, quantize=True):
+        exports.append(onnx_dir)
+        time.sleep(0.1)  # long enough for the other workers to reach the lock
+        with open(os.path.join(onnx_dir, "model-int8.onnx"), "w") as f:
+            f.write("model")
+    return export_onnx_model
+
+
+def test_workers_starting_together_export_once(tmp_path, monkeypatch):
+    exports = []
+    monkeypatch.setenv("encoder_backend", "onnx")
+    monkeypatch.setenv("encoder_onnx_dir", str(tmp_path))
+    monkeypatch.setattr(Encoders, "onnxruntime", object())
+    monkeypatch.setattr(Encoders, "load_torch_model", lambda model_name: "torch-model")
+    monkeypatch.setattr(Encoders, "export_onnx_model", fake_export(exports))
+    monkeypatch.setattr(Encoders, "OnnxSentenceEncoder", FakeOnnxEncoder)
+    monkeypatch.setattr(Encoders, "validate_encoder", lambda reference_model, encoder: 0.999)
+
+    encoders = []
+    workers = [threading.Thread(target=lambda: encoders.append(Encoders.load_encoder("org/mini"))) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert exports == [str(tmp_path / "org_mini")]
+    assert len(encoders) == 4 and all(isinstance(encoder, FakeOnnxEncoder) for encoder in encoders)
+    with open(tmp_path / "org_mini" / "validation-int8.json") as f:
+        assert json.load(f)["min_cosine"] == 0.999
+    assert not [name for name in os.listdir(tmp_path / "org_mini") if ".tmp" in name]
+
+
+def test_failed_validation_is_remembered(tmp_path, monkeypatch):
+    exports = []
+    monkeypatch.setenv("encoder_backend", "onnx")
+    monkeypatch.setenv("encoder_onnx_dir", str(tmp_path))
+    monkeypatch.setattr(Encoders, "onnxruntime", object())
+    monkeypatch.setattr(Encoders, "load_torch_model", lambda model_name: "torch-model")
+    monkeypatch.setattr(Encoders, "export_onnx_model", fake_export(exports))
+    monkeypatch.setattr(Encoders, "OnnxSentenceEncoder", FakeOnnxEncoder)
+    monkeypatch.setattr(Encoders, "validate_encoder", lambda reference_model, encoder: 0.5)
+
+    assert Encoders.load_encoder("mini") == "torch-model"
+    assert Encoders.load_encoder("mini") == "torch-model"
+    assert len(exports) == 1
@@ -0,0 +1,80 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from VectorDBModels import IndexHandleRegistry, get_index_binding
+
+
+class Resolver:
+    def __init__(self, bindings):
+        self.bindings = bindings
+        self.calls = []
+
+    def __call__(self, table_name):
+        self.calls.append(table_name)
+        backend, index_name = self.bindings[table_name]
+        return (f"{backend}-handle-{len(self.calls)}", index_name) if backend else (None, None)
+
+
+def test_handles_are_resolved_once_per_table():
+    resolver = Resolver({"users": ("local", "users-index")})
+    registry = IndexHandleRegistry(lambda table_name: resolver.bindings[table_name], check_seconds=60)
+
+    assert registry.get("users", resolver) == ("local-handle-1", "users-index")
+    assert registry.get("users", resolver) == ("local-handle-1", "users-index")
+    assert resolver.calls == ["users"]
+
+
+def test_backend_switch_in_another_worker_is_followed():
+    resolver = Resolver({"users": ("pinecone", "users-index")})
+    registry = IndexHandleRegistry(lambda table_name: resolver.bindings[table_name], check_seconds=0)
+    assert registry.get("users", resolver)[0] == "pinecone-handle-1"
+
+    resolver.bindings["users"] = ("local", "users-index")  # CreateIndexForDbObject ran in another worker
+    assert registry.get("users", resolver)[0] == "local-handle-2"
+    assert registry.get("users", resolver)[0] == "local-handle-2"
+
+
+def test_binding_is_checked_at_most_once_per_interval():
+    reads = []
+    resolver = Resolver({"users": ("pinecone", "users-index")})
+
+    def get_binding(table_name):
+        reads.append(table_name)
+        return resolver.bindings[table_name]
+
+    registry = IndexHandleRegistry(get_binding, check_seconds=60)
+    registry.get("users", resolver)
+    resolver.bindings["users"] = ("local", "users-index")
+    assert registry.get("users", resolver)[0] == "pinecone-handle-1"
+    assert reads == ["users"]
+
+
+def test_unreadable_binding_keeps_the_cached_handle():
+    resolver = Resolver({"users": ("local", "users-index")})
+    bindings = {"users": ("local", "users-index")}
+    registry = IndexHandleRegistry(lambda table_name: bindings[table_name], check_seconds=0)
+    registry.get("users", resolver)
+
+    bindings["users"] = None
+    assert registry.get("users", resolver)[0] == "local-handle-1"
+
+
+def test_failed_resolutions_are_not_cached():
+    resolver = Resolver({"users": (None, None)})
+    registry = IndexHandleRegistry()
+    assert registry.get("users", resolver) == (None, None)
+    assert registry.tables() == []
+    registry.put("users", "handle", "users-index")
+    registry.invalidate("users")
+    assert registry.tables() == []
+
+
+def test_get_index_binding_reads_the_metadata_row(tmp_path):
+    Session = sessionmaker(bind=create_engine(f"sqlite:///{tmp_path / 'meta.db'}"))
+    assert get_index_binding(Session, "users") is None  # no metadata table yet
+
+    with Session() as session:
+        session.execute(text("CREATE TABLE meta_data_vector_db (table_name TEXT, index_name TEXT, backend TEXT)"))
+        session.execute(text("INSERT INTO meta_data_vector_db VALUES ('users', 'users-index', 'local')"))
+        session.commit()
+    assert get_index_binding(Session, "users") == ("local", "users-index")
+    assert get_index_binding(Session, "orders") == (None, None)
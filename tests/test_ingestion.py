@@ -0,0 +1,170 @@
+import httpx
+import pytest
+import Ingestion
+from Ingestion import iter_endpoint_pages, iter_endpoint_pages_concurrent, parse_pagination_settings
+
+
+# Paginated API serving rows 0..total-1, at most server_page_size per page (a smaller limit is honoured)
+class FakeApi:
+    def __init__(self, total, server_page_size=20):
+        self.total = total
+        self.server_page_size = server_page_size
+        self.requests = []
+
+    def page(self, params):
+        self.requests.append(dict(params))
+        size = min(int(params.get("limit", self.server_page_size)), self.server_page_size)
+        if "offset" in params:
+            start = int(params["offset"])
+        elif "page" in params:
+            start = (int(params["page"]) - 1) * size
+        else:
+            start = 0
+        return {"data": {"items": [{"id": i} for i in range(start, min(start + size, self.total))]}}
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    links = {}
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, api):
+        self.api = api
+
+    def request(self, method, url, headers=None, params=None):
+        return FakeResponse(self.api.page(params or {}))
+
+
+def walk(api, pagination, query_params=None, start_state=None):
+    pages = iter_endpoint_pages("http://api.test/items", "GET", {}, query_params or {}, "data/items", pagination,
+                                http_session=FakeSession(api), start_state=start_state)
+    return [[item["id"] for item in items] for items, state in pages]
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    # route the concurrent walker's httpx client to a FakeApi
+    client_class = httpx.AsyncClient
+
+    def serve_api(api):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=api.page(dict(request.url.params))))
+        monkeypatch.setattr(Ingestion.httpx, "AsyncClient", lambda **kwargs: client_class(transport=transport, **kwargs))
+        return api
+    return serve_api
+
+
+def walk_concurrent(api, pagination, query_params=None, start_state=None, concurrency=4):
+    pages = iter_endpoint_pages_concurrent("http://api.test/items", "GET", {}, query_params or {}, "data/items", pagination,
+                                           concurrency, start_state=start_state)
+    return [([item["id"] for item in items], state) for items, state in pages]
+
+
+def loaded_ids(pages):
+    return [item_id for page in pages for item_id in page]
+
+
+def test_parse_pagination_settings():
+    settings = parse_pagination_settings({"pagination_type": "limit-offset", "page_parameter": "offset", "limit_parameter": "limit",
+                                          "termination_condition": "short_page, max_pages=7"}, {"limit": "25"})
+    assert (settings["type"], settings["page_size"], settings["stop_on_short_page"], settings["max_pages"]) == ("offset", 25, True, 7)
+    assert parse_pagination_settings({"pagination_type": "Page Number"}, {})["type"] == "page"
+    assert parse_pagination_settings(None, {})["type"] == "none"
+
+
+@pytest.mark.parametrize("pagination", [
+    {"pagination_type": "offset", "page_parameter": "offset"},
+    {"pagination_type": "offset", "page_parameter": "offset", "termination_condition": "short_page"},
+    {"pagination_type": "page", "page_parameter": "page", "termination_condition": "short_page"},
+])
+def test_walks_every_page_at_the_servers_page_size(pagination):
+    api = FakeApi(95)
+    assert loaded_ids(walk(api, pagination)) == list(range(95))
+
+
+def test_limit_parameter_sets_the_page_size():
+    api = FakeApi(95)
+    walk(api, {"pagination_type": "offset", "page_parameter": "offset", "limit_parameter": "limit", "termination_condition": "short_page"},
+         {"limit": "10"})
+    assert [request["offset"] for request in api.requests] == list(range(0, 100, 10))
+
+
+def test_offset_pagination_without_page_parameter_fetches_one_page(monkeypatch):
+    monkeypatch.setenv("ingest_max_pages", "50")
+    api = FakeApi(95, server_page_size=10)
+    assert loaded_ids(walk(api, {"pagination_type": "page", "page_parameter": ""})) == list(range(10))
+    assert len(api.requests) == 1
+
+
+def test_resume_state_continues_after_the_last_loaded_page():
+    api = FakeApi(95)
+    pagination = {"pagination_type": "offset", "page_parameter": "offset"}
+    pages = iter_endpoint_pages("http://api.test/items", "GET", {}, {}, "data/items", pagination, http_session=FakeSession(api))
+    next(pages)
+    items, state = next(pages)
+    pages.close()
+
+    assert state["position"] == 40
+    assert loaded_ids(walk(FakeApi(95), pagination, start_state=state)) == list(range(40, 95))
+
+
+@pytest.mark.parametrize("pagination", [
+    {"pagination_type": "offset", "page_parameter": "offset"},
+    {"pagination_type": "offset", "page_parameter": "offset", "termination_condition": "short_page"},
+    {"pagination_type": "page", "page_parameter": "page", "termination_condition": "short_page"},
+])
+def test_concurrent_walk_uses_the_servers_page_size(serve, pagination):
+    api = serve(FakeApi(95))
+    pages = walk_concurrent(api, pagination)
+    assert loaded_ids(page for page, state in pages) == list(range(95))
+
+
+def test_concurrent_walk_follows_a_server_that_caps_the_limit(serve):
+    api = serve(FakeApi(95, server_page_size=20))
+    pages = walk_concurrent(api, {"pagination_type": "offset", "page_parameter": "offset", "limit_parameter": "limit"}, {"limit": "50"})
+    assert loaded_ids(page for page, state in pages) == list(range(95))
+
+
+def test_concurrent_walk_resumes_a_sequential_checkpoint(serve):
+    pagination = {"pagination_type": "offset", "page_parameter": "offset"}
+    sequential = iter_endpoint_pages("http://api.test/items", "GET", {}, {}, "data/items", pagination,
+                                     http_session=FakeSession(FakeApi(95)))
+    next(sequential)
+    items, state = next(sequential)
+    sequential.close()
+    assert state["position"] == 40
+
+    api = serve(FakeApi(95))
+    pages = walk_concurrent(api, pagination, start_state=state)
+    assert loaded_ids(page for page, state in pages) == list(range(40, 95))
+
+
+def test_concurrent_checkpoints_resume_without_gaps_or_duplicates(serve):
+    pagination = {"pagination_type": "offset", "page_parameter": "offset"}
+    first_run = walk_concurrent(serve(FakeApi(95)), pagination)
+    page, state = first_run[1]
+    assert state == {"position": 40}
+
+    resumed = walk_concurrent(serve(FakeApi(95)), pagination, start_state=state)
+    assert loaded_ids(page for page, state in first_run[:2] + resumed) == list(range(95))
+    resumed_sequentially = walk(FakeApi(95), pagination, start_state=state)
+    assert loaded_ids(resumed_sequentially) == list(range(40, 95))
+
+
+def test_concurrent_walk_raises_client_errors(monkeypatch):
+    def broken_client(**kwargs):
+        raise RuntimeError("no client")
+
+    monkeypatch.setattr(Ingestion.httpx, "AsyncClient", broken_client)
+    with pytest.raises(RuntimeError, match="no client"):
+        walk_concurrent(None, {"pagination_type": "offset", "page_parameter": "offset"})
@@ -0,0 +1,89 @@
+import json
+import pytest
+from datetime import datetime
+from JobQueue import JobQueue, JobProgress, job_row_to_dict
+
+
+class FakeCursor:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def execute(self, query, params=None):
+        self.statements.append((" ".join(query.split()), params))
+
+
+class FakeConnection:
+    def __init__(self, statements):
+        self.statements = statements
+
+    def cursor(self, **kwargs):
+        return FakeCursor(self.statements)
+
+    def close(self):
+        pass
+
+
+class FakeQueue:
+    def __init__(self):
+        self.saved = []
+
+    def save_progress(self, job_id, counters):
+        self.saved.append((job_id, counters))
+
+
+def make_queue(handlers):
+    queue = JobQueue("postgresql://unused", handlers, max_workers=1)
+    queue.statements = []
+    queue.connect = lambda: FakeConnection(queue.statements)
+    return queue
+
+
+def test_job_row_to_dict_decodes_json_and_timestamps():
+    job = job_row_to_dict({"job_id": 1, "params": '{"table": "users"}', "progress": "{}", "result": None,
+                           "created_at": datetime(2024, 1, 1, 12, 0), "finished_at": None})
+    assert job == {"job_id": 1, "params": {"table": "users"}, "progress": {}, "result": None,
+                   "created_at": "2024-01-01T12:00:00", "finished_at": None}
+
+
+def test_progress_is_written_at_most_once_per_interval():
+    queue = FakeQueue()
+    progress = JobProgress(queue, 7, flush_seconds=60)
+    progress(rows=10)
+    progress(rows=20, pages=2)
+
+    assert queue.saved == [(7, {"rows": 10})]
+    assert progress.snapshot() == {"rows": 20, "pages": 2}
+
+
+def test_enqueue_rejects_unknown_job_types():
+    with pytest.raises(ValueError):
+        make_queue({"index": lambda params, progress: None}).enqueue("ingest", {})
+
+
+def test_run_records_the_result_and_frees_the_slot():
+    def handler(params, progress):
+        progress(rows=params["rows"])
+        return {"indexed": params["rows"]}
+
+    queue = make_queue({"index": handler})
+    queue.slots.acquire()
+    queue.active.add(5)
+    queue.run({"job_id": 5, "job_type": "index", "params": {"rows": 3}})
+
+    status, result, error, progress, job_id = queue.statements[-1][1]
+    assert (status, json.loads(result), error, json.loads(progress), job_id) == ("succeeded", {"indexed": 3}, None, {"rows": 3}, 5)
+    assert queue.active == set()
+    assert queue.slots.acquire(blocking=False)
+
+
+def test_run_records_handler_errors():
+    def handler(params, progress):
+        raise RuntimeError("table not found")
+
+    queue = make_queue({"index": handler})
+    queue.slots.acquire()
+    queue.run({"job_id": 6, "job_type": "index", "params": {}})
+
+    status, result, error, progress, job_id = queue.statements[-1][1]
+    assert (status, result, error, job_id) == ("failed", None, "table not found", 6)
+    assert queue.slots.acquire(blocking=False)
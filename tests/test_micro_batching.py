@@ -0,0 +1,98 @@
+import threading
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from MicroBatching import MicroBatchEncoder
+
+
+class FakeModel:
+    def __init__(self, delay=None):
+        self.calls = []
+        self.delay = delay
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        texts = [sentences] if isinstance(sentences, str) else list(sentences)
+        self.calls.append(len(texts))
+        if self.delay:
+            self.delay.wait(1)
+        vectors = np.array([[float(len(text)), float(sum(map(ord, text)))] for text in texts])
+        return vectors[0] if isinstance(sentences, str) else vectors
+
+
+def expected(text):
+    return [float(len(text)), float(sum(map(ord, text)))]
+
+
+def test_single_and_list_requests_keep_their_shape():
+    encoder = MicroBatchEncoder(FakeModel())
+    assert encoder.encode("hello").tolist() == expected("hello")
+    assert encoder.encode(["a", "bb"]).tolist() == [expected("a"), expected("bb")]
+
+
+def test_concurrent_requests_share_batches_and_get_their_own_vectors():
+    release = threading.Event()
+    model = FakeModel(delay=release)
+    encoder = MicroBatchEncoder(model, max_batch_size=64, max_wait_ms=20)
+    texts = [f"query {i}" for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        futures = [pool.submit(encoder.encode, text) for text in texts]
+        release.set()
+        results = [future.result(timeout=5).tolist() for future in futures]
+
+    assert results == [expected(text) for text in texts]
+    stats = encoder.stats()
+    assert stats["texts"] == 40
+    assert stats["batches"] < 40
+    assert max(model.calls) <= 64
+
+
+def test_batches_never_exceed_max_batch_size():
+    model = FakeModel()
+    encoder = MicroBatchEncoder(model, max_batch_size=4, max_wait_ms=20)
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda text: encoder.encode([text, text]).tolist(), [str(i) for i in range(10)]))
+
+    assert results == [[expected(str(i))] * 2 for i in range(10)]
+    assert max(model.calls) <= 4
+
+
+def test_large_requests_bypass_the_queue():
+    model = FakeModel()
+    encoder = MicroBatchEncoder(model, max_batch_size=4)
+    encoder.encode([str(i) for i in range(10)])
+    assert model.calls == [10]
+    assert encoder.stats()["batches"] == 0
+
+
+def test_model_errors_reach_every_caller_of_the_batch():
+    class BrokenModel:
+        def encode(self, sentences, **kwargs):
+            raise RuntimeError("model crashed")
+
+    encoder = MicroBatchEncoder(BrokenModel())
+    with pytest.raises(RuntimeError, match="model crashed"):
+        encoder.encode("hello")
+
+
+def test_encode_options_go_straight_to_the_model():
+    class OptionModel(FakeModel):
+        def encode(self, sentences, batch_size=32, **kwargs):
+            self.options = kwargs
+            return super().encode(sentences, batch_size)
+
+    model = OptionModel()
+    encoder = MicroBatchEncoder(model)
+    assert encoder.encode("hello", normalize_embeddings=True).tolist() == expected("hello")
+    assert model.options == {"normalize_embeddings": True}
+    assert encoder.stats()["batches"] == 0
+
+
+def test_requests_time_out_when_the_dispatcher_is_gone(monkeypatch):
+    monkeypatch.setattr(MicroBatchEncoder, "dispatch", lambda self: None)
+    encoder = MicroBatchEncoder(FakeModel(), timeout_seconds=0.1)
+    encoder.thread.join(1)
+    with pytest.raises(TimeoutError):
+        encoder.encode("hello")
+
+    encoder.run([encoder.requests.get_nowait()])  # a timed out request is dropped, not encoded
+    assert encoder.model.calls == []
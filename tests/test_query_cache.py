@@ -0,0 +1,89 @@
+import numpy as np
+from QueryCache import QueryEmbeddingCache, MemoryResultBackend, SQLiteResultBackend, SearchResultCache
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        self.calls.append(sentences)
+        if isinstance(sentences, str):
+            return np.array([float(len(sentences))])
+        return np.array([[float(len(text))] for text in sentences])
+
+
+def test_query_embeddings_are_shared_by_normalized_text():
+    cache = QueryEmbeddingCache()
+    model = FakeModel()
+    assert cache.get_or_encode(model, "mini", "red  shoes") == [9.0]
+    assert cache.get_or_encode(model, "mini", " red shoes ") == [9.0]
+    assert cache.get_or_encode(model, "other", "red shoes") == [9.0]
+    assert model.calls == ["red shoes", "red shoes"]
+
+
+def test_get_or_encode_many_encodes_each_missing_text_once():
+    cache = QueryEmbeddingCache()
+    model = FakeModel()
+    cache.get_or_encode(model, "mini", "a")
+    assert cache.get_or_encode_many(model, "mini", ["a", "bb", "bb ", "ccc"]) == [[1.0], [2.0], [2.0], [3.0]]
+    assert model.calls[1] == ["bb", "ccc"]
+
+
+def test_query_embedding_cache_evicts_and_expires():
+    cache = QueryEmbeddingCache(max_size=2)
+    for query in ("a", "b", "c"):
+        cache.put("mini", query, [1.0])
+    assert cache.get("mini", "a") is None
+    assert cache.stats()["evictions"] == 1
+
+    expired = QueryEmbeddingCache(ttl_seconds=-1)
+    expired.put("mini", "a", [1.0])
+    assert expired.get("mini", "a") is None
+
+
+def test_memory_result_backend_is_bounded():
+    backend = MemoryResultBackend(max_size=2)
+    for key in ("a", "b", "c"):
+        backend.put(key, [key])
+    assert backend.get("a") is None
+    assert backend.get("c") == ["c"]
+    assert backend.size() == 2
+
+
+def test_sqlite_result_backend_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "cache" / "search_results.db")
+    SQLiteResultBackend(path).put("key", [{"id": "1", "score": 0.5}])
+    assert SQLiteResultBackend(path).get("key") == [{"id": "1", "score": 0.5}]
+    assert SQLiteResultBackend(path, ttl_seconds=-1).get("key") is None
+
+
+def test_generation_is_memoized_until_invalidated():
+    reads = []
+    generations = {"users": 1}
+
+    def get_generation(table_name):
+        reads.append(table_name)
+        return generations[table_name]
+
+    cache = SearchResultCache(MemoryResultBackend(), get_generation, generation_ttl_seconds=60)
+    first = cache.key("users", "red shoes", None, 5)
+    generations["users"] = 2
+    assert cache.key("users", "red  shoes", None, 5) == first
+    cache.invalidate("users")
+    assert cache.key("users", "red shoes", None, 5) != first
+    assert reads == ["users", "users"]
+
+
+def test_results_found_before_a_reindex_are_not_served_after_it():
+    generations = {"users": 1}
+    cache = SearchResultCache(MemoryResultBackend(), lambda table_name: generations[table_name], generation_ttl_seconds=0)
+
+    cache_key = cache.key("users", "red shoes", None, 5)
+    assert cache.get(cache_key) is None
+    generations["users"] = 2  # a re-index finished while the search ran on the old index
+    cache.put(cache_key, [{"id": "old"}])
+
+    assert cache.get(cache.key("users", "red shoes", None, 5)) is None
+    assert cache.get(cache_key) == [{"id": "old"}]
+    assert cache.stats()["hits"] == 1
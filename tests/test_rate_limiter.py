@@ -0,0 +1,107 @@
+import time
+import asyncio
+import pytest
+import RateLimiter
+from types import SimpleNamespace
+from RateLimiter import RateLimiter as TokenBucket, parse_time_window, parse_throttling_strategy
+
+
+@pytest.mark.parametrize("time_window, seconds", [("1 minute", 60), ("30s", 30), ("per hour", 3600),
+                                                  ("60", 60), ("500ms", 0.5), ("", 60), ("soon-ish", 60)])
+def test_parse_time_window(time_window, seconds):
+    assert parse_time_window(time_window) == seconds
+
+
+@pytest.mark.parametrize("strategy, name", [("Exponential Backoff", "exponential"), ("linear", "linear"),
+                                            ("fixed delay", "fixed"), ("reject", "none"), (None, "exponential")])
+def test_parse_throttling_strategy(strategy, name):
+    assert parse_throttling_strategy(strategy) == name
+
+
+def test_reserve_queues_callers_once_the_bucket_is_empty():
+    limiter = TokenBucket(2, "1 second")
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    # tokens go negative so each further caller waits one more refill interval
+    assert limiter.reserve() == pytest.approx(0.5, abs=0.05)
+    assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+
+
+def test_penalize_holds_back_every_caller():
+    limiter = TokenBucket(100, "1 second")
+    limiter.penalize(5)
+    assert limiter.reserve() == pytest.approx(5, abs=0.05)
+
+
+def test_backoff_delay_follows_the_strategy(monkeypatch):
+    monkeypatch.setattr(RateLimiter.random, "uniform", lambda low, high: 1.0)
+    exponential = TokenBucket(10, "1 minute", "exponential")
+    assert [exponential.backoff_delay(attempt) for attempt in range(3)] == [1, 2, 4]
+    assert TokenBucket(10, "1 minute", "linear").backoff_delay(2) == 3
+    assert TokenBucket(10, "1 minute", "fixed").backoff_delay(4) == 1
+    assert exponential.backoff_delay(0, retry_after="7") == 7
+    assert exponential.backoff_delay(exponential.max_retries) is None
+    assert TokenBucket(10, "1 minute", "none").backoff_delay(0) is None
+
+
+def test_refresh_rebuilds_only_limiters_whose_settings_changed(monkeypatch):
+    settings = {1: (10, "1 minute", "linear"), 2: (5, "1 second", "fixed")}
+    monkeypatch.setenv("rate_limit_shared", "false")
+    monkeypatch.setattr(RateLimiter, "read_rate_limit_settings", lambda api_ids, engine: {api_id: settings[api_id] for api_id in api_ids if api_id in settings})
+    RateLimiter.invalidate_rate_limiter()
+
+    first, second = RateLimiter.get_rate_limiter(1, None), RateLimiter.get_rate_limiter(2, None)
+    settings[2] = (50, "1 second", "fixed")
+    RateLimiter.refresh_rate_limiters(None)
+
+    assert RateLimiter.get_rate_limiter(1, None) is first
+    assert RateLimiter.get_rate_limiter(2, None) is not second
+    assert RateLimiter.get_rate_limiter(2, None).capacity == 50
+    RateLimiter.invalidate_rate_limiter()
+
+
+# SharedRateLimiter whose bucket statements take `seconds`, as a slow or remote database would
+def slow_shared_limiter(seconds, statements):
+    limiter = RateLimiter.SharedRateLimiter(1, None, 100, "1 second")
+
+    def execute(query, params):
+        statements.append(" ".join(query.split())[:6])
+        time.sleep(seconds)
+        return SimpleNamespace(tokens=50.0, blocked_until=0.0, now=0.0)
+
+    limiter.execute = execute
+    return limiter
+
+
+def test_shared_limiter_keeps_the_event_loop_free():
+    statements = []
+    limiter = slow_shared_limiter(0.2, statements)
+    ticks = []
+
+    async def ticker():
+        for _ in range(10):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.02)
+
+    async def main():
+        started = time.monotonic()
+        await asyncio.gather(ticker(), limiter.acquire_async(), limiter.acquire_async(), limiter.penalize_async(0))
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(main())
+    assert statements == ["INSERT", "INSERT", "UPDATE"]
+    assert elapsed < 0.35  # the three statements overlapped instead of running one after another on the loop
+    assert max(later - earlier for earlier, later in zip(ticks, ticks[1:])) < 0.15
+
+
+def test_shared_limiter_falls_back_to_the_local_bucket():
+    limiter = RateLimiter.SharedRateLimiter(1, None, 2, "1 second")
+
+    def unavailable(query, params):
+        raise ConnectionError("database down")
+
+    limiter.execute = unavailable
+    assert [limiter.reserve(), limiter.reserve()] == [0, 0]
+    assert limiter.reserve() == pytest.approx(0.5, abs=0.05)
+    limiter.penalize(3)
+    assert limiter.reserve() == pytest.approx(3, abs=0.05)
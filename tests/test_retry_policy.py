@@ -0,0 +1,31 @@
+import pytest
+import RetryPolicy
+from RetryPolicy import RetryPolicy as Policy, parse_error_codes
+
+
+def test_parse_error_codes():
+    assert parse_error_codes("500,502; 503") == ({500, 502, 503}, set())
+    assert parse_error_codes("5xx, 429, bogus") == ({429}, {5})
+    assert parse_error_codes(None) == (set(), set())
+
+
+def test_should_retry_only_listed_codes_while_attempts_remain():
+    policy = Policy(2, 100, "5xx,429")
+    assert policy.should_retry(503, 0)
+    assert policy.should_retry(429, 1)
+    assert not policy.should_retry(404, 0)
+    assert not policy.should_retry(503, 2)
+
+
+def test_connection_errors_are_retried():
+    policy = Policy(1, 100, "")
+    assert policy.should_retry(None, 0)
+    assert not policy.should_retry(None, 1)
+
+
+def test_delay_is_jittered_exponential_backoff(monkeypatch):
+    policy = Policy(3, 200, "500")
+    monkeypatch.setattr(RetryPolicy.random, "uniform", lambda low, high: high)
+    assert [policy.delay(attempt) for attempt in range(3)] == pytest.approx([0.2, 0.4, 0.8])
+    monkeypatch.undo()
+    assert all(0 <= policy.delay(2) <= 0.8 for _ in range(100))
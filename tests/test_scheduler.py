@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from Scheduler import parse_cron_expression, next_cron_time, parse_frequency_minutes, next_run_time
+
+
+def test_parse_cron_fields():
+    schedule = parse_cron_expression("*/15 9-17 * * mon-fri")
+    assert schedule["minute"] == {0, 15, 30, 45}
+    assert schedule["hour"] == set(range(9, 18))
+    assert schedule["weekday"] == {1, 2, 3, 4, 5}
+    assert not schedule["day_or_weekday"]
+
+
+def test_parse_cron_aliases_and_sunday_as_seven():
+    assert parse_cron_expression("@daily")["hour"] == {0}
+    assert parse_cron_expression("0 0 * * 7")["weekday"] == {0}
+
+
+@pytest.mark.parametrize("expression", ["* * *", "61 * * * *", "* 24 * * *", "* * 0 * *"])
+def test_parse_cron_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        parse_cron_expression(expression)
+
+
+def test_next_cron_time():
+    after = datetime(2024, 1, 5, 17, 50)  # a Friday
+    assert next_cron_time(parse_cron_expression("*/15 9-17 * * mon-fri"), after) == datetime(2024, 1, 8, 9, 0)
+    assert next_cron_time(parse_cron_expression("30 2 1 * *"), after) == datetime(2024, 2, 1, 2, 30)
+    assert next_cron_time(parse_cron_expression("0 0 29 2 *"), after) == datetime(2024, 2, 29, 0, 0)
+
+
+def test_day_or_weekday_when_both_are_restricted():
+    # the 13th or any Friday
+    schedule = parse_cron_expression("0 12 13 * fri")
+    assert next_cron_time(schedule, datetime(2024, 1, 1)) == datetime(2024, 1, 5, 12, 0)
+    assert next_cron_time(schedule, datetime(2024, 1, 12, 13, 0)) == datetime(2024, 1, 13, 12, 0)
+
+
+@pytest.mark.parametrize("frequency, minutes", [("hourly", 60), ("every 15 minutes", 15), ("30m", 30),
+                                                ("2h", 120), ("1 day", 1440), ("45", 45), ("sometimes", None)])
+def test_parse_frequency_minutes(frequency, minutes):
+    assert parse_frequency_minutes(frequency) == minutes
+
+
+def test_next_run_time_falls_back_to_frequency():
+    last_run = datetime(2024, 1, 1, 10, 0)
+    assert next_run_time("0 * * * *", "daily", last_run) == datetime(2024, 1, 1, 11, 0)
+    assert next_run_time("not a cron", "30m", last_run) == datetime(2024, 1, 1, 10, 30)
+    assert next_run_time("", "unknown", last_run) is None
@@ -0,0 +1,111 @@
+import os
+import numpy as np
+from VectorStores import EmbeddingStore, LocalVectorIndex
+
+
+def stored(store, ids):
+    return [None if vector is None else vector.tolist() for vector in store.get(ids)]
+
+
+def test_embedding_store_put_flush_reload(tmp_path):
+    store = EmbeddingStore("users", str(tmp_path), dimension=2)
+    store.put([("a", [1, 2], {}), ("b", [3, 4], {})])
+    store.flush()
+    store.put([("a", [5, 6], {})])
+    store.flush()
+
+    reopened = EmbeddingStore("users", str(tmp_path), dimension=2)
+    assert reopened.count == 2
+    assert stored(reopened, ["a", "b", "missing"]) == [[5, 6], [3, 4], None]
+
+
+def test_embedding_store_drops_rows_that_were_never_flushed(tmp_path):
+    store = EmbeddingStore("users", str(tmp_path), dimension=2)
+    store.put([("a", [1, 1], {})])
+    store.flush()
+    store.put([("b", [2, 2], {})])
+    store.write_lock.release()  # the process died before flush()
+
+    store = EmbeddingStore("users", str(tmp_path), dimension=2)
+    store.put([("c", [3, 3], {})])
+    store.flush()
+
+    reopened = EmbeddingStore("users", str(tmp_path), dimension=2)
+    assert stored(reopened, ["a", "b", "c"]) == [[1, 1], None, [3, 3]]
+    assert os.path.getsize(reopened.matrix_file) == 2 * reopened.row_bytes()
+
+
+def test_embedding_store_writers_in_other_processes_do_not_overwrite_each_other(tmp_path):
+    first = EmbeddingStore("users", str(tmp_path), dimension=2)
+    second = EmbeddingStore("users", str(tmp_path), dimension=2)
+    first.put([("a", [1, 1], {})])
+    first.flush()
+    second.put([("b", [2, 2], {})])
+    second.flush()
+
+    assert stored(first, ["a", "b"]) == [[1, 1], [2, 2]]
+
+
+def test_embedding_store_compacts_after_deletes(tmp_path):
+    store = EmbeddingStore("users", str(tmp_path), dimension=2)
+    store.put([(str(i), [i, i], {}) for i in range(4)])
+    store.flush()
+    store.delete(["0", "1", "2"])
+    store.flush()
+
+    reopened = EmbeddingStore("users", str(tmp_path), dimension=2)
+    assert reopened.count == 1
+    assert stored(reopened, ["3", "0"]) == [[3, 3], None]
+
+
+def test_local_index_search_returns_nearest_with_metadata(tmp_path):
+    index = LocalVectorIndex("users-index", str(tmp_path), dimension=2)
+    index.upsert([("x", [1, 0], {"name": "x"}), ("y", [0, 1], {"name": "y"}), ("xy", [1, 1], {"name": "xy"})])
+
+    matches = index.query([1, 0.1], top_k=2)["matches"]
+    assert [match["id"] for match in matches] == ["x", "xy"]
+    assert matches[0]["metadata"] == {"name": "x"}
+    assert [match["id"] for match in index.query([1, 0], top_k=3, filter={"name": "y"})["matches"]] == ["y"]
+
+
+def test_local_index_delete_keeps_rows_dense(tmp_path):
+    index = LocalVectorIndex("users-index", str(tmp_path), dimension=2)
+    index.upsert([("a", [1, 0], {}), ("b", [0, 1], {}), ("c", [1, 1], {})])
+    index.delete(ids=["a"])
+
+    assert index.describe_index_stats()["total_vector_count"] == 2
+    assert {match["id"] for match in index.query([1, 0], top_k=5)["matches"]} == {"b", "c"}
+
+
+def test_local_index_persist_is_picked_up_by_other_workers(tmp_path):
+    writer = LocalVectorIndex("users-index", str(tmp_path), dimension=2)
+    reader = LocalVectorIndex("users-index", str(tmp_path), dimension=2)
+    writer.upsert([("a", [1, 0], {})])
+    writer.persist()
+
+    assert [match["id"] for match in reader.query([1, 0], top_k=1)["matches"]] == ["a"]
+
+    # a write from the stale copy starts from the persisted generation instead of overwriting it
+    reader.upsert([("b", [0, 1], {})])
+    reader.persist()
+    assert LocalVectorIndex("users-index", str(tmp_path), dimension=2).describe_index_stats()["total_vector_count"] == 2
+
+
+def test_local_index_discard_drops_unpersisted_writes(tmp_path):
+    index = LocalVectorIndex("users-index", str(tmp_path), dimension=2)
+    index.upsert([("a", [1, 0], {})])
+    index.persist()
+    index.upsert([("b", [0, 1], {})])
+    index.discard()
+
+    assert index.describe_index_stats()["total_vector_count"] == 1
+
+
+def test_local_index_ivf_finds_exact_match(tmp_path):
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(400, 8)).astype(np.float32)
+    index = LocalVectorIndex("users-index", str(tmp_path), dimension=8, ivf_min_rows=100, nprobe=20)
+    index.upsert([(str(i), vector, {}) for i, vector in enumerate(vectors)])
+
+    assert index.describe_index_stats()["ivf"]
+    assert index.query(vectors[123], top_k=1)["matches"][0]["id"] == "123"
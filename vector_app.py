@@ -1,25 +1,62 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from sentence_transformers import SentenceTransformer
 from dotenv import load_dotenv
 import os 
 from DataModel import *
 from Common import *
 from VectorDBModels import *
+from RateLimiter import *
+from RetryPolicy import *
+from QueryCache import *
+from Encoders import *
+from EmbeddingSidecar import load_shared_encoder
+from MicroBatching import *
+from Ingestion import *
+from Scheduler import *
+from JobQueue import *
+from EmbeddingWorkers import *
+from ConfigCache import *
 import requests
+from concurrent.futures import ThreadPoolExecutor
 load_dotenv('config.env')
 # Access the credentials
 jwt_token = os.getenv('JWT_TOKEN')
 database_url = os.getenv('DATABASE_URL')
 pinecone_api_key = os.getenv('PINECONE_API_KEY') 
-transformer_model = SentenceTransformer('all-MiniLM-L6-v2')
+transformer_model_name = os.getenv('transformer_model_name', 'all-MiniLM-L6-v2')
+# encoder_backend=onnx serves embeddings from ONNX Runtime (optionally int8), validated against the PyTorch model;
+# encoder_mode=sidecar shares one model per host through the embedding sidecar instead of one per worker
+transformer_model = load_shared_encoder(transformer_model_name)
+# concurrent query encodes are merged into micro-batches (query_batch_max_size / query_batch_max_wait_ms)
+query_encoder = create_query_encoder(transformer_model)
+query_embedding_cache = QueryEmbeddingCache(int(os.getenv('query_cache_max_size', 10000)), int(os.getenv('query_cache_ttl_seconds', 3600)))
 engine = create_engine(database_url)
 Session = sessionmaker(bind=engine)
+# the index bookkeeping columns (index_generation etc.) exist before the first search reads them
+try:
+    ensure_vector_index_tables(Session)
+except Exception as e:
+    print(f"Could not prepare the vector index tables: {e}")
+search_result_cache = create_search_result_cache(lambda table_name: get_index_generation(Session, table_name))
+# cached index handles follow backend/index changes made by other workers (index_handle_check_seconds)
+index_handle_registry = create_index_handle_registry(Session)
+search_executor = ThreadPoolExecutor(max_workers=int(os.getenv('search_fanout_workers', 16)))
+# configuration reads are served from memory until an Add*/Update* request bumps the config version
+config_cache = create_config_cache(engine)
+config_cache.on_change(lambda: refresh_rate_limiters(engine))
+config_cache.on_change(invalidate_retry_policy)
 
 # Define the Flask app
 app = Flask(__name__)
 
+# Every successful Add*/Update* request changes configuration, so it invalidates the config cache of all workers
+@app.after_request
+def Invalidate_ConfigCache(response):
+    if request.method == 'POST' and request.path.startswith(('/Add', '/Update')) and response.status_code < 400:
+        config_cache.invalidate()
+    return response
+
 def Process_Auth():
     auth_header = request.headers.get('Authorization')  # Get the Authorization header
 # Check if the authorization header is present and valid
@@ -28,12 +65,24 @@ def Process_Auth():
     return True    
 # Define the API endpoint to add a new API along with its endpoints and authentication methods
 
-def getEndpointJsonData_and_schema(endpoint_url, http_method, headers_array,extraction_path):
+def getEndpointJsonData_and_schema(endpoint_url, http_method, headers_array,extraction_path,rate_limiter=None,retry_policy=None):
     # headers_array = {header_name: header_value} 
     # print(f"headers_array - {headers_array}")
     encoded_data = field_keys = ""
     if http_method.upper() == "GET":
-        response = requests.get(endpoint_url, headers=headers_array)
+        attempt = 0
+        while True:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            response = requests.get(endpoint_url, headers=headers_array)
+            # retry the status codes listed in the endpoint's error handling configuration
+            if response.status_code != 200 and retry_policy is not None and retry_policy.should_retry(response.status_code, attempt):
+                retry_policy.sleep(attempt)
+                attempt += 1
+                continue
+            break
+        if response.status_code != 200:
+            print(f"Fetching {endpoint_url} failed with status {response.status_code}")
         if response.status_code == 200:
             # Parse the response JSON
             data = response.json()
@@ -223,6 +272,7 @@ def Add_ErrorHandling():
         error_codes_to_retry=error_codes_to_retry,
              Session=Session
         )
+        invalidate_retry_policy(int(endpoint_id))
 
         if not data:
             return jsonify({"error": "No JSON data received"}), 400
@@ -402,32 +452,15 @@ def Add_FieldMapping():
         headers = {header_name: header_value}
         encoded_data , field_mapping_keys_from_response = getEndpointJsonData_and_schema(endpoint_url,http_method,headers,response_schemas_data['extraction_path']) 
   
+        # the response fields are mapped under the mapping_id of the last explicit mapping
         for mapping in field_mappings_data: 
             mapping_id_g = mapping.get('mapping_id')
-            add_new_field_mapping(
-                mapping_id=mapping.get('mapping_id'),
-                api_field_name=mapping.get('api_field_name'),  # field_mappings_data['api_field_name'],
-                database_field_name=mapping.get('database_field_name'), #field_mappings_data['database_field_name'],
-                data_type_conversion=mapping.get('data_type_conversion'), #field_mappings_data['data_type_conversion'],
-                is_nullable=mapping.get('is_nullable') ,#field_mappings_data['is_nullable',
-                 Session=Session
-            )
-
         # print(f"field_mapping_keys_from_response - {field_mapping_keys_from_response}")
-        # print(f"mapping_id - {mapping_id}")
-        for field in field_mapping_keys_from_response: 
-            add_new_field_mapping(
-                mapping_id=mapping_id_g,
-                api_field_name=field, 
-                database_field_name= field ,
-                data_type_conversion= 'TEXT',
-                is_nullable= False ,#field_mappings_data['is_nullable',
-                 Session=Session
-            ) 
+        field_mapping_ids = add_new_field_mappings(mapping_id_g, field_mappings_data, Session, field_mapping_keys_from_response or [])
 
         if not data:
             return jsonify({"error": "No JSON data received"}), 400
-        return jsonify({"message": f"FieldMapping added successfully!"}), 201
+        return jsonify({"message": f"FieldMapping added successfully!", "field_mapping_ids": field_mapping_ids}), 201
     except KeyError as e:
         return jsonify({"error": f"Missing required field: {str(e)}"}), 400
 
@@ -457,253 +490,104 @@ def Add_TransformationRules():
         return jsonify({"error": f"Missing required field: {str(e)}"}), 400    
 
         
+REGISTRATION_SECTIONS = [
+    ('apis', dict), ('endpoints', dict), ('authentication_methods', dict), ('rate_limiting_settings', dict),
+    ('headers', dict), ('query_parameters', dict), ('response_schemas', dict), ('error_handling_configurations', dict),
+    ('scheduling_configurations', dict), ('request_bodies', dict), ('pagination_settings', dict),
+    ('data_extraction_rules', dict), ('database_mappings', dict), ('field_mappings', list),
+    ('transformation_rules', dict), ('patent_coach_function_features', dict)
+]
+
+# Function to check the type of every section of one AddNewApiEndpoints registration; returns an error message or None
+def Validate_Registration(registration):
+    if not isinstance(registration, dict):
+        return "Invalid registration, expected a dictionary"
+    for section, section_type in REGISTRATION_SECTIONS:
+        if not isinstance(registration.get(section, section_type()), section_type):
+            return f"Invalid type for '{section}', expected a {'list' if section_type is list else 'dictionary'}"
+    return None
+
+# Function to call a registration's endpoint for its sample response and response field names
+# Runs before the registration transaction so no database transaction is held open across HTTP calls
+def Fetch_RegistrationSample(registration):
+    endpoints_data = registration['endpoints']
+    headers_data = registration['headers']
+    rate_limiting_data = registration['rate_limiting_settings']
+    error_handling_data = registration['error_handling_configurations']
+    headers = {str(headers_data['header_name']): str(headers_data['header_value'])}
+    rate_limiter = RateLimiter(rate_limiting_data['max_requests'], rate_limiting_data['time_window'], rate_limiting_data['throttling_strategy'])
+    retry_policy = RetryPolicy(error_handling_data.get('retry_attempts'), error_handling_data.get('retry_delay'), error_handling_data.get('error_codes_to_retry'))
+    encoded_data , field_mapping_keys_from_response = getEndpointJsonData_and_schema(endpoints_data['endpoint_url'],endpoints_data['http_method'],headers,
+                                                                                     registration['data_extraction_rules']['extraction_path'],rate_limiter,retry_policy)
+    if not encoded_data:
+        raise ValueError(f"Could not fetch a sample response from {endpoints_data['endpoint_url']}")
+    registration = dict(registration)
+    registration['sample_response'] = json.dumps(decode_json(encoded_data))
+    registration['response_field_keys'] = field_mapping_keys_from_response
+    return registration
+
+# Registers one API (the sections at the top level) or many (a JSON list of them, or {"registrations": [...]})
+# The whole request is written in one transaction: either every API is registered or none is
 @app.route('/AddNewApiEndpoints', methods=['POST'])
 def AddNewApi_Endpoints():
     
     if not Process_Auth():
         return jsonify({"error": "Unauthorized access"}), 401
         
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No JSON data received"}), 400
+    registrations = data if isinstance(data, list) else data.get('registrations', [data])
+    if not isinstance(registrations, list) or not registrations:
+        return jsonify({"error": "Invalid type for 'registrations', expected a non-empty list"}), 400
+    for registration in registrations:
+        error = Validate_Registration(registration)
+        if error:
+            return jsonify({"error": error}), 400
+
     try:
-        data = request.get_json()
-        # print("data 1")
-        if not data:
-            return jsonify({"error": "No JSON data received"}), 400
-        # Validate and extract each section with type checks
-    
-        api_data = data.get('apis', {})
-        if not isinstance(api_data, dict):
-            return jsonify({"error": "Invalid type for 'apis', expected a dictionary"}), 400
-    
-        endpoints_data = data.get('endpoints', {})
-        if not isinstance(endpoints_data, dict):
-            return jsonify({"error": "Invalid type for 'endpoints', expected a dictionary"}), 400
-    
-        auth_methods_data = data.get('authentication_methods', {})
-        if not isinstance(auth_methods_data, dict):
-            return jsonify({"error": "Invalid type for 'authentication_methods', expected a dictionary"}), 400
-    
-        rate_limiting_data = data.get('rate_limiting_settings', {})
-        if not isinstance(rate_limiting_data, dict):
-            return jsonify({"error": "Invalid type for 'rate_limiting_settings', expected a dictionary"}), 400
-    
-        headers_data = data.get('headers', {})
-        if not isinstance(headers_data, dict):
-            return jsonify({"error": "Invalid type for 'headers', expected a dictionary"}), 400
-    
-        query_parameters_data = data.get('query_parameters', {})
-        if not isinstance(query_parameters_data, dict):
-            return jsonify({"error": "Invalid type for 'query_parameters', expected a dictionary"}), 400
-    
-        response_schemas_data = data.get('response_schemas', {})
-        if not isinstance(response_schemas_data, dict):
-            return jsonify({"error": "Invalid type for 'response_schemas', expected a dictionary"}), 400
-        
-        error_handling_data = data.get('error_handling_configurations', {})
-        if not isinstance(error_handling_data, dict):
-            return jsonify({"error": "Invalid type for 'error_handling_configurations', expected a dictionary"}), 400
-    
-        scheduling_data = data.get('scheduling_configurations', {})
-        if not isinstance(scheduling_data, dict):
-            return jsonify({"error": "Invalid type for 'scheduling_configurations', expected a dictionary"}), 400
-    
-        request_bodies_data = data.get('request_bodies', {})
-        if not isinstance(request_bodies_data, dict):
-            return jsonify({"error": "Invalid type for 'request_bodies', expected a dictionary"}), 400
-    
-        pagination_data = data.get('pagination_settings', {})
-        if not isinstance(pagination_data, dict):
-            return jsonify({"error": "Invalid type for 'pagination_settings', expected a dictionary"}), 400
-    
-        data_extraction_rules_data = data.get('data_extraction_rules', {})
-        if not isinstance(data_extraction_rules_data, dict):
-            return jsonify({"error": "Invalid type for 'data_extraction_rules', expected a dictionary"}), 400
-    
-        db_mapping_data = data.get('database_mappings', {})
-        if not isinstance(db_mapping_data, dict):
-            return jsonify({"error": "Invalid type for 'database_mappings', expected a dictionary"}), 400
-    
-        field_mappings_data = data.get('field_mappings', [])
-        if not isinstance(field_mappings_data, list):
-            return jsonify({"error": "Invalid type for 'field_mappings', expected a list"}), 400
-    
-        transformation_rules_data = data.get('transformation_rules', {})
-        if not isinstance(transformation_rules_data, dict):
-            return jsonify({"error": "Invalid type for 'transformation_rules', expected a dictionary"}), 400
-    
-        feature_data = data.get('patent_coach_function_features', {})
-        if not isinstance(feature_data, dict):
-            return jsonify({"error": "Invalid type for 'patent_coach_function_features', expected a dictionary"}), 400
-    
+        fetch_workers = max(1, min(len(registrations), int(os.getenv('registration_fetch_workers', 8))))
+        with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+            registrations = list(executor.map(Fetch_RegistrationSample, registrations))
     except KeyError as e:
         return jsonify({"error": f"Missing required field: {str(e)}"}), 400
     except Exception as e:
-        return jsonify({"error": f"An unexpected error occurred: {str(e)}"}), 500
-    
-    # Add API
-    api_id = add_new_api(
-        api_name=api_data['api_name'],
-        base_url=api_data.get('base_url'),
-        description=api_data.get('description'),
-        documentation_link=api_data.get('documentation_link'),
-        Session=Session
-    )
-    
-    if api_id:  # Ensure API was added successfully
-        # Add Endpoint
-        endpoint_url=endpoints_data['endpoint_url']
-        http_method=endpoints_data['http_method']
-        endpoint_id = add_new_endpoint(
-            api_id=api_id,
-            endpoint_name=endpoints_data['endpoint_name'],
-            endpoint_url = endpoint_url,
-            http_method = http_method,
-            description=endpoints_data['description'],
-             Session=Session
-        ) 
-        # Add Authentication Method
-        add_new_authentication_method(
-            api_id=api_id,
-            auth_method=auth_methods_data['auth_method'],
-            credentials=auth_methods_data['credentials'],
-            token_endpoint=auth_methods_data['token_endpoint'],
-            token_expiry=auth_methods_data['token_expiry'],
-            refresh_logic=auth_methods_data['refresh_logic'],
-             Session=Session
-        ) 
-        # Add Rate Limiting Settings
-        add_new_rate_limiting_settings(
-            api_id=api_id,
-            max_requests=rate_limiting_data['max_requests'],
-            time_window=rate_limiting_data['time_window'],
-            throttling_strategy=rate_limiting_data['throttling_strategy'],
-             Session=Session
-        ) 
-        header_name=str(headers_data['header_name'])
-        header_value=str(headers_data['header_value'])
-        # print(f"header_name - {header_name}")
-        # print(f"header_type - {type(header_name)}")
-        
-        header_id = add_new_header(
-        endpoint_id=endpoint_id,
-        header_name = header_name,
-        header_value = header_value,
-             Session=Session
-        )
-
-        headers = {header_name: header_value}
-        encoded_data , field_mapping_keys_from_response = getEndpointJsonData_and_schema(endpoint_url,http_method,headers,data_extraction_rules_data['extraction_path'])
-        # return jsonify({"message": "API, Endpoint, and Authentication Method added successfully!"}), 201
-
-        # Add Query Parameters
-        query_param_id = add_new_query_parameter(
-            endpoint_id=endpoint_id,
-            parameter_name=query_parameters_data['parameter_name'],
-            parameter_value=query_parameters_data['parameter_value'],
-            is_dynamic=query_parameters_data['is_dynamic'],
-             Session=Session
-        )
-
-        json_encoded_response = encoded_data #response_schemas_data['sample_response']
-        decoded_response = decode_json(json_encoded_response)
-        decoded_response_str = json.dumps(decoded_response)
-        schema_id = add_new_response_schema(
-            endpoint_id=endpoint_id,
-            format_type=response_schemas_data['format_type'],
-            root_path=response_schemas_data['root_path'],
-            sample_response=decoded_response_str,# response_schemas_data['sample_response'],
-             Session=Session
-        ) 
-        # Add Error Handling Configurations
-        add_new_error_handling_config(
-            endpoint_id=endpoint_id,
-            retry_attempts=error_handling_data['retry_attempts'],
-            retry_delay=error_handling_data['retry_delay'],
-            error_codes_to_retry=error_handling_data['error_codes_to_retry'],
-             Session=Session
-        )
-
-           # Add Scheduling Configuration
-        scheduling_id = add_new_scheduling_configuration(
-            endpoint_id=endpoint_id,
-            frequency=scheduling_data['frequency'],
-            cron_expression=scheduling_data['cron_expression'],
-            last_run_time=scheduling_data['last_run_time'],
-             Session=Session
-        )
-
-        add_new_request_body(
-            endpoint_id=endpoint_id,
-            content_type=request_bodies_data['content_type'],
-            body_template=request_bodies_data['body_template'],
-            dynamic_fields=request_bodies_data['dynamic_fields'],
-             Session=Session
-        )
+        return jsonify({"error": f"Failed to fetch sample response: {str(e)}"}), 502
 
-        add_new_pagination_settings(
-            endpoint_id=endpoint_id,
-            pagination_type=pagination_data['pagination_type'],
-            page_parameter=pagination_data['page_parameter'],
-            limit_parameter=pagination_data['limit_parameter'],
-            next_page_indicator=pagination_data.get('next_page_indicator'),
-            termination_condition=pagination_data.get('termination_condition'),
-             Session=Session
-        )
+    try:
+        registered = register_api_graphs(registrations, Session)
+    except KeyError as e:
+        return jsonify({"error": f"Missing required field: {str(e)}"}), 400
+    except Exception as e:
+        return jsonify({"error": f"Failed to add API: {str(e)}"}), 400
+    for ids in registered:
+        invalidate_rate_limiter(ids['api_id'])
+        invalidate_retry_policy(ids['endpoint_id'])
+    return jsonify({"message": "API, Endpoint, and Authentication Method added successfully!", "registered": registered}), 201
+ 
+# Function to decide whether a /get* request asked for the whole table as a stream (stream=true with an id <= 0)
+def Wants_RowStream(key_id):
+    if request.args.get('stream', 'false').lower() != 'true':
+        return False
+    try:
+        return int(key_id) <= 0
+    except (TypeError, ValueError):
+        return False
 
-        extraction_id = add_new_data_extraction_rule(
-                schema_id=schema_id,
-                extraction_path=data_extraction_rules_data['extraction_path'],
-                description=data_extraction_rules_data.get('description'),
-                 Session=Session
-            )
-         # Add Database Mapping
-        mapping_id = add_new_database_mapping(
-            extraction_id=extraction_id,
-            database_table=db_mapping_data['database_table'],
-            primary_key=db_mapping_data['primary_key'],
-             Session=Session
-        )
+# Function to stream every row of a config reader as a plain JSON array instead of building the whole
+# table in memory; the query runs before the response starts so database errors still return a 500
+def Stream_ConfigRows(reader):
+    stream = stream_config_json(reader, 0, engine)
+    try:
+        head = next(stream)
+    except Exception as e:
+        print(f"Error while streaming {reader}: {e}")
+        return jsonify({"error": str(e)}), 500
+    def generate():
+        yield head
+        yield from stream
+    return Response(generate(), mimetype='application/json'), 200
 
-          # Add Field Mapping
-        for mapping in field_mappings_data: 
-            add_new_field_mapping(
-                mapping_id=mapping_id,
-                api_field_name=mapping.get('api_field_name'),  # field_mappings_data['api_field_name'],
-                database_field_name=mapping.get('database_field_name'), #field_mappings_data['database_field_name'],
-                data_type_conversion=mapping.get('data_type_conversion'), #field_mappings_data['data_type_conversion'],
-                is_nullable=mapping.get('is_nullable') ,#field_mappings_data['is_nullable',
-                 Session=Session
-            )
-         
-        for field in field_mapping_keys_from_response: 
-            add_new_field_mapping(
-                mapping_id=mapping_id,
-                api_field_name=field, 
-                database_field_name= field ,
-                data_type_conversion= 'TEXT',
-                is_nullable= False ,#field_mappings_data['is_nullable',
-                 Session=Session
-            ) 
-        
-        # Add Transformation Rule
-        add_new_transformation_rule(
-            mapping_id= mapping_id,
-            transformation_type=transformation_rules_data['transformation_type'],
-            rule_description=transformation_rules_data['rule_description'],
-             Session=Session
-        )
-        
-         # Add Patent Coach Function Features
-        feature_id = add_new_feature(
-            name=feature_data['name'],
-            column_2=feature_data.get('column_2'),
-            column_3=feature_data.get('column_3'),
-            notes=feature_data.get('notes'),
-             Session=Session
-        )
-        return jsonify({"message": "API, Endpoint, and Authentication Method added successfully!"}), 201
-    else:
-        return jsonify({"error": "Failed to add API"}), 400
- 
 @app.route('/getAllAPIList', methods=['GET'])
 def get_AllAPIList():
     if not Process_Auth():
@@ -712,7 +596,7 @@ def get_AllAPIList():
     api_name = request.args.get('api_name')
     # data = request.get_json() 
     # api_name = data.get('api_name', {})   
-    api_list = get_AllApiList(engine)  
+    api_list = config_cache.get('apis', 0, lambda: get_AllApiList(engine))  
     return jsonify({"message": str(api_list)}), 200
 
 @app.route('/getEndPointByApiId', methods=['GET'])
@@ -721,7 +605,7 @@ def get_EndPointByApi():
         return jsonify({"error": "Unauthorized access"}), 401
          
     api_name = request.args.get('api_id')
-    endpoint_list = get_EndpointsByApiID(api_name,engine)  
+    endpoint_list = config_cache.get('endpoints_by_api', api_name, lambda: get_EndpointsByApiID(api_name,engine))  
     return jsonify({"message": endpoint_list}), 200
 
 @app.route('/getEndPointsByEndpointID', methods=['GET'])
@@ -732,7 +616,9 @@ def get_EndPointsByEndpointID():
     # data = request.get_json() 
     # endpoint_id = data.get('endpoint_id', {})   
     endpoint_id = request.args.get('endpoint_id')
-    endpoint_list = get_EndpointsByEndpoint_ID(endpoint_id,engine)  
+    if Wants_RowStream(endpoint_id):
+        return Stream_ConfigRows('endpoints')
+    endpoint_list = config_cache.get('endpoints', endpoint_id, lambda: get_EndpointsByEndpoint_ID(endpoint_id,engine))  
     return jsonify({"message": endpoint_list}), 200
 
 @app.route('/getHeadersByEndpointID', methods=['GET'])
@@ -743,7 +629,9 @@ def get_HeadersByEndpointID():
     # data = request.get_json() 
     # endpoint_id = data.get('endpoint_id', {})   
     endpoint_id = request.args.get('endpoint_id')
-    endpoint_list = get_HeadersByEndpoint_ID(endpoint_id,engine)  
+    if Wants_RowStream(endpoint_id):
+        return Stream_ConfigRows('headers')
+    endpoint_list = config_cache.get('headers', endpoint_id, lambda: get_HeadersByEndpoint_ID(endpoint_id,engine))  
     return jsonify({"message": endpoint_list}), 200
 
 @app.route('/getQueryParamsByEndpointID', methods=['GET'])
@@ -754,7 +642,9 @@ def get_QueryParamsByEndpointID():
     # data = request.get_json() 
     # endpoint_id = data.get('endpoint_id', {})   
     endpoint_id = request.args.get('endpoint_id')
-    endpoint_list = get_QueryParamsByEndpoint_ID(endpoint_id,engine)  
+    if Wants_RowStream(endpoint_id):
+        return Stream_ConfigRows('query_parameters')
+    endpoint_list = config_cache.get('query_parameters', endpoint_id, lambda: get_QueryParamsByEndpoint_ID(endpoint_id,engine))  
     return jsonify({"message": endpoint_list}), 200
 
 @app.route('/getResponseSchemaByEndpointID', methods=['GET'])
@@ -765,7 +655,9 @@ def get_ResponseSchemaByEndpointID():
     # data = request.get_json() 
     # endpoint_id = data.get('endpoint_id', {})   
     endpoint_id = request.args.get('endpoint_id')
-    endpoint_list = get_ResponseSchemaByEndpoint_ID(endpoint_id,engine)  
+    if Wants_RowStream(endpoint_id):
+        return Stream_ConfigRows('response_schemas')
+    endpoint_list = config_cache.get('response_schemas', endpoint_id, lambda: get_ResponseSchemaByEndpoint_ID(endpoint_id,engine))  
     return jsonify({"message": endpoint_list}), 200
 
 @app.route('/getExtractionRulesBySchemaID', methods=['GET'])
@@ -776,7 +668,9 @@ def get_ExtractionRulesBySchemaID():
     # data = request.get_json() 
     # schema_id = data.get('schema_id', {})   
     schema_id = request.args.get('schema_id')
-    endpoint_list = get_ExtractionRulesBySchema_ID(schema_id,engine)  
+    if Wants_RowStream(schema_id):
+        return Stream_ConfigRows('extraction_rules')
+    endpoint_list = config_cache.get('extraction_rules', schema_id, lambda: get_ExtractionRulesBySchema_ID(schema_id,engine))  
     return jsonify({"message": endpoint_list}), 200
 
 @app.route('/getDataBaseMappingByExtractionID', methods=['GET'])
@@ -787,7 +681,9 @@ def get_DataBaseMappingByExtractionID():
     # data = request.get_json() 
     # extraction_id = data.get('extraction_id', {})  
     extraction_id = request.args.get('extraction_id')
-    db_list = get_DataBaseMappingByExtraction_ID(extraction_id,engine)  
+    if Wants_RowStream(extraction_id):
+        return Stream_ConfigRows('database_mappings')
+    db_list = config_cache.get('database_mappings', extraction_id, lambda: get_DataBaseMappingByExtraction_ID(extraction_id,engine))  
     return jsonify({"message": db_list}), 200
 
 @app.route('/getFieldMappingByMappingID', methods=['GET'])
@@ -798,7 +694,9 @@ def get_FieldMappingByMappingID():
     # data = request.get_json() 
     # mapping_id = data.get('mapping_id', {})   
     mapping_id = request.args.get('mapping_id')
-    db_list = get_FieldMappingByMapping_ID(mapping_id,engine)  
+    if Wants_RowStream(mapping_id):
+        return Stream_ConfigRows('field_mappings')
+    db_list = config_cache.get('field_mappings', mapping_id, lambda: get_FieldMappingByMapping_ID(mapping_id,engine))  
     return jsonify({"message": db_list}), 200
 
 
@@ -810,9 +708,29 @@ def get_TransformationRulesByMappingID():
     # data = request.get_json() 
     # mapping_id = data.get('mapping_id', {})   
     mapping_id = request.args.get('mapping_id')
-    db_list = get_TransformationRulesByMapping_ID(mapping_id,engine)  
+    if Wants_RowStream(mapping_id):
+        return Stream_ConfigRows('transformation_rules')
+    db_list = config_cache.get('transformation_rules', mapping_id, lambda: get_TransformationRulesByMapping_ID(mapping_id,engine))  
     return jsonify({"message": db_list}), 200
     
+# Returns the full nested configuration of one or many endpoints (endpoint_ids=1,2,3 or repeated endpoint_id)
+@app.route('/getEndpointGraph', methods=['GET'])
+def get_EndpointGraph():
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+
+    raw_ids = request.args.getlist('endpoint_id') + request.args.get('endpoint_ids', '').split(',')
+    try:
+        endpoint_ids = sorted({int(endpoint_id) for endpoint_id in raw_ids if endpoint_id.strip()})
+    except ValueError:
+        return jsonify({"error": "endpoint ids must be integers"}), 400
+    if not endpoint_ids:
+        return jsonify({"error": "Missing required field: endpoint_id"}), 400
+    include_sample_response = request.args.get('include_sample_response', 'false').lower() == 'true'
+    cache_key = f"{','.join(map(str, endpoint_ids))}|{include_sample_response}"
+    graphs = config_cache.get('endpoint_graph', cache_key, lambda: get_endpoint_graphs(endpoint_ids, engine, include_sample_response))
+    return jsonify({"endpoints": graphs}), 200
+
 @app.route('/UpdateEndPointByEndpointId', methods=['POST'])
 def update_EndPointByEndpointId():
     if not Process_Auth():
@@ -830,6 +748,47 @@ def update_EndPointByEndpointId():
     else:
         return jsonify({"message": f"Update Failed {str(error)}"}), 200
     
+# Function to copy an endpoint's data into its mapped table
+# source 'endpoint' calls the live endpoint and walks all of its pages, 'sample' loads the stored sample response
+# replace=True loads a full snapshot into a staging table and swaps it in, instead of appending to the table
+# Returns the mapped table name and the load stats; raises when the endpoint cannot be ingested
+def Copy_EndpointData(api_name, endpoint_name, data_extraction_path, bulk=True, chunk_size=10000, source='sample', concurrency=8, resume=True, progress=None, replace=False):
+    create_table_sql = ''
+    field_mapping_df = config_cache.get('field_mapping_df', f"{api_name}|{endpoint_name}|{data_extraction_path}",
+                                        lambda: get_fieldmapping_by_api_endpoint(api_name,endpoint_name,data_extraction_path,engine))
+    #print(field_mapping_df)
+    if field_mapping_df is None or len(field_mapping_df) == 0:
+        raise LookupError(f"No field mapping found for endpoint {endpoint_name} of API {api_name}")
+    create_table_sql = generate_create_table_from_fieldmapping_df(field_mapping_df)
+    execute_create_table(create_table_sql,database_url)
+    create_table_sql = create_table_sql.replace("IF NOT EXISTS","")
+    table_name = field_mapping_df['database_table'].iloc[0]
+    json_response = field_mapping_df['sample_response'].iloc[0]
+    extraction_path = field_mapping_df['extraction_path'].iloc[0]
+    # a resumable endpoint ingest keeps the staging rows it already loaded, a sample reload starts empty
+    load_table_sql = create_staging_table(create_table_sql, database_url, source != 'endpoint') if replace else create_table_sql
+    if source == 'endpoint':
+        config = config_cache.get('ingest_config', f"{api_name}|{endpoint_name}", lambda: get_endpoint_ingest_config(api_name, endpoint_name, engine))
+        if config is None:
+            raise LookupError(f"Endpoint {endpoint_name} of API {api_name} not found")
+        rate_limiter = get_rate_limiter(config["api_id"], engine)
+        retry_policy = get_retry_policy(config["endpoint_id"], engine)
+        stats = ingest_endpoint_to_table(config, load_table_sql, extraction_path, database_url, bulk, chunk_size,
+                                         concurrency=concurrency, rate_limiter=rate_limiter, retry_policy=retry_policy, resume=resume,
+                                         progress=progress, replace_rows=replace)
+        if replace:
+            swap_staging_table(table_name, database_url)
+        return table_name, stats
+# Running the function
+    loaded = process_json_response_from_endpoint(load_table_sql, extraction_path, json_response,database_url,bulk,chunk_size)
+    if replace:
+        if loaded is None:
+            raise RuntimeError(f"Failed to load the sample response of {endpoint_name} into {table_name}")
+        swap_staging_table(table_name, database_url)
+    if progress is not None:
+        progress(rows_loaded=loaded)
+    return table_name, {"rows_loaded": loaded}
+
 # Define the API endpoint to add a new API along with its endpoints and authentication methods
 @app.route('/CopyDataFromEndpointToDB', methods=['POST'])
 def CopyDataFrom_EndpointToDB():
@@ -843,44 +802,104 @@ def CopyDataFrom_EndpointToDB():
     # print(endpoint_name)
     data_extraction_path = data.get('data_extraction_path', {})
     # print(data_extraction_path)
-    create_table_sql = ''
-    field_mapping_df = get_fieldmapping_by_api_endpoint(api_name,endpoint_name,data_extraction_path,engine)
-    #print(field_mapping_df)
-    if len(field_mapping_df) > 0:
-       create_table_sql = generate_create_table_from_fieldmapping_df(field_mapping_df)
-       execute_create_table(create_table_sql,database_url)
-       create_table_sql = create_table_sql.replace("IF NOT EXISTS","")
-    json_response = field_mapping_df['sample_response'].iloc[0]
-    extraction_path = field_mapping_df['extraction_path'].iloc[0]
-# Running the function
-    process_json_response_from_endpoint(create_table_sql, extraction_path, json_response,database_url)
-    return jsonify({"message": "Data Copied Successfully!"}), 200
+    bulk = str(data.get('bulk', os.getenv('copy_bulk_load', 'true'))).lower() == 'true'
+    chunk_size = int(os.getenv('copy_chunk_size', 10000))
+    source = data.get('source', os.getenv('ingest_source', 'sample'))
+    concurrency = int(data.get('concurrency') or os.getenv('ingest_concurrency', 8))
+    resume = str(data.get('resume', os.getenv('ingest_resume', 'true'))).lower() == 'true'
+    # by default the copy runs as a background job and the response only carries the job id
+    if str(data.get('background', os.getenv('jobs_background', 'true'))).lower() == 'true':
+        job_id = job_queue.enqueue('copy_data', {"api_name": api_name, "endpoint_name": endpoint_name, "data_extraction_path": data_extraction_path,
+                                                 "bulk": bulk, "chunk_size": chunk_size, "source": source, "concurrency": concurrency, "resume": resume})
+        return jsonify({"message": "Data copy queued", "job_id": job_id, "status_url": f"/jobs/{job_id}"}), 202
+    try:
+        table_name, stats = Copy_EndpointData(api_name, endpoint_name, data_extraction_path, bulk, chunk_size, source, concurrency, resume)
+    except LookupError as e:
+        return jsonify({"error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"error": f"Failed to ingest endpoint {endpoint_name}: {str(e)}"}), 502
+    if source == 'endpoint':
+        return jsonify({"message": "Data Copied Successfully!", "stats": stats}), 200
+    return jsonify({"message": "Data Copied Successfully!", "rows_loaded": stats["rows_loaded"]}), 200
 
 
+# Function to (re)build the vector index of a table and refresh the cached handle and search results
+# rebuild_from_store re-creates the index from the on-disk embeddings instead of re-encoding the table
+def Create_TableIndex(table_name, batch_size=100, stream=True, incremental=True, backend=None, rebuild_from_store=False, progress=None):
+    global transformer_model
+    table_pk_id = "id" #data.get('table_pk_id', {})  
+    backend = backend or get_vector_backend(Session, table_name, os.getenv('vector_backend', 'pinecone'))
+    # table_name="users_table"
+    ensure_vector_index_tables(Session)
+    # re-resolve and validate the index on every (re)index and refresh the cached handle
+    index_handle_registry.invalidate(table_name)
+    p_index , index_name = Create_Check_Pindex(table_name, backend)
+    upsert_metadata_vector_db(Session,table_name,index_name,"", "", backend=backend)
+    index_handle_registry.put(table_name, p_index, index_name)
+    embedding_store = open_embedding_store(table_name, os.getenv('embedding_store_dir', 'embedding_store'))
+    # embedding_workers > 1 spreads encoding over a process pool fed with larger blocks of rows
+    encoder = get_index_encoder(transformer_model, transformer_model_name)
+    encode_block_size = get_encode_block_size(encoder, batch_size)
+    if incremental and not rebuild_from_store:
+        status , stats = index_db_data_incremental(table_name,table_pk_id,p_index,encoder,Session,index_name,batch_size,embedding_store,progress,encode_block_size,backend)
+    else:
+        status , stats = index_db_data(table_name,table_pk_id,p_index,encoder,Session,batch_size,stream,embedding_store,rebuild_from_store,progress,encode_block_size,index_name,backend)
+    search_result_cache.invalidate(table_name)
+    return status , stats
+
 # Define the API endpoint to add a new API along with its endpoints and authentication methods
 @app.route('/CreateIndexForDbObject', methods=['POST'])
 def CreateIndex_ForDbObject():
-    global transformer_model
     if not Process_Auth():
         return jsonify({"error": "Unauthorized access"}), 401
         
     data = request.get_json() 
     table_name = data.get('table_name', {})  
-    table_pk_id = "id" #data.get('table_pk_id', {})  
-    # table_name="users_table"
-    p_index , index_name = Create_Check_Pindex(table_name)
-    upsert_metadata_vector_db(Session,table_name,index_name,"", "")
-    status = index_db_data(table_name,table_pk_id,p_index,transformer_model,Session)
+    try:
+        batch_size = int(data.get('batch_size') or os.getenv('index_batch_size', 100))
+    except (TypeError, ValueError):
+        batch_size = 0
+    if isinstance(data.get('batch_size'), (bool, float)) or batch_size <= 0:
+        return jsonify({"error": "batch_size must be a positive integer"}), 400
+    stream = str(data.get('stream', os.getenv('index_stream_results', 'true'))).lower() == 'true'
+    incremental = str(data.get('incremental', os.getenv('index_incremental', 'true'))).lower() == 'true'
+    rebuild_from_store = str(data.get('rebuild_from_store', 'false')).lower() == 'true'
+    # by default the index build runs as a background job and the response only carries the job id
+    if str(data.get('background', os.getenv('jobs_background', 'true'))).lower() == 'true':
+        job_id = job_queue.enqueue('create_index', {"table_name": table_name, "batch_size": batch_size, "stream": stream, "incremental": incremental,
+                                                    "backend": data.get('backend'), "rebuild_from_store": rebuild_from_store})
+        return jsonify({"message": f"Index build queued for table {table_name}", "job_id": job_id, "status_url": f"/jobs/{job_id}"}), 202
+    status , stats = Create_TableIndex(table_name, batch_size, stream, incremental, data.get('backend'), rebuild_from_store)
     if status:
         msg = f"Index Updated successfully for table {table_name}"
     else:
         msg = f"Failed to create Index for table {table_name}"
     print(msg)
-    return jsonify({"message": msg}), 200
-
-def Create_Check_Pindex(table_name):
+    return jsonify({"message": msg, "stats": stats}), 200
+
+# Function run by the scheduler for a due SchedulingConfiguration: reload the endpoint's pages into its table, then index it.
+# Every run replaces the table with a fresh snapshot, so periodic runs do not pile up duplicate rows
+def Run_ScheduledPipeline(schedule):
+    bulk = os.getenv('copy_bulk_load', 'true').lower() == 'true'
+    chunk_size = int(os.getenv('copy_chunk_size', 10000))
+    concurrency = int(os.getenv('ingest_concurrency', 8))
+    table_name, ingest_stats = Copy_EndpointData(schedule["api_name"], schedule["endpoint_name"], schedule["extraction_path"],
+                                                 bulk, chunk_size, os.getenv('scheduler_ingest_source', 'endpoint'), concurrency, replace=True)
+    batch_size = int(os.getenv('index_batch_size', 100))
+    stream = os.getenv('index_stream_results', 'true').lower() == 'true'
+    incremental = os.getenv('index_incremental', 'true').lower() == 'true'
+    status , index_stats = Create_TableIndex(table_name, batch_size, stream, incremental)
+    if not status:
+        raise RuntimeError(f"Failed to create Index for table {table_name}")
+    return {"table_name": table_name, "ingest": ingest_stats, "index": index_stats}
+
+def Create_Check_Pindex(table_name, backend=None):
     index_name = f"{table_name}-index"
     index_name = index_name.replace("_","-")
+    if not backend:
+        backend = get_vector_backend(Session, table_name, os.getenv('vector_backend', 'pinecone'))
+    if backend == "local":
+        return create_local_vector_index(table_name,database_url,os.getenv('local_index_dir', 'vector_indexes'))
     pinecone_cloud=os.getenv('pinecone_cloud') 
     pinecone_region=os.getenv('pinecone_region')
     spec = ServerlessSpec(cloud=pinecone_cloud, region=pinecone_region)
@@ -889,32 +908,37 @@ def Create_Check_Pindex(table_name):
     # print(f"2-- p_index - {p_index}")
     return p_index , index_name
 
-@app.route('/SearchIndexByQuery', methods=['POST'])
-def SearchIndex_ByQuery():
-    global transformer_model  
-    if not Process_Auth():
-        return jsonify({"error": "Unauthorized access"}), 401
-        
-    data = request.get_json() 
-    table_name = data.get('table_name', {})  
-    search_query = data.get('search_query', {})  
-    filter_attribute = data.get('filter_attribute', {})  
-    filter_value = data.get('filter_value', {})  
-    query_vector = transformer_model.encode(search_query).tolist()  # Convert ndarray to list
+# Function to get a table's index handle from the registry, resolving it with Create_Check_Pindex only once
+def Get_Pindex(table_name):
+    return index_handle_registry.get(table_name, Create_Check_Pindex)
 
+# Function to run one vector query against a table's index and shape the matches for the response
+# Returns None when the table has no usable index
+def Query_Pindex(table_name, query_vector, search_filter, top_k):
     # Prepare the search parameters
     search_params = {
         "vector": query_vector,
-        "top_k": int(os.getenv('index_search_results_count')),  # Number of nearest neighbors to return
+        "top_k": top_k,
         "include_metadata": True  # Include metadata in the results
     }
     # Apply filter if provided
-    if filter_attribute and filter_value:
-        search_params["filter"] = {filter_attribute: filter_value}  # Apply the specified filter
+    if search_filter:
+        search_params["filter"] = search_filter  # Apply the specified filter
 
-    p_index , index_name = Create_Check_Pindex(table_name)
+    p_index , index_name = Get_Pindex(table_name)
+    if p_index is None:
+        return None
     # Execute the query
-    query_response = p_index.query(**search_params)
+    try:
+        query_response = p_index.query(**search_params)
+    except Exception as e:
+        # the cached handle may be stale (index deleted or recreated elsewhere): resolve once more and retry
+        print(f"Query failed on cached index for {table_name}, re-resolving: {e}")
+        index_handle_registry.invalidate(table_name)
+        p_index , index_name = Get_Pindex(table_name)
+        if p_index is None:
+            return None
+        query_response = p_index.query(**search_params)
     # Process and print the results
     results = []
     for match in query_response['matches']:
@@ -924,9 +948,146 @@ def SearchIndex_ByQuery():
             "Metadata": match['metadata'],
             "Score": match['score']  # Confidence score
         })
+    return results
+
+@app.route('/SearchIndexByQuery', methods=['POST'])
+def SearchIndex_ByQuery():
+    global transformer_model  
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+        
+    data = request.get_json() 
+    table_name = data.get('table_name', {})  
+    search_query = data.get('search_query', {})  
+    filter_attribute = data.get('filter_attribute', {})  
+    filter_value = data.get('filter_value', {})  
+    top_k = int(os.getenv('index_search_results_count'))  # Number of nearest neighbors to return
+    search_filter = {filter_attribute: filter_value} if filter_attribute and filter_value else None
+    cache_key = search_result_cache.key(table_name, search_query, search_filter, top_k)
+    results = search_result_cache.get(cache_key)
+    if results is not None:
+        return jsonify({"matches": results}), 200
+
+    query_vector = query_embedding_cache.get_or_encode(query_encoder, transformer_model_name, search_query)
+    results = Query_Pindex(table_name, query_vector, search_filter, top_k)
+    if results is None:
+        return jsonify({"error": f"No index available for table {table_name}"}), 404
+    search_result_cache.put(cache_key, results)
     
     return jsonify({"matches": results}), 200 
 
+# Search one table with many queries in a single request.
+# Each entry of 'queries' is a query string or {"search_query", "filter_attribute", "filter_value"};
+# a top-level filter_attribute/filter_value applies to entries without their own filter.
+# All uncached queries are encoded in one batched model call and the index queries run concurrently.
+@app.route('/SearchIndexByQueries', methods=['POST'])
+def SearchIndex_ByQueries():
+    global transformer_model  
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+
+    data = request.get_json() 
+    table_name = data.get('table_name', {})  
+    queries = data.get('queries', [])
+    if not isinstance(queries, list) or not queries:
+        return jsonify({"error": "Invalid type for 'queries', expected a non-empty list"}), 400
+    max_queries = int(os.getenv('batch_search_max_queries', 256))
+    if len(queries) > max_queries:
+        return jsonify({"error": f"Too many queries, at most {max_queries} per request"}), 400
+    top_k = int(data.get('top_k') or os.getenv('index_search_results_count'))
+    default_filter_attribute = data.get('filter_attribute')
+    default_filter_value = data.get('filter_value')
+
+    search_queries = []
+    search_filters = []
+    for entry in queries:
+        if not isinstance(entry, dict):
+            entry = {"search_query": entry}
+        filter_attribute = entry.get('filter_attribute', default_filter_attribute)
+        filter_value = entry.get('filter_value', default_filter_value)
+        search_queries.append(entry.get('search_query', ''))
+        search_filters.append({filter_attribute: filter_value} if filter_attribute and filter_value else None)
+
+    generation = search_result_cache.generation(table_name)
+    cache_keys = [search_result_cache.key(table_name, search_queries[i], search_filters[i], top_k, generation) for i in range(len(queries))]
+    results = [search_result_cache.get(cache_key) for cache_key in cache_keys]
+    pending = [i for i in range(len(queries)) if results[i] is None]
+    if pending:
+        query_vectors = query_embedding_cache.get_or_encode_many(query_encoder, transformer_model_name, [search_queries[i] for i in pending])
+        futures = [search_executor.submit(Query_Pindex, table_name, query_vector, search_filters[i], top_k)
+                   for i, query_vector in zip(pending, query_vectors)]
+        for i, future in zip(pending, futures):
+            results[i] = future.result()
+            if results[i] is None:
+                return jsonify({"error": f"No index available for table {table_name}"}), 404
+            search_result_cache.put(cache_keys[i], results[i])
+
+    return jsonify({"results": [{"search_query": search_queries[i], "matches": results[i]} for i in range(len(queries))]}), 200
+
+@app.route('/QueryEmbeddingCacheStats', methods=['GET'])
+def QueryEmbeddingCache_Stats():
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+    encoder_stats = query_encoder.stats() if isinstance(query_encoder, MicroBatchEncoder) else None
+    return jsonify({"query_embedding_cache": query_embedding_cache.stats(), "query_encoder": encoder_stats}), 200
+
+@app.route('/InvalidateIndexHandles', methods=['POST'])
+def Invalidate_IndexHandles():
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+    data = request.get_json(silent=True) or {}
+    table_name = data.get('table_name')
+    index_handle_registry.invalidate(table_name)
+    return jsonify({"message": f"Index handles invalidated for {table_name or 'all tables'}", "cached_tables": index_handle_registry.tables()}), 200
+
+@app.route('/SearchResultCacheStats', methods=['GET'])
+def SearchResultCache_Stats():
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+    return jsonify({"search_result_cache": search_result_cache.stats()}), 200
+
+# Job handlers run by the background job queue with the parameters captured by the endpoints
+def Run_CopyDataJob(params, progress):
+    table_name, stats = Copy_EndpointData(params["api_name"], params["endpoint_name"], params["data_extraction_path"], params["bulk"],
+                                          params["chunk_size"], params["source"], params["concurrency"], params["resume"], progress)
+    return {"table_name": table_name, "stats": stats}
+
+def Run_CreateIndexJob(params, progress):
+    status , stats = Create_TableIndex(params["table_name"], params["batch_size"], params["stream"], params["incremental"],
+                                       params["backend"], params["rebuild_from_store"], progress)
+    if not status:
+        raise RuntimeError(f"Failed to create Index for table {params['table_name']}")
+    return {"table_name": params["table_name"], "stats": stats}
+
+# the scheduler and the job queue start once every function they run is defined
+job_queue = create_job_queue(database_url, {"copy_data": Run_CopyDataJob, "create_index": Run_CreateIndexJob})
+if os.getenv('jobs_worker_enabled', 'true').lower() == 'true':
+    job_queue.start()
+pipeline_scheduler = create_pipeline_scheduler(engine, database_url, Run_ScheduledPipeline)
+if os.getenv('scheduler_enabled', 'false').lower() == 'true':
+    pipeline_scheduler.start()
+
+@app.route('/ConfigCacheStats', methods=['GET'])
+def ConfigCache_Stats():
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+    return jsonify({"config_cache": config_cache.stats()}), 200
+
+@app.route('/SchedulerStatus', methods=['GET'])
+def Scheduler_Status():
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+    return jsonify({"scheduler": pipeline_scheduler.status()}), 200
+
+@app.route('/jobs/<int:job_id>', methods=['GET'])
+def Get_Job(job_id):
+    if not Process_Auth():
+        return jsonify({"error": "Unauthorized access"}), 401
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify({"job": job}), 200
+
 # Run the app
 if __name__ == "__main__":
     app.run(debug=True)